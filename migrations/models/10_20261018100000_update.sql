@@ -0,0 +1,15 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "homeworktestcase" (
+    "uuid" UUID NOT NULL  PRIMARY KEY,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "stdin" TEXT NOT NULL,
+    "expected_output" TEXT NOT NULL,
+    "timeout" DOUBLE PRECISION,
+    "homework_id" UUID NOT NULL REFERENCES "homework" ("uuid") ON DELETE CASCADE
+);
+COMMENT ON TABLE "homeworktestcase" IS 'Модель теста для автоматической проверки решения';;
+ALTER TABLE "homeworkanswer" ADD "grading_status" VARCHAR(20);
+-- downgrade --
+ALTER TABLE "homeworkanswer" DROP COLUMN "grading_status";
+DROP TABLE IF EXISTS "homeworktestcase";
@@ -0,0 +1,10 @@
+-- upgrade --
+ALTER TABLE "homeworkanswer" ADD "grading_lane" VARCHAR(20);
+ALTER TABLE "homeworkanswer" ADD "enqueued_at" TIMESTAMPTZ;
+ALTER TABLE "homeworkanswer" ADD "grading_started_at" TIMESTAMPTZ;
+CREATE INDEX "idx_homeworkan_grading_8d1f0c" ON "homeworkanswer" ("grading_lane", "grading_status");
+-- downgrade --
+DROP INDEX "idx_homeworkan_grading_8d1f0c";
+ALTER TABLE "homeworkanswer" DROP COLUMN "grading_started_at";
+ALTER TABLE "homeworkanswer" DROP COLUMN "enqueued_at";
+ALTER TABLE "homeworkanswer" DROP COLUMN "grading_lane";
@@ -0,0 +1,15 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "regradejob" (
+    "uuid" UUID NOT NULL  PRIMARY KEY,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "status" VARCHAR(20) NOT NULL,
+    "total" INT NOT NULL  DEFAULT 0,
+    "processed" INT NOT NULL  DEFAULT 0,
+    "started_at" TIMESTAMPTZ,
+    "finished_at" TIMESTAMPTZ,
+    "homework_id" UUID NOT NULL REFERENCES "homework" ("uuid") ON DELETE CASCADE
+);
+COMMENT ON TABLE "regradejob" IS 'Модель массовой перепроверки решений домашнего задания';;
+-- downgrade --
+DROP TABLE IF EXISTS "regradejob";
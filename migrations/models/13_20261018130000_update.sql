@@ -0,0 +1,4 @@
+-- upgrade --
+ALTER TABLE "homework" ADD "grading_mode" VARCHAR(20) NOT NULL  DEFAULT 'score';
+-- downgrade --
+ALTER TABLE "homework" DROP COLUMN "grading_mode";
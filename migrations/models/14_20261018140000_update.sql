@@ -0,0 +1,10 @@
+-- upgrade --
+ALTER TABLE "homework" ADD "input_generator" TEXT;
+ALTER TABLE "homework" ADD "reference_complexity" VARCHAR(20);
+ALTER TABLE "homeworkanswer" ADD "complexity" VARCHAR(20);
+ALTER TABLE "homeworkanswer" ADD "complexity_profile" JSONB;
+-- downgrade --
+ALTER TABLE "homeworkanswer" DROP COLUMN "complexity_profile";
+ALTER TABLE "homeworkanswer" DROP COLUMN "complexity";
+ALTER TABLE "homework" DROP COLUMN "reference_complexity";
+ALTER TABLE "homework" DROP COLUMN "input_generator";
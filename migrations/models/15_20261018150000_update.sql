@@ -0,0 +1,6 @@
+-- upgrade --
+ALTER TABLE "homework" ADD "comparison_mode" VARCHAR(20) NOT NULL  DEFAULT 'whitespace';
+ALTER TABLE "homework" ADD "comparison_tolerance" DOUBLE PRECISION NOT NULL  DEFAULT 1e-06;
+-- downgrade --
+ALTER TABLE "homework" DROP COLUMN "comparison_tolerance";
+ALTER TABLE "homework" DROP COLUMN "comparison_mode";
@@ -0,0 +1,4 @@
+-- upgrade --
+ALTER TABLE "homework" ADD "allowed_imports" JSONB;
+-- downgrade --
+ALTER TABLE "homework" DROP COLUMN "allowed_imports";
@@ -0,0 +1,6 @@
+-- upgrade --
+ALTER TABLE "homework" ADD "grading_stages" JSONB;
+ALTER TABLE "homeworkanswer" ADD "grading_report" JSONB;
+-- downgrade --
+ALTER TABLE "homeworkanswer" DROP COLUMN "grading_report";
+ALTER TABLE "homework" DROP COLUMN "grading_stages";
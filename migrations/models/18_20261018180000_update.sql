@@ -0,0 +1,15 @@
+-- upgrade --
+ALTER TABLE "homeworkanswer" ADD "fingerprints_count" INT;
+CREATE TABLE IF NOT EXISTS "submissionfingerprint" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "hash" BIGINT NOT NULL,
+    "homework_id" UUID NOT NULL REFERENCES "homework" ("uuid") ON DELETE CASCADE,
+    "answer_id" UUID NOT NULL REFERENCES "homeworkanswer" ("uuid") ON DELETE CASCADE,
+    "student_id" UUID NOT NULL REFERENCES "user" ("uuid") ON DELETE CASCADE
+);
+CREATE INDEX "idx_submissionf_homewor_3c5d1e" ON "submissionfingerprint" ("homework_id", "hash");
+CREATE INDEX "idx_submissionf_answer__8b2f4a" ON "submissionfingerprint" ("answer_id");
+COMMENT ON TABLE "submissionfingerprint" IS 'Отпечаток решения для поиска похожих решений, хеш одной отобранной k-граммы токенов';;
+-- downgrade --
+DROP TABLE IF EXISTS "submissionfingerprint";
+ALTER TABLE "homeworkanswer" DROP COLUMN "fingerprints_count";
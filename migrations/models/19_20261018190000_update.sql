@@ -0,0 +1,13 @@
+-- upgrade --
+ALTER TABLE "session" ADD "access_token_digest" VARCHAR(64);
+ALTER TABLE "session" ADD "refresh_token_digest" VARCHAR(64);
+UPDATE "session" SET
+    "access_token_digest" = encode(sha256(convert_to("access_token", 'UTF8')), 'hex'),
+    "refresh_token_digest" = encode(sha256(convert_to("refresh_token", 'UTF8')), 'hex');
+CREATE INDEX "idx_session_access__5e1b7c" ON "session" ("access_token_digest");
+CREATE INDEX "idx_session_refresh_9a4d2f" ON "session" ("refresh_token_digest");
+-- downgrade --
+DROP INDEX "idx_session_refresh_9a4d2f";
+DROP INDEX "idx_session_access__5e1b7c";
+ALTER TABLE "session" DROP COLUMN "refresh_token_digest";
+ALTER TABLE "session" DROP COLUMN "access_token_digest";
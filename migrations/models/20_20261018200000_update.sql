@@ -0,0 +1,7 @@
+-- upgrade --
+ALTER TABLE "session" ADD "expires_at" TIMESTAMPTZ;
+UPDATE "session" SET "expires_at" = "created_at" + INTERVAL '30 days';
+CREATE INDEX "idx_session_expires_3c8e1a" ON "session" ("expires_at");
+-- downgrade --
+DROP INDEX "idx_session_expires_3c8e1a";
+ALTER TABLE "session" DROP COLUMN "expires_at";
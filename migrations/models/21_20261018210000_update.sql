@@ -0,0 +1,10 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "revokedsession" (
+    "session_id" UUID NOT NULL PRIMARY KEY,
+    "expires_at" TIMESTAMPTZ NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX "idx_revokedsess_expires_7d2b9e" ON "revokedsession" ("expires_at");
+COMMENT ON TABLE "revokedsession" IS 'Сессия, вышедшая из системы до истечения access токена, ее токен больше не принимается';;
+-- downgrade --
+DROP TABLE IF EXISTS "revokedsession";
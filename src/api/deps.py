@@ -1,8 +1,26 @@
+from uuid import UUID
+
 from fastapi import Request, HTTPException, status, Depends
+from tortoise.exceptions import DoesNotExist
 
+import enums
 import models
 from core.security import decode_jwt_token, oauth2_scheme
-from schemas import AccessToken, TrackingSchemaMixin
+from schemas import AccessToken, TrackingSchemaMixin, UserClaims
+from services.revocation import revocation_list
+from services.user_cache import user_cache
+
+
+def decode_access_token(token: str) -> AccessToken:
+    """ Токен сессии, вышедшей из системы, не принимается, проверка без запроса в БД """
+
+    payload: AccessToken = decode_jwt_token(token, AccessToken)
+    if payload.session_id is not None and revocation_list.is_revoked(payload.session_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Token invalid or expired.',
+        )
+    return payload
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> models.User:
@@ -11,16 +29,38 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> models.User:
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
-    payload: AccessToken = decode_jwt_token(token, AccessToken)
-    user = await models.User.get(uuid=payload.sub)
-    if not user:
+    payload = decode_access_token(token)
+    try:
+        return await user_cache.get(UUID(payload.sub))
+    except DoesNotExist:
         raise credentials_exception
-    return user
 
 
 async def get_access_token(token: str = Depends(oauth2_scheme)) -> AccessToken:
-    payload: AccessToken = decode_jwt_token(token, AccessToken)
-    return payload
+    return decode_access_token(token)
+
+
+async def get_user_claims(access_token: AccessToken = Depends(get_access_token)) -> UserClaims:
+    """
+    Пользователь из токена без запроса в БД, для эндпоинтов, которым нужны только его uuid,
+    роль или email. Данные актуальны на момент выдачи токена
+    """
+    # Claims were validated when the token was decoded
+    return UserClaims.construct(uuid=UUID(access_token.sub), **access_token.user.__dict__)
+
+
+async def get_teacher_claims(user: UserClaims = Depends(get_user_claims)) -> UserClaims:
+    """
+    Преподаватель или администратор, для эндпоинтов, которые меняют проверку решений
+    или видят скрытые тесты
+    """
+
+    if user.role not in (enums.UserRole.TEACHER.value, enums.UserRole.ADMIN.value):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Not enough permissions',
+        )
+    return user
 
 
 async def get_tracking_data(
@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 
-from api.v1 import healthchecks, authorizations, groups, files, lessons, students, teachers, homeworks, homework_answers
+from api.v1 import (
+    healthchecks, authorizations, groups, files, lessons, students, teachers, homeworks,
+    homework_answers, metrics,
+)
 
 api_router = APIRouter()
 
@@ -13,3 +16,4 @@ api_router.include_router(files.router, prefix="/files", tags=["files"])
 api_router.include_router(lessons.router, prefix="/groups", tags=["lessons"])
 api_router.include_router(homeworks.router, prefix="/groups", tags=["homeworks"])
 api_router.include_router(homework_answers.router, prefix="/homeworks", tags=["homeworks"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -3,6 +3,7 @@ from fastapi import status
 from starlette.responses import Response
 from tortoise.exceptions import DoesNotExist
 from tortoise.transactions import atomic
+from tortoise.transactions import in_transaction
 
 import enums
 import models
@@ -29,15 +30,20 @@ router = APIRouter()
             'description': 'Server Error',
             'model': ExceptionModel,
         },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            'description': 'Too many login attempts',
+        },
     },
 )
-@atomic()
 async def register(
         *,
         tracking_params: schemas.TrackingSchemaMixin = Depends(deps.get_tracking_data),
         sign_up: schemas.SignUp
 ) -> schemas.SessionOut:
-    """Регистрация с помощью почты и пароля"""
+    """
+    Регистрация с помощью почты и пароля.
+    Пароль хешируется до открытия транзакции, чтобы медленный bcrypt не держал соединение с БД
+    """
 
     is_user_exists = await models.User.exists(email=sign_up.email)
     if is_user_exists:
@@ -51,10 +57,13 @@ async def register(
     )
 
     if sign_up.password is not None:
-        create_user.hashed_password = security.get_password_hash(sign_up.password)
+        create_user.hashed_password = await security.password_hasher.hash(sign_up.password)
 
-    user = await models.User.create(**create_user.dict(exclude_unset=True))
-    session = await services.AuthorizationService.create_session(user, sign_up.platform, tracking_params)
+    async with in_transaction():
+        user = await models.User.create(**create_user.dict(exclude_unset=True))
+        session = await services.AuthorizationService.create_session(
+            user, sign_up.platform, tracking_params
+        )
     return session
 
 
@@ -70,15 +79,20 @@ async def register(
             'description': 'Server Error',
             'model': ExceptionModel,
         },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            'description': 'Too many login attempts',
+        },
     },
 )
-@atomic()
 async def login(
         *,
         tracking_params: schemas.TrackingSchemaMixin = Depends(deps.get_tracking_data),
         sign_in: schemas.LogIn
 ) -> schemas.SessionOut:
-    """Вход с помощью почты и пароля"""
+    """
+    Вход с помощью почты и пароля.
+    Пароль проверяется до открытия транзакции, чтобы медленный bcrypt не держал соединение с БД
+    """
 
     user_not_found_or_password_incorrect = ValidationError(
                 field_errors=[
@@ -92,11 +106,14 @@ async def login(
     except DoesNotExist:
         raise user_not_found_or_password_incorrect
 
-    is_verified = security.verify_password(sign_in.password, user.hashed_password)
+    is_verified = await security.password_hasher.verify(sign_in.password, user.hashed_password)
     if not is_verified:
         raise user_not_found_or_password_incorrect
 
-    session = await services.AuthorizationService.create_session(user, sign_in.platform, tracking_params)
+    async with in_transaction():
+        session = await services.AuthorizationService.create_session(
+            user, sign_in.platform, tracking_params
+        )
     return session
 
 
@@ -126,7 +143,8 @@ async def refresh_access_token(
     )
     try:
         old_session = await models.Session.get(
-            access_token=access_token.token, refresh_token=refresh_token
+            access_token_digest=security.token_digest(access_token.token),
+            refresh_token_digest=security.token_digest(refresh_token),
         ).prefetch_related('user')
     except DoesNotExist:
         raise credentials_exception
@@ -137,6 +155,8 @@ async def refresh_access_token(
         tracking_params
     )
     await models.Session.filter(uuid=old_session.uuid).delete()
+    await services.revocation_list.revoke(access_token.session_id, access_token.exp)
+    security.token_cache.evict(access_token.token)
     return session
 
 
@@ -156,4 +176,6 @@ async def logout(
     access_token: schemas.AccessToken = Depends(deps.get_access_token),
 ) -> Response:
     await models.Session.filter(uuid=access_token.session_id).delete()
+    await services.revocation_list.revoke(access_token.session_id, access_token.exp)
+    security.token_cache.evict(access_token.token)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,16 +1,23 @@
 from typing import List
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from fastapi import status
 from starlette.responses import Response
+from tortoise import timezone
 from tortoise.transactions import atomic
+from tortoise.transactions import in_transaction
 
 import enums
 import models
 import schemas
+import services
 from api import deps
+from exceptions import FieldError
+from exceptions import ValidationError
 from exceptions.schemas import ExceptionModel
+from executor import code_policy
 from sdk.utils import validation_error
 
 router = APIRouter()
@@ -35,6 +42,10 @@ async def get_homework_answers(
     '/{homework_id}/answer',
     response_model=schemas.HomeworkAnswer,
     responses={
+        status.HTTP_400_BAD_REQUEST: {
+            "description": 'Решение не прошло статическую проверку',
+            "model": ExceptionModel,
+        },
         status.HTTP_403_FORBIDDEN: {
             "description": 'Нельзя сдать домашку',
             "model": ExceptionModel,
@@ -45,48 +56,95 @@ async def get_homework_answers(
         },
     },
 )
-@atomic()
 async def create_homework_answer(
     *,
-    user: models.User = Depends(deps.get_current_user),  # noqa
+    user: schemas.UserClaims = Depends(deps.get_user_claims),  # noqa
     homework_id: UUID,
     new_answer: schemas.HomeworkAnswerStudentCreate
 ) -> schemas.HomeworkAnswer:
     """
-    Отправка решения от студента
+    Отправка решения от студента.
+    Если у домашки есть тесты, решение проверяется в фоне,
+    а ответ возвращается сразу со статусом pending
     """
 
-    homework = await models.Homework.get(uuid=homework_id)
-    retakes_count = await models.HomeworkAnswer.filter(
-        student_id=user.uuid,
-        homework_id=homework_id
-    ).count()
-    last_answer = await models.HomeworkAnswer.filter(
-        student_id=user.uuid,
-        homework_id=homework_id,
-        points=None
-    ).first()
-
-    if not homework.can_be_created(retakes_count):
-        raise validation_error(
-            status_code=status.HTTP_403_FORBIDDEN,
-            message='Время сдачи истекло или вы превысили лимит попыток'
+    async with in_transaction():
+        homework = await models.Homework.get(uuid=homework_id)
+        retakes_count = await models.HomeworkAnswer.filter(
+            student_id=user.uuid,
+            homework_id=homework_id
+        ).count()
+        last_answer = await models.HomeworkAnswer.filter(
+            student_id=user.uuid,
+            homework_id=homework_id,
+            points=None
+        ).first()
+
+        if not homework.can_be_created(retakes_count):
+            raise validation_error(
+                status_code=status.HTTP_403_FORBIDDEN,
+                message='Время сдачи истекло или вы превысили лимит попыток'
+            )
+
+        if last_answer:
+            raise validation_error(
+                status_code=status.HTTP_403_FORBIDDEN,
+                message='Вы уже отправили решение на проверку'
+            )
+
+        is_auto_checked = (
+            new_answer.answer is not None
+            and await services.GradingService.is_auto_checked(homework_id)
+        )
+        if is_auto_checked:
+            violations = code_policy.check(new_answer.answer)
+            if violations:
+                raise ValidationError(
+                    message='Решение использует запрещённые возможности языка',
+                    field_errors=[
+                        FieldError(field='answer', message=x.message) for x in violations
+                    ],
+                )
+
+        lane = services.GradingService.lane_for(homework)
+        answer = await models.HomeworkAnswer.create(
+            homework_id=homework_id,
+            student_id=user.uuid,
+            answer=new_answer.answer,
+            file_id=new_answer.file_id,
+            grading_status=enums.GradingStatus.PENDING.value if is_auto_checked else None,
+            grading_lane=lane.value if is_auto_checked else None,
+            enqueued_at=timezone.now() if is_auto_checked else None,
         )
 
-    if last_answer:
-        raise validation_error(status_code=status.HTTP_403_FORBIDDEN, message='Вы уже отправили решение на проверку')
+    # Ставим в очередь только после коммита, иначе воркер может не увидеть решение
+    if is_auto_checked:
+        services.GradingService.enqueue(answer.uuid, lane)
+    if answer.answer is not None:
+        services.PlagiarismService.enqueue(answer.uuid)
 
-    answer = await models.HomeworkAnswer.create(
-        homework_id=homework_id,
-        student_id=user.uuid,
-        answer=new_answer.answer,
-        file_id=new_answer.file_id,
-    )
     return schemas.HomeworkAnswer.from_orm(
         await models.HomeworkAnswer.get(uuid=answer.uuid).prefetch_related('file', 'student')
     )
 
 
+@router.get(
+    '/{homework_id}/answer/{answer_id}/similar',
+    response_model=List[schemas.SimilarAnswer],
+)
+async def get_similar_answers(
+    *,
+    user: schemas.UserClaims = Depends(deps.get_teacher_claims),  # noqa
+    homework_id: UUID,
+    answer_id: UUID,
+    threshold: Optional[float] = Query(default=None, ge=0, le=1),
+) -> List[schemas.SimilarAnswer]:
+    """Решения других студентов, похожие на данное"""
+
+    await models.HomeworkAnswer.get(uuid=answer_id, homework_id=homework_id)
+    return await services.PlagiarismService.similar_answers(answer_id, threshold)
+
+
 @router.put(
     '/{homework_id}/answer/{answer_id}',
     response_model=schemas.HomeworkAnswer,
@@ -94,7 +152,7 @@ async def create_homework_answer(
 @atomic()
 async def update_homework_answer(
     *,
-    user: models.User = Depends(deps.get_current_user),  # noqa
+    user: schemas.UserClaims = Depends(deps.get_user_claims),  # noqa
     answer_id: UUID,
     update_answer: schemas.HomeworkAnswerTeacherCreate
 ) -> schemas.HomeworkAnswer:
@@ -1,7 +1,9 @@
 from typing import List
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi import status
 from tortoise.transactions import atomic
 
 import enums
@@ -9,6 +11,7 @@ import models
 import schemas
 import services
 from api import deps
+from sdk.utils import validation_error
 
 router = APIRouter()
 
@@ -35,7 +38,7 @@ async def create_homework(
     homework = await models.Homework.create(
         lesson_id=lesson_id,
         author=author,
-        **new_homework.dict(exclude={'author', 'additional_files', 'quiz'})
+        **new_homework.dict(exclude={'author', 'additional_files', 'quiz', 'test_cases'})
     )
 
     additional_files = await models.File.filter(uuid__in=new_homework.additional_files)
@@ -46,6 +49,8 @@ async def create_homework(
 
     await homework.additional_files.add(*additional_files)
 
+    await services.GradingService.replace_test_cases(homework.uuid, new_homework.test_cases)
+
     await homework.save()
 
     return schemas.Homework(author=author, quizzes=quizzes, additional_files=additional_files, **dict(homework))
@@ -101,9 +106,9 @@ async def update_homework(
     access_token: schemas.AccessToken = Depends(deps.get_access_token),  # noqa
     group_id: UUID,
     homework_id: UUID,
-    updated_homework: schemas.HomeworkCreate
+    updated_homework: schemas.HomeworkUpdate
 ) -> schemas.Homework:
-    """Обновить информацию о домашнем задании"""
+    """Обновить информацию о домашнем задании. Тесты заменяются, только если переданы"""
 
     additional_files = await models.File.filter(uuid__in=updated_homework.additional_files)
 
@@ -113,8 +118,12 @@ async def update_homework(
 
     homework = await models.Homework.get(uuid=homework_id)
 
-    for field in updated_homework.dict(exclude={'author', 'additional_files'}):
-        setattr(homework, field, updated_homework.dict()[field])
+    # Quizzes, files and tests are relations, they are replaced below
+    exclude = {'author', 'additional_files', 'quizzes', 'test_cases'}
+    if 'input_generator' not in updated_homework.__fields_set__:
+        exclude.add('input_generator')
+    for field, value in updated_homework.dict(exclude=exclude).items():
+        setattr(homework, field, value)
 
     homework.author = author
 
@@ -129,6 +138,84 @@ async def update_homework(
             new_quizzes=updated_homework.quizzes
         )
 
+    if updated_homework.test_cases is not None:
+        await services.GradingService.replace_test_cases(homework.uuid, updated_homework.test_cases)
+
     await homework.save()
 
     return schemas.Homework(author=author, quizzes=quizzes, additional_files=additional_files, **dict(homework))
+
+
+@router.get(
+    '/{group_id}/homeworks/{homework_id}/test-cases',
+    response_model=List[schemas.HomeworkTestCase],
+)
+async def get_homework_test_cases(
+    *,
+    user: schemas.UserClaims = Depends(deps.get_teacher_claims),  # noqa
+    group_id: UUID,
+    homework_id: UUID,
+) -> List[schemas.HomeworkTestCase]:
+    """Скрытые тесты домашнего задания, только для преподавателей"""
+
+    await models.Homework.get(uuid=homework_id)
+    return schemas.HomeworkTestCase.from_queryset(
+        await models.HomeworkTestCase.filter(homework_id=homework_id).order_by('created_at', 'uuid')
+    )
+
+
+@router.post(
+    '/{group_id}/homeworks/{homework_id}/regrade',
+    response_model=schemas.RegradeJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def regrade_homework(
+    *,
+    user: schemas.UserClaims = Depends(deps.get_teacher_claims),  # noqa
+    group_id: UUID,
+    homework_id: UUID,
+) -> schemas.RegradeJob:
+    """Перепроверить тестами все решения домашнего задания"""
+
+    await models.Homework.get(uuid=homework_id)
+    if not await services.GradingService.is_auto_checked(homework_id):
+        raise validation_error(
+            status_code=status.HTTP_409_CONFLICT,
+            message='У домашнего задания нет тестов'
+        )
+    job = await services.RegradeService.start(homework_id)
+    return services.RegradeService.progress(job)
+
+
+@router.get(
+    '/{group_id}/homeworks/{homework_id}/regrade/{job_id}',
+    response_model=schemas.RegradeJob,
+)
+async def get_regrade_job(
+    *,
+    user: schemas.UserClaims = Depends(deps.get_teacher_claims),  # noqa
+    group_id: UUID,
+    homework_id: UUID,
+    job_id: UUID,
+) -> schemas.RegradeJob:
+    """Прогресс перепроверки и оценка оставшегося времени"""
+
+    job = await models.RegradeJob.get(uuid=job_id, homework_id=homework_id)
+    return services.RegradeService.progress(job)
+
+
+@router.get(
+    '/{group_id}/homeworks/{homework_id}/plagiarism',
+    response_model=schemas.PlagiarismReport,
+)
+async def get_plagiarism_report(
+    *,
+    user: schemas.UserClaims = Depends(deps.get_teacher_claims),  # noqa
+    group_id: UUID,
+    homework_id: UUID,
+    threshold: Optional[float] = Query(default=None, ge=0, le=1),
+) -> schemas.PlagiarismReport:
+    """Пары похожих решений домашнего задания"""
+
+    await models.Homework.get(uuid=homework_id)
+    return await services.PlagiarismService.report(homework_id, threshold)
@@ -0,0 +1,83 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+import schemas
+import services
+from api import deps
+from core import security
+from schemas.metrics import GradingLaneStats
+from schemas.metrics import PasswordHashingStats
+from schemas.metrics import RevocationStats
+from schemas.metrics import TokenCacheStats
+from schemas.metrics import UserCacheStats
+
+router = APIRouter()
+
+
+@router.get(
+    '/grading-lanes',
+    response_model=List[GradingLaneStats],
+)
+async def get_grading_lanes(
+    *,
+    access_token: schemas.AccessToken = Depends(deps.get_access_token),  # noqa
+) -> List[GradingLaneStats]:
+    """Глубина очередей проверки и время ожидания решений по каждой очереди"""
+
+    return await services.GradingService.lane_stats()
+
+
+@router.get(
+    '/password-hashing',
+    response_model=PasswordHashingStats,
+)
+async def get_password_hashing(
+    *,
+    access_token: schemas.AccessToken = Depends(deps.get_access_token),  # noqa
+) -> PasswordHashingStats:
+    """Загрузка пула хеширования паролей этого процесса и время ожидания в очереди"""
+
+    return security.password_hasher.stats()
+
+
+@router.get(
+    '/token-cache',
+    response_model=TokenCacheStats,
+)
+async def get_token_cache(
+    *,
+    access_token: schemas.AccessToken = Depends(deps.get_access_token),  # noqa
+) -> TokenCacheStats:
+    """Попадания в кеш проверенных токенов этого процесса и занимаемая им память"""
+
+    return security.token_cache.stats()
+
+
+@router.get(
+    '/user-cache',
+    response_model=UserCacheStats,
+)
+async def get_user_cache(
+    *,
+    access_token: schemas.AccessToken = Depends(deps.get_access_token),  # noqa
+) -> UserCacheStats:
+    """Попадания в кеш пользователей этого процесса"""
+
+    return services.user_cache.stats()
+
+
+@router.get(
+    '/revocations',
+    response_model=RevocationStats,
+)
+async def get_revocations(
+    *,
+    access_token: schemas.AccessToken = Depends(deps.get_access_token),  # noqa
+) -> RevocationStats:
+    """
+    Отозванные сессии в памяти этого процесса, попадания в фильтр Блума
+    и синхронизация с другими процессами
+    """
+
+    return services.revocation_list.stats()
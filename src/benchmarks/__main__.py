@@ -0,0 +1,43 @@
+"""
+Executor benchmark.
+
+    cd src && python -m benchmarks --concurrency 4 --iterations 10 \
+        --output benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from benchmarks.corpus import CORPUS
+from benchmarks.runner import run_benchmark
+from core.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Throughput and latency of the submission executor'
+    )
+    parser.add_argument('--concurrency', type=int, default=settings.EXECUTOR_POOL_SIZE)
+    parser.add_argument(
+        '--iterations', type=int, default=10, help='Runs of every corpus submission'
+    )
+    parser.add_argument(
+        '--category', action='append', help='Only run submissions of these categories'
+    )
+    parser.add_argument('--output', type=Path, help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    corpus = [x for x in CORPUS if not args.category or x.category in args.category]
+    report = asyncio.run(run_benchmark(args.concurrency, args.iterations, corpus))
+
+    if args.output is None:
+        print(report.json(indent=2))
+        return
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(report.json(indent=2))
+    p95 = report.latency.p95 * 1000
+    print(f'{report.throughput:.1f} submissions/s, p95 {p95:.0f} ms -> {args.output}')
+
+
+if __name__ == '__main__':
+    main()
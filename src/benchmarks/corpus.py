@@ -0,0 +1,80 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class Submission(BaseModel):
+    name: str
+    category: str  # cpu, io, print, failing, forbidden
+    code: str
+    stdin: str = ''
+
+
+CORPUS: List[Submission] = [
+    Submission(
+        name='sum_of_squares',
+        category='cpu',
+        code='print(sum(i * i for i in range(2_000_000)))',
+    ),
+    Submission(
+        name='sieve',
+        category='cpu',
+        code=(
+            'n = 300_000\n'
+            'sieve = [True] * (n + 1)\n'
+            'for i in range(2, int(n ** 0.5) + 1):\n'
+            '    if sieve[i]:\n'
+            '        sieve[i * i::i] = [False] * len(sieve[i * i::i])\n'
+            'print(sum(sieve) - 2)\n'
+        ),
+    ),
+    Submission(
+        name='read_numbers',
+        category='io',
+        code=(
+            'import sys\n'
+            'n = int(input())\n'
+            'print(sum(int(sys.stdin.readline()) for _ in range(n)))\n'
+        ),
+        stdin='100000\n' + '\n'.join(str(i) for i in range(100_000)) + '\n',
+    ),
+    Submission(
+        name='echo_lines',
+        category='io',
+        code=(
+            'import sys\n'
+            'print(len(sys.stdin.read().split()))\n'
+        ),
+        stdin='lorem ipsum dolor sit amet\n' * 20_000,
+    ),
+    Submission(
+        name='print_lines',
+        category='print',
+        code='for i in range(50_000):\n    print(i)\n',
+    ),
+    Submission(
+        name='print_table',
+        category='print',
+        code='for i in range(1, 200):\n    print(*(i * j for j in range(1, 200)))\n',
+    ),
+    Submission(
+        name='zero_division',
+        category='failing',
+        code='print(1 / 0)',
+    ),
+    Submission(
+        name='recursion',
+        category='failing',
+        code='def f(n):\n    return f(n + 1)\nf(0)\n',
+    ),
+    Submission(
+        name='eval',
+        category='forbidden',
+        code='print(eval("1 + 1"))',
+    ),
+    Submission(
+        name='exec',
+        category='forbidden',
+        code='exec("print(1)")',
+    ),
+]
@@ -0,0 +1,217 @@
+"""
+Throughput of session creation, what login, registration and token refresh do after
+the password check.
+
+Runs the same number of logins through AuthorizationService.create_session and through the previous
+implementation, an INSERT followed by an UPDATE, against the database from DB_URI (or --db-url),
+then deletes everything it created.
+
+    cd src && python -m benchmarks.logins --logins 5000 --concurrency 20 \
+        --output benchmarks/results/logins.json
+"""
+import argparse
+import asyncio
+import platform
+import time
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+from typing import Awaitable
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+from pydantic import BaseModel
+from tortoise import Tortoise
+from tortoise import timezone as tortoise_timezone
+
+import enums
+import models
+import schemas
+from benchmarks.runner import LatencyStats
+from benchmarks.runner import latency_stats
+from core import security
+from core.config import settings
+from services import AuthorizationService
+
+BENCHMARK_USER_AGENT = 'benchmarks.logins'
+
+CreateSession = Callable[
+    [models.User, enums.PlatformType, schemas.TrackingSchemaMixin],
+    Awaitable[schemas.SessionOut],
+]
+
+
+class ThroughputStats(BaseModel):
+    duration: float
+    throughput: float  # sessions per second
+    latency: LatencyStats
+
+
+class LoginThroughputReport(BaseModel):
+    started_at: datetime
+    python_version: str
+    database: str
+    logins: int
+    concurrency: int
+    single_insert: ThroughputStats
+    insert_then_update: ThroughputStats
+    speedup: float
+
+
+async def create_session_insert_then_update(
+        user: models.User,
+        platform: enums.PlatformType,
+        tracking_params: schemas.TrackingSchemaMixin
+) -> schemas.SessionOut:
+    """
+    The previous create_session: the access token needs the session uuid, so it is saved
+    by a second query. Both tokens got the user as a dict that was validated into UserBase
+    again, rebuilt here the same way
+    """
+
+    user_info = schemas.UserBase.from_orm(user)
+    expires_in = security.get_token_expires()
+    refresh_token = security.create_refresh_token(
+        user=schemas.UserBase(**user_info.dict()),
+        user_id=user.uuid
+    )
+    session = await models.Session.create(
+        user=user,
+        platform=platform,
+        refresh_token=refresh_token,
+        refresh_token_digest=security.token_digest(refresh_token),
+        expires_at=(
+            tortoise_timezone.now()
+            + timedelta(minutes=settings.SSO_REFRESH_TOKEN_EXPIRE_MINUTES)
+        ),
+        **tracking_params.dict()
+    )
+    session.access_token = security.create_access_token(
+        user=schemas.UserBase(**user_info.dict()),
+        user_id=user.uuid,
+        session_id=session.uuid,
+        expires_in=expires_in
+    )
+    session.access_token_digest = security.token_digest(session.access_token)
+    await session.save()
+    return schemas.SessionOut(
+        access_token=session.access_token,
+        refresh_token=session.refresh_token,
+        expires_in=round(expires_in.timestamp()),
+    )
+
+
+async def time_logins(
+        create_session: CreateSession,
+        user: models.User,
+        count: int,
+        concurrency: int,
+) -> Tuple[float, List[float]]:
+    """ Wall time of `count` logins, `concurrency` at a time, and latency of each one """
+
+    tracking_params = schemas.TrackingSchemaMixin(
+        ip_address='127.0.0.1',
+        user_agent=BENCHMARK_USER_AGENT
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def login() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await create_session(user, enums.PlatformType.WEB, tracking_params)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(count)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_logins_benchmark(count: int, concurrency: int, warmup: int) -> LoginThroughputReport:
+    user = await models.User.create(
+        email=f'{uuid.uuid4().hex}@example.com',
+        name=BENCHMARK_USER_AGENT,
+        role=enums.UserRole.STUDENT.value,
+    )
+    single_insert_session = AuthorizationService.create_session
+    insert_then_update_session = create_session_insert_then_update
+    try:
+        for create_session in (single_insert_session, insert_then_update_session):
+            await time_logins(create_session, user, warmup, concurrency)
+        # Alternated halves, so table growth and caches weigh on both implementations alike
+        half = count // 2
+        rest = count - half
+        single_insert = [await time_logins(single_insert_session, user, half, concurrency)]
+        insert_then_update = [
+            await time_logins(insert_then_update_session, user, half, concurrency),
+            await time_logins(insert_then_update_session, user, rest, concurrency),
+        ]
+        single_insert.append(await time_logins(single_insert_session, user, rest, concurrency))
+    finally:
+        await models.Session.filter(user_id=user.uuid).delete()
+        await user.delete()
+
+    single_insert_stats = throughput_stats(single_insert)
+    insert_then_update_stats = throughput_stats(insert_then_update)
+    return LoginThroughputReport(
+        started_at=datetime.now(timezone.utc),
+        python_version=platform.python_version(),
+        database=Tortoise.get_connection('default').capabilities.dialect,
+        logins=count,
+        concurrency=concurrency,
+        single_insert=single_insert_stats,
+        insert_then_update=insert_then_update_stats,
+        speedup=single_insert_stats.throughput / insert_then_update_stats.throughput,
+    )
+
+
+def throughput_stats(runs: List[Tuple[float, List[float]]]) -> ThroughputStats:
+    duration = sum(x[0] for x in runs)
+    latencies = [latency for _, run_latencies in runs for latency in run_latencies]
+    return ThroughputStats(
+        duration=duration,
+        throughput=len(latencies) / duration,
+        latency=latency_stats(latencies),
+    )
+
+
+async def run(db_url: str, count: int, concurrency: int, warmup: int) -> LoginThroughputReport:
+    await Tortoise.init(db_url=db_url, modules={'models': ['models']})
+    try:
+        return await run_logins_benchmark(count, concurrency, warmup)
+    finally:
+        await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Throughput of session creation on login')
+    parser.add_argument('--db-url', default=settings.DB_URI)
+    parser.add_argument(
+        '--logins', type=int, default=5000, help='Sessions created by each implementation'
+    )
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--output', type=Path, help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.db_url, args.logins, args.concurrency, args.warmup))
+
+    if args.output is None:
+        print(report.json(indent=2))
+        return
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(report.json(indent=2))
+    implementations = (
+        ('single insert', report.single_insert),
+        ('insert then update', report.insert_then_update),
+    )
+    for name, stats in implementations:
+        print(f'{name}: {stats.throughput:.0f} logins/s, p50 {stats.latency.p50 * 1000:.2f} ms')
+    print(f'speedup: {report.speedup:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import asyncio
+import platform
+import resource
+import time
+from collections import Counter
+from datetime import datetime
+from datetime import timezone
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pydantic import BaseModel
+
+from benchmarks.corpus import CORPUS
+from benchmarks.corpus import Submission
+from executor import ExecutionLimits
+from executor import ExecutionResult
+from executor import WorkerPool
+from executor.sandbox import EXECUTOR_VERSION
+
+
+class LatencyStats(BaseModel):
+    p50: float
+    p95: float
+    p99: float
+    max: float  # noqa: A003
+
+
+class CategoryReport(BaseModel):
+    submissions: int
+    verdicts: Dict[str, int]
+    latency: LatencyStats
+    peak_memory: int
+
+
+class BenchmarkReport(BaseModel):
+    started_at: datetime
+    python_version: str
+    executor_version: int
+    concurrency: int
+    iterations: int
+    submissions: int
+    duration: float
+    throughput: float  # submissions per second
+    latency: LatencyStats
+    peak_memory: int  # max RSS of a single sandbox process, bytes
+    supervisor_peak_memory: int  # max RSS of the benchmark process itself, bytes
+    categories: Dict[str, CategoryReport]
+
+
+Sample = Tuple[Submission, ExecutionResult, float]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear interpolation between the closest ranks"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_stats(latencies: List[float]) -> LatencyStats:
+    return LatencyStats(
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        max=max(latencies, default=0.0),
+    )
+
+
+def category_report(samples: List[Sample]) -> CategoryReport:
+    return CategoryReport(
+        submissions=len(samples),
+        verdicts=dict(Counter(result.verdict.value for _, result, _ in samples)),
+        latency=latency_stats([latency for _, _, latency in samples]),
+        peak_memory=max((result.peak_memory for _, result, _ in samples), default=0),
+    )
+
+
+async def run_benchmark(
+    concurrency: int,
+    iterations: int,
+    corpus: Optional[List[Submission]] = None,
+    limits: Optional[ExecutionLimits] = None,
+) -> BenchmarkReport:
+    """
+    Runs every submission of the corpus `iterations` times through a pool of `concurrency`
+    sandboxes. Latency is measured from submit to result, so it includes the time spent waiting
+    for a free sandbox.
+    """
+    corpus = corpus or CORPUS
+    jobs = [submission for _ in range(iterations) for submission in corpus]
+    started_at = datetime.now(timezone.utc)
+
+    async def measure(submission: Submission) -> Sample:
+        start = time.perf_counter()
+        result = await pool.submit(submission.code, submission.stdin, limits)
+        return submission, result, time.perf_counter() - start
+
+    async with WorkerPool(size=concurrency) as pool:
+        start = time.perf_counter()
+        samples: List[Sample] = await asyncio.gather(*(measure(submission) for submission in jobs))
+        duration = time.perf_counter() - start
+
+    by_category: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_category.setdefault(sample[0].category, []).append(sample)
+
+    overall = category_report(samples)
+    return BenchmarkReport(
+        started_at=started_at,
+        python_version=platform.python_version(),
+        executor_version=EXECUTOR_VERSION,
+        concurrency=concurrency,
+        iterations=iterations,
+        submissions=len(samples),
+        duration=duration,
+        throughput=len(samples) / duration if duration else 0.0,
+        latency=overall.latency,
+        peak_memory=overall.peak_memory,
+        supervisor_peak_memory=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        categories={category: category_report(x) for category, x in sorted(by_category.items())},
+    )
@@ -0,0 +1,167 @@
+"""
+Session lookup latency of the refresh-token endpoint on a large session table.
+
+Fills the database from DB_URI (or --db-url) with synthetic sessions of one benchmark user,
+times the lookup by token digests against the old lookup by full token text, and deletes
+everything it created.
+
+    cd src && python -m benchmarks.sessions --sessions 1000000 \
+        --output benchmarks/results/sessions.json
+"""
+import argparse
+import asyncio
+import platform
+import random
+import secrets
+import time
+import uuid
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import List
+from typing import Tuple
+
+from pydantic import BaseModel
+from tortoise import Tortoise
+
+import enums
+import models
+from benchmarks.runner import LatencyStats
+from benchmarks.runner import latency_stats
+from core.config import settings
+from core.security import token_digest
+
+BENCHMARK_USER_AGENT = 'benchmarks.sessions'
+# A signed access token with the embedded user is about this long
+TOKEN_LENGTH = 480
+INSERT_CHUNK_SIZE = 10000
+
+Tokens = Tuple[str, str]
+
+
+class SessionLookupReport(BaseModel):
+    started_at: datetime
+    python_version: str
+    database: str
+    sessions: int
+    fill_duration: float
+    digest_lookup: LatencyStats
+    text_lookup: LatencyStats
+
+
+def random_token() -> str:
+    return secrets.token_urlsafe(TOKEN_LENGTH)[:TOKEN_LENGTH]
+
+
+async def fill_sessions(user: models.User, count: int, samples: int) -> List[Tokens]:
+    """Inserts `count` sessions in chunks and returns the tokens of `samples` random ones"""
+    sampled = set(random.sample(range(count), min(samples, count)))
+    tokens = []
+    for start in range(0, count, INSERT_CHUNK_SIZE):
+        sessions = []
+        for number in range(start, min(start + INSERT_CHUNK_SIZE, count)):
+            access_token, refresh_token = random_token(), random_token()
+            if number in sampled:
+                tokens.append((access_token, refresh_token))
+            sessions.append(models.Session(
+                uuid=uuid.uuid4(),
+                user=user,
+                platform=enums.PlatformType.WEB.value,
+                user_agent=BENCHMARK_USER_AGENT,
+                access_token=access_token,
+                refresh_token=refresh_token,
+                access_token_digest=token_digest(access_token),
+                refresh_token_digest=token_digest(refresh_token),
+            ))
+        await models.Session.bulk_create(sessions)
+    return tokens
+
+
+async def time_lookups(tokens: List[Tokens], by_digest: bool) -> List[float]:
+    latencies = []
+    for access_token, refresh_token in tokens:
+        start = time.perf_counter()
+        if by_digest:
+            # What refresh_access_token does, hashing included
+            session = await models.Session.get(
+                access_token_digest=token_digest(access_token),
+                refresh_token_digest=token_digest(refresh_token),
+            )
+        else:
+            session = await models.Session.get(
+                access_token=access_token,
+                refresh_token=refresh_token,
+            )
+        latencies.append(time.perf_counter() - start)
+        assert session.access_token == access_token
+    return latencies
+
+
+async def run_sessions_benchmark(
+        count: int,
+        lookups: int,
+        text_lookups: int
+) -> SessionLookupReport:
+    user = await models.User.create(
+        email=f'{uuid.uuid4().hex}@benchmark.invalid',
+        name=BENCHMARK_USER_AGENT,
+        role=enums.UserRole.STUDENT.value,
+    )
+    try:
+        start = time.perf_counter()
+        tokens = await fill_sessions(user, count, lookups)
+        fill_duration = time.perf_counter() - start
+        connection = Tortoise.get_connection('default')
+        if connection.capabilities.dialect == 'postgres':
+            # Fresh statistics, so the planner sees the real table size
+            await connection.execute_script('ANALYZE "session"')
+
+        digest_latencies = await time_lookups(tokens, by_digest=True)
+        text_latencies = await time_lookups(tokens[:text_lookups], by_digest=False)
+    finally:
+        await models.Session.filter(user_id=user.uuid).delete()
+        await user.delete()
+
+    return SessionLookupReport(
+        started_at=datetime.now(timezone.utc),
+        python_version=platform.python_version(),
+        database=connection.capabilities.dialect,
+        sessions=count,
+        fill_duration=fill_duration,
+        digest_lookup=latency_stats(digest_latencies),
+        text_lookup=latency_stats(text_latencies),
+    )
+
+
+async def run(db_url: str, count: int, lookups: int, text_lookups: int) -> SessionLookupReport:
+    await Tortoise.init(db_url=db_url, modules={'models': ['models']})
+    try:
+        return await run_sessions_benchmark(count, lookups, text_lookups)
+    finally:
+        await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Session lookup latency on a large session table')
+    parser.add_argument('--db-url', default=settings.DB_URI)
+    parser.add_argument('--sessions', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=1000, help='Timed lookups by digest')
+    parser.add_argument(
+        '--text-lookups', type=int, default=20, help='Timed lookups by full token, each one scans'
+    )
+    parser.add_argument('--output', type=Path, help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.db_url, args.sessions, args.lookups, args.text_lookups))
+
+    if args.output is None:
+        print(report.json(indent=2))
+        return
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(report.json(indent=2))
+    for name, stats in (('digest', report.digest_lookup), ('text', report.text_lookup)):
+        print(f'{name}: p50 {stats.p50 * 1000:.2f} ms, p95 {stats.p95 * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
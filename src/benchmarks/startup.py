@@ -0,0 +1,90 @@
+"""
+Cold start latency of every executor backend.
+
+    cd src && python -m benchmarks.startup --runs 20 --output benchmarks/results/startup.json
+"""
+import argparse
+import asyncio
+import platform
+import time
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Dict
+from typing import List
+
+from pydantic import BaseModel
+
+from benchmarks.runner import LatencyStats
+from benchmarks.runner import latency_stats
+from executor import Executor
+from executor import WorkerPool
+from executor.pool import BACKENDS
+
+IN_PROCESS = 'in_process'
+CODE = 'print(1)'
+
+
+class StartupReport(BaseModel):
+    started_at: datetime
+    python_version: str
+    runs: int
+    backends: Dict[str, LatencyStats]
+
+
+async def measure_backend(backend: str, runs: int) -> List[float]:
+    """Time from submit to result with no pre-started worker, so every run pays the full start"""
+    latencies = []
+    for _ in range(runs + 1):
+        pool = WorkerPool(size=1, backend=backend)
+        start = time.perf_counter()
+        await pool.submit(CODE)
+        latencies.append(time.perf_counter() - start)
+        pool.close()
+    # The first run also starts the forkserver, it isn't part of a worker start
+    return latencies[1:]
+
+
+def measure_in_process(runs: int) -> List[float]:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        Executor(CODE).run()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_startup_benchmark(runs: int, backends: List[str]) -> StartupReport:
+    results = {IN_PROCESS: latency_stats(measure_in_process(runs))}
+    for backend in backends:
+        results[backend] = latency_stats(await measure_backend(backend, runs))
+    return StartupReport(
+        started_at=datetime.now(timezone.utc),
+        python_version=platform.python_version(),
+        runs=runs,
+        backends=results,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Cold start latency of the executor backends')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument(
+        '--backend', action='append', choices=BACKENDS, help='Backends to measure, all by default'
+    )
+    parser.add_argument('--output', type=Path, help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    report = asyncio.run(run_startup_benchmark(args.runs, args.backend or list(BACKENDS)))
+
+    if args.output is None:
+        print(report.json(indent=2))
+        return
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(report.json(indent=2))
+    for backend, stats in report.backends.items():
+        print(f'{backend}: p50 {stats.p50 * 1000:.1f} ms, p95 {stats.p95 * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
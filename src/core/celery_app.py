@@ -38,3 +38,16 @@ logging_config.dictConfig(LOGGING)
 celery_app = Celery('studycobra')
 celery_app.config_from_object(settings, namespace="CELERY")
 
+celery_app.conf.beat_schedule = {
+    'sweep-sessions': {
+        'task': 'sweep_sessions',
+        'schedule': settings.SESSION_SWEEP_INTERVAL,
+        # A run that never started is replaced by the next one,
+        # they must not pile up behind a stopped worker
+        'options': {
+            'queue': 'main-queue',
+            'routing_key': 'main-queue',
+            'expires': settings.SESSION_SWEEP_INTERVAL,
+        },
+    },
+}
@@ -93,6 +93,8 @@ class EnvSettings(BaseSettings):
     CELERY_EAGER_PROPAGATES_EXCEPTIONS = True
     CELERY_TASK_SERIALIZER = "json"
     CELERYD_MAX_TASKS_PER_CHILD: int = 1
+    # Busy workers must not hold back messages of other lanes
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = 1
 
     @validator("RABBIT_URL", 'CELERY_BROKER_URL', pre=True)
     def assemble_celery_broker_url(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
@@ -107,6 +109,56 @@ class EnvSettings(BaseSettings):
             values.get("RABBIT_VHOST"),
         )
 
+    # Executor settings
+    EXECUTOR_POOL_SIZE: int = 4
+    EXECUTOR_BACKEND: str = 'process'  # process, namespace
+    EXECUTOR_NAMESPACE_TMPFS_SIZE: int = 16 * 1024 * 1024
+    EXECUTOR_START_METHOD: str = 'forkserver'
+    EXECUTOR_PRELOAD_MODULES: List[str] = [
+        'collections', 'functools', 'heapq', 'itertools', 'math', 're', 'string',
+    ]
+    # Default import allowlist of submissions, every module here is pre-imported in pool workers
+    EXECUTOR_ALLOWED_IMPORTS: List[str] = [
+        'array', 'bisect', 'cmath', 'collections', 'copy', 'dataclasses', 'datetime', 'decimal',
+        'enum', 'fractions', 'functools', 'heapq', 'itertools', 'json', 'math', 'operator',
+        'random', 're', 'statistics', 'string', 'sys', 'time', 'typing',
+    ]
+    EXECUTOR_WALL_TIME_LIMIT: float = 10.0
+    EXECUTOR_CASE_TIME_LIMIT: float = 2.0
+    EXECUTOR_CPU_TIME_LIMIT: float = 5.0
+    EXECUTOR_MEMORY_LIMIT: int = 512 * 1024 * 1024
+    EXECUTOR_OUTPUT_LIMIT: int = 1024 * 1024
+    EXECUTOR_OUTPUT_BUFFER_SIZE: int = 64 * 1024
+    EXECUTOR_OUTPUT_CHUNK_SIZE: int = 4 * 1024
+    EXECUTOR_OUTPUT_CHUNK_INTERVAL: float = 0.2
+    EXECUTOR_OUTPUT_EXCERPT_LENGTH: int = 200
+    EXECUTOR_COMPARE_CHUNK_SIZE: int = 64 * 1024
+    EXECUTOR_FLOAT_TOLERANCE: float = 1e-6
+    EXECUTOR_VERDICT_CACHE_SIZE: int = 10000
+    EXECUTOR_POLICY_CACHE_SIZE: int = 10000
+    EXECUTOR_STAGE_CACHE_SIZE: int = 10000
+    EXECUTOR_FIXTURES_DIR: str = '/tmp/executor-fixtures'
+    EXECUTOR_SHARD_MIN_CASES: int = 10  # smaller suites run in a single worker
+    EXECUTOR_PROFILE_SIZES: List[int] = [64, 128, 256, 512, 1024, 2048]
+    EXECUTOR_PROFILE_TIME_LIMIT: float = 5.0  # per input size
+    EXECUTOR_PROFILE_MAX_OPERATIONS: int = 5_000_000
+    EXECUTOR_PROFILE_REPEATS: int = 3  # timed runs per input size, the fastest one counts
+
+    # Grading settings
+    GRADING_MAX_RETRIES: int = 3
+    GRADING_URGENT_DEADLINE_MINUTES: int = 60
+    REGRADE_CHUNK_SIZE: int = 100
+    REGRADE_QUEUE: str = 'grading-regrade'  # its own worker with a pool sized by the CPU count
+    REGRADE_CONCURRENCY_PER_SANDBOX: int = 2  # answers evaluated at once, per sandbox of the pool
+    PLAGIARISM_KGRAM_SIZE: int = 12  # normalized tokens
+    # Matches of KGRAM_SIZE + WINDOW_SIZE - 1 tokens are always found
+    PLAGIARISM_WINDOW_SIZE: int = 6
+    PLAGIARISM_SIMILARITY_THRESHOLD: float = 0.5
+    # Fingerprints in a larger share of the answers are boilerplate
+    PLAGIARISM_COMMON_FRACTION: float = 0.5
+    PLAGIARISM_COMMON_MIN_ANSWERS: int = 10
+    PLAGIARISM_INDEX_CHUNK_SIZE: int = 500
+
     # Logging
     LOG_DIR: str = 'logs'
 
@@ -126,6 +178,21 @@ class EnvSettings(BaseSettings):
     SSO_AUTH_JWT_ALGORITHMS: Union[List[str], str] = ["HS256"]
     SSO_ACCESS_TOKEN_EXPIRE_MINUTES: int = 48 * 60
     SSO_REFRESH_TOKEN_EXPIRE_MINUTES: int = 30 * 24 * 60
+    SESSION_SWEEP_INTERVAL: float = 15 * 60  # seconds between sweeper runs
+    SESSION_SWEEP_BATCH_SIZE: int = 1000  # rows per DELETE, each one is its own short transaction
+    SESSION_SWEEP_BATCH_PAUSE: float = 0.05  # seconds between batches, leaves room for logins
+    SESSION_SWEEP_MAX_DURATION: float = 60.0  # seconds, the rest waits for the next run
+    # Revoked unexpired sessions before the filter is rebuilt larger
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_CHANNEL: str = 'session_revoked'  # Postgres NOTIFY channel of revocations
+    REVOCATION_SYNC_INTERVAL: float = 300.0  # seconds, full reload for missed notifications
+    TOKEN_CACHE_SIZE: int = 10000  # decoded tokens per process
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60.0  # seconds, how long other processes may see a changed user
+    PASSWORD_HASH_WORKERS: int = 4  # bcrypt threads per process
+    PASSWORD_HASH_MAX_WAITING: int = 64  # requests over it get 503 instead of queueing
+    PASSWORD_HASH_STATS_WINDOW: int = 1000  # latest hashes in the queue time percentiles
 
     @validator("SSO_AUTH_JWT_ALGORITHMS", pre=True)
     def validate_algoritms(cls, v: Union[str, List[str]]) -> List[str]:
@@ -1,16 +1,25 @@
+import asyncio
+import hashlib
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
-from typing import TypeVar, Type
+from typing import Any, Callable, Deque, List, Optional, Tuple, TypeVar, Type
 from uuid import UUID
 
 import jwt
 from fastapi import HTTPException
 from fastapi.security import OAuth2AuthorizationCodeBearer
 from passlib.context import CryptContext
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from starlette import status
 
 import schemas
 from core.config import settings
+from schemas.metrics import PasswordHashingStats
+from schemas.metrics import TokenCacheStats
+from sdk.cache import LRUCache
 
 PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -39,18 +48,111 @@ def create_jwt_token(
     return encoded_jwt
 
 
+def token_digest(token: str) -> str:
+    """ Фиксированной длины, по нему ищутся сессии """
+
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class DecodedTokenCache:
+    """
+    Уже проверенные токены по sha256 от токена: повторный запрос с тем же токеном
+    не проверяет подпись и не валидирует схему заново. Запись живет до exp токена,
+    при выходе из сессии удаляется. Закешированный токен общий для всех запросов,
+    его нельзя изменять
+    """
+
+    def __init__(self, maxsize: int = settings.TOKEN_CACHE_SIZE) -> None:
+        self._entries: LRUCache[str, Tuple[schemas.BaseToken, float, int]] = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return token_digest(token)
+
+    def get(self, token: str, payload_schema: Type[PayloadSchema]) -> Optional[PayloadSchema]:
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is not None and time.time() >= entry[1]:
+            self._entries.pop(key)
+            self.expired += 1
+            entry = None
+        if entry is None or type(entry[0]) is not payload_schema:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def set(self, token: str, payload: schemas.BaseToken) -> None:  # noqa: A003
+        self._entries.set(self.key(token), (payload, payload.exp.timestamp(), _deep_size(payload)))
+
+    def evict(self, token: str) -> None:
+        if self._entries.pop(self.key(token)) is not None:
+            self.evicted += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> TokenCacheStats:
+        lookups = self.hits + self.misses
+        return TokenCacheStats(
+            size=len(self._entries),
+            maxsize=self._entries.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+            expired=self.expired,
+            evicted=self.evicted,
+            memory_bytes=sum(
+                entry[2] + sys.getsizeof(entry) + sys.getsizeof(key)
+                for key, entry in self._entries.items()
+            ),
+        )
+
+
+def _deep_size(value: Any, depth: int = 4) -> int:
+    """ Приблизительный размер объекта вместе с вложенными моделями, словарями и списками """
+
+    size = sys.getsizeof(value)
+    if depth:
+        if isinstance(value, BaseModel):
+            size += _deep_size(value.__dict__, depth - 1)
+        elif isinstance(value, dict):
+            size += sum(
+                _deep_size(k, depth - 1) + _deep_size(v, depth - 1) for k, v in value.items()
+            )
+        elif isinstance(value, (list, tuple, set)):
+            size += sum(_deep_size(x, depth - 1) for x in value)
+    return size
+
+
+token_cache = DecodedTokenCache()
+
+
 def decode_jwt_token(token: str, payload_schema: Type[PayloadSchema], verify: bool = True) -> PayloadSchema:
+    """ Проверенные токены берутся из token_cache, непроверенные не кешируются """
+
+    if verify:
+        cached = token_cache.get(token, payload_schema)
+        if cached is not None:
+            return cached
     try:
         payload = jwt.decode(
             token, settings.SSO_AUTH_JWT_KEY, algorithms=[get_jwt_algorithm()], options={'verify_signature': verify}
         )
         payload.update({'token': token})
-        return payload_schema(**payload)
+        decoded = payload_schema(**payload)
     except (jwt.PyJWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Token invalid or expired.',
         )
+    if verify:
+        token_cache.set(token, decoded)
+    return decoded
 
 
 def create_access_token(user: schemas.UserBase, user_id: UUID, session_id: UUID, expires_in: datetime = None):
@@ -65,7 +167,7 @@ def create_access_token(user: schemas.UserBase, user_id: UUID, session_id: UUID,
         iat=datetime.utcnow(),
         exp=expires,
         sub=str(user_id),
-        user=user.dict(),
+        user=user,  # the instance is reused, a dict would be validated again
         session_id=str(session_id)
     )
     return create_jwt_token(body)
@@ -79,7 +181,7 @@ def create_refresh_token(user: schemas.UserBase, user_id: UUID):
         iat=datetime.utcnow(),
         exp=get_token_expires(expires_delta),
         sub=str(user_id),
-        user=user.dict()
+        user=user
     )
     return create_jwt_token(body)
 
@@ -90,3 +192,82 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return PWD_CONTEXT.hash(password + settings.SECRET_KEY)
+
+
+class PasswordHasher:
+    """
+    bcrypt в ограниченном пуле потоков. bcrypt отпускает GIL, поэтому хеширование
+    не блокирует event loop. Одновременно считается не больше PASSWORD_HASH_WORKERS хешей,
+    остальные запросы ждут своей очереди, а при переполнении очереди сразу получают 503,
+    чтобы волна логинов не съела все соединения и память
+    """
+
+    def __init__(
+            self,
+            workers: int = settings.PASSWORD_HASH_WORKERS,
+            max_waiting: int = settings.PASSWORD_HASH_MAX_WAITING,
+    ) -> None:
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self._queue_times: Deque[float] = deque(maxlen=settings.PASSWORD_HASH_STATS_WINDOW)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def hash(self, password: str) -> str:  # noqa: A003
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Too many login attempts, try again later.',
+                headers={'Retry-After': '1'},
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self._queue_times.append(time.perf_counter() - queued_at)
+
+        self.running += 1
+        try:
+            return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> PasswordHashingStats:
+        queue_times = sorted(self._queue_times)
+        return PasswordHashingStats(
+            workers=self.workers,
+            running=self.running,
+            waiting=self.waiting,
+            completed=self.completed,
+            rejected=self.rejected,
+            queue_time_p50=_percentile(queue_times, 0.5),
+            queue_time_p95=_percentile(queue_times, 0.95),
+            queue_time_max=queue_times[-1] if queue_times else None,
+        )
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+password_hasher = PasswordHasher()
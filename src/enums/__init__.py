@@ -1,3 +1,4 @@
+from enums.executor import *
 from enums.files import *
 from enums.homeworks import *
 from enums.quizzes import *
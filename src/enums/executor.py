@@ -0,0 +1,50 @@
+from enum import Enum
+
+
+class Verdict(str, Enum):
+    OK = 'ok'
+    PASSED = 'passed'
+    FAILED = 'failed'
+    RUNTIME_ERROR = 'runtime_error'
+    FORBIDDEN = 'forbidden'
+    TIMEOUT = 'timeout'
+    CPU_LIMIT_EXCEEDED = 'cpu_limit_exceeded'
+    MEMORY_LIMIT_EXCEEDED = 'memory_limit_exceeded'
+    OUTPUT_LIMIT_EXCEEDED = 'output_limit_exceeded'
+    IMPORT_DENIED = 'import_denied'
+    SKIPPED = 'skipped'
+
+
+class ComplexityClass(str, Enum):
+    """ Ordered from the fastest to the slowest """
+
+    CONSTANT = 'O(1)'
+    LOGARITHMIC = 'O(log n)'
+    LINEAR = 'O(n)'
+    LINEARITHMIC = 'O(n log n)'
+    QUADRATIC = 'O(n^2)'
+    CUBIC = 'O(n^3)'
+
+
+class ComparisonMode(str, Enum):
+    EXACT = 'exact'
+    WHITESPACE = 'whitespace'
+    TOKENS = 'tokens'
+    FLOAT = 'float'
+    UNORDERED_LINES = 'unordered_lines'
+
+
+class GradingStage(str, Enum):
+    """ In the order they run """
+
+    SYNTAX = 'syntax'
+    POLICY = 'policy'
+    LINT = 'lint'
+    TESTS = 'tests'
+    PERFORMANCE = 'performance'
+
+
+class StageStatus(str, Enum):
+    PASSED = 'passed'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'  # a stage it requires has failed
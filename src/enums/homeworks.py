@@ -10,3 +10,28 @@ class DifficultyLevel(int, Enum):
 class HomeworkType(str, Enum):
     DEFAULT = 'default'
     QUIZ = 'quiz'
+
+
+class GradingMode(str, Enum):
+    SCORE = 'score'
+    PASS_FAIL = 'pass_fail'
+
+
+class GradingStatus(str, Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    GRADED = 'graded'
+    FAILED = 'failed'
+
+
+class GradingLane(str, Enum):
+    URGENT = 'grading-urgent'
+    DEFAULT = 'grading-default'
+    BULK = 'grading-bulk'
+
+
+class RegradeStatus(str, Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    FAILED = 'failed'
@@ -0,0 +1,14 @@
+# flake8: noqa
+from executor.batch import BatchRunner, run_batch
+from executor.cache import VerdictCache, verdict_cache
+from executor.fixtures import FixtureStore, fixture_store
+from executor.imports import ImportPolicy, import_policy
+from executor.lint import lint
+from executor.pipeline import Pipeline, Stage, StageCache, StageOutcome, STATIC_STAGES, stage_cache
+from executor.policy import CodePolicy, code_policy
+from executor.pool import WorkerPool, get_pool
+from executor.profiling import fit_complexity, is_slower
+from executor.sandbox import Executor, ForbiddenError
+from executor.schemas import ComplexityProfile, ExecutionLimits, ExecutionResult, GradingReport
+from executor.schemas import LintIssue, PolicyViolation, PoolStats, ProfileSample, StageResult
+from executor.schemas import TestCase, TestCaseResult
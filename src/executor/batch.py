@@ -0,0 +1,97 @@
+from typing import List
+
+import enums
+from core.config import settings
+from executor.compare import Source
+from executor.compare import comparator_for
+from executor.fixtures import fixture_store
+from executor.imports import import_policy
+from executor.sandbox import describe_error
+from executor.sandbox import execute_in_scope
+from executor.schemas import ExecutionLimits
+from executor.schemas import TestCase
+from executor.schemas import TestCaseResult
+
+
+class BatchRunner:
+	"""Compiles a submission once and runs it against many test cases with isolated globals"""
+
+	def __init__(self, code: str):
+		self.code = code
+		self.compile_error = None
+		try:
+			self.compiled = compile(code, '<submission>', 'exec')
+		except (SyntaxError, ValueError) as e:
+			self.compiled = None
+			self.compile_error = describe_error(e)
+
+	def run(
+		self,
+		test_cases: List[TestCase],
+		limits: ExecutionLimits,
+		stop_on_failure: bool = False,
+	) -> List[TestCaseResult]:
+		"""With `stop_on_failure` the cases after the first failed one are reported as skipped"""
+		results = []
+		for case in test_cases:
+			if stop_on_failure and results and results[-1].verdict != enums.Verdict.PASSED:
+				results.append(TestCaseResult(id=case.id, verdict=enums.Verdict.SKIPPED))
+			else:
+				results.append(self.run_case(case, limits))
+		return results
+
+	def run_case(self, case: TestCase, limits: ExecutionLimits) -> TestCaseResult:
+		if self.compiled is None:
+			return TestCaseResult(id=case.id, verdict=enums.Verdict.RUNTIME_ERROR, error=self.compile_error)
+
+		stdin, expected_output = case.stdin, case.expected_output
+		if case.fixtures is not None:
+			fixtures = fixture_store.open(case.fixtures)
+			stdin, expected_output = fixtures.open_stdin(case.id), fixtures.expected_output(case.id)
+
+		# The output is compared while it is printed, the captured tail is only the excerpt
+		comparator = comparator_for(expected_output, case.comparison, case.tolerance)
+		result = execute_in_scope(
+			self.compiled,
+			stdin,
+			output_limits(limits, expected_output),
+			wall_time=case.timeout or limits.case_time,
+			imports=import_policy(case.allowed_imports),
+			sink=comparator.feed,
+		)
+		verdict, mismatch = result.verdict, None
+		if verdict == enums.Verdict.OK:
+			mismatch = comparator.finish()
+			verdict = enums.Verdict.FAILED if mismatch else enums.Verdict.PASSED
+		return TestCaseResult(
+			id=case.id,
+			verdict=verdict,
+			duration=result.duration,
+			cpu_time=result.cpu_time,
+			peak_memory=result.peak_memory,
+			output=result.stdout[:settings.EXECUTOR_OUTPUT_EXCERPT_LENGTH],
+			error=result.error,
+			mismatch=mismatch,
+		)
+
+
+def output_limits(limits: ExecutionLimits, expected_output: Source) -> ExecutionLimits:
+	"""The output limit never stops a correct answer, however long the expected output is"""
+	if limits.output is None:
+		return limits
+	if isinstance(expected_output, memoryview):
+		expected_size = len(expected_output)
+	else:
+		expected_size = len(expected_output.encode())
+	if 2 * expected_size <= limits.output:
+		return limits
+	return limits.copy(update={'output': 2 * expected_size})
+
+
+def run_batch(
+	code: str,
+	test_cases: List[TestCase],
+	limits: ExecutionLimits,
+	stop_on_failure: bool = False,
+) -> List[TestCaseResult]:
+	return BatchRunner(code).run(test_cases, limits, stop_on_failure)
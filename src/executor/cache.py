@@ -0,0 +1,121 @@
+import ast
+import hashlib
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import enums
+from core.config import settings
+from executor.sandbox import EXECUTOR_VERSION
+from executor.schemas import ExecutionLimits
+from executor.schemas import TestCase
+from executor.schemas import TestCaseResult
+from sdk.cache import CacheStats
+from sdk.cache import LRUCache
+
+BatchRunnerType = Callable[[str, List[TestCase], ExecutionLimits], Awaitable[List[TestCaseResult]]]
+
+# Verdicts that depend on machine load or on how the suite was run rather than on the code itself
+UNSTABLE_VERDICTS = {enums.Verdict.TIMEOUT, enums.Verdict.SKIPPED}
+
+
+def submission_digest(code: str) -> str:
+	"""Hash of the normalized AST, so comments and formatting don't produce a new key"""
+	try:
+		normalized = ast.dump(ast.parse(code), annotate_fields=False, include_attributes=False)
+	except (SyntaxError, ValueError):
+		normalized = '\n'.join(line.rstrip() for line in code.strip().splitlines())
+	return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def suite_version(test_cases: List[TestCase]) -> str:
+	"""Content hash of a test suite, changes whenever any case is added, removed or edited"""
+	digest = hashlib.sha256()
+	for case in test_cases:
+		digest.update(case.json().encode())
+	return digest.hexdigest()
+
+
+class VerdictCache:
+	"""
+	Per-test results of already graded submissions.
+	Keyed by homework and a hash of the submission AST, test suite version, limits
+	and executor version.
+	"""
+
+	def __init__(self, maxsize: int = settings.EXECUTOR_VERDICT_CACHE_SIZE):
+		self._entries: LRUCache[Tuple[str, str], List[TestCaseResult]] = LRUCache(maxsize)
+		self._suite_versions: Dict[str, str] = {}
+
+	def key(
+		self,
+		homework_id: str,
+		code: str,
+		version: str,
+		limits: ExecutionLimits,
+	) -> Tuple[str, str]:
+		material = f'{EXECUTOR_VERSION}:{version}:{limits.json()}:{submission_digest(code)}'
+		return homework_id, hashlib.sha256(material.encode()).hexdigest()
+
+	def get(
+		self,
+		homework_id: str,
+		code: str,
+		test_cases: List[TestCase],
+		limits: ExecutionLimits,
+	) -> Optional[List[TestCaseResult]]:
+		version = self._track_version(homework_id, test_cases)
+		return self._entries.get(self.key(homework_id, code, version, limits))
+
+	def put(
+		self,
+		homework_id: str,
+		code: str,
+		test_cases: List[TestCase],
+		limits: ExecutionLimits,
+		results: List[TestCaseResult],
+	) -> None:
+		if any(result.verdict in UNSTABLE_VERDICTS for result in results):
+			return
+		version = self._track_version(homework_id, test_cases)
+		self._entries.set(self.key(homework_id, code, version, limits), results)
+
+	async def run_batch(
+		self,
+		homework_id: str,
+		code: str,
+		test_cases: List[TestCase],
+		limits: Optional[ExecutionLimits],
+		runner: BatchRunnerType,
+	) -> List[TestCaseResult]:
+		"""Returns stored results on a hit, otherwise grades with `runner` and remembers the outcome"""
+		limits = limits or ExecutionLimits()
+		cached = self.get(homework_id, code, test_cases, limits)
+		if cached is not None:
+			return cached
+
+		results = await runner(code, test_cases, limits)
+		self.put(homework_id, code, test_cases, limits, results)
+		return results
+
+	def invalidate(self, homework_id: str) -> None:
+		self._suite_versions.pop(homework_id, None)
+		for key in self._entries.keys():
+			if key[0] == homework_id:
+				self._entries.pop(key)
+
+	def stats(self) -> CacheStats:
+		return self._entries.stats()
+
+	def _track_version(self, homework_id: str, test_cases: List[TestCase]) -> str:
+		version = suite_version(test_cases)
+		if self._suite_versions.get(homework_id) not in (None, version):
+			self.invalidate(homework_id)
+		self._suite_versions[homework_id] = version
+		return version
+
+
+verdict_cache = VerdictCache()
@@ -0,0 +1,117 @@
+import io
+import time
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from core.config import settings
+from executor.limits import OutputLimitExceeded
+
+ChunkCallback = Callable[[str], None]
+
+
+class OutputCapture(io.TextIOBase):
+	"""
+	Replacement for sys.stdout of a submission.
+	Keeps only the last `budget` bytes in a fixed-size ring buffer, so memory stays bounded however
+	much is printed, stops the run once `limit` bytes were printed and optionally hands out chunks
+	through `on_chunk` while the code is still running.
+	The buffer is only good for excerpts, whoever needs the whole output, like a comparator,
+	gets every byte of it through `sink` in pieces of about `sink_chunk_size` bytes.
+	"""
+
+	def __init__(
+		self,
+		budget: int = settings.EXECUTOR_OUTPUT_BUFFER_SIZE,
+		limit: Optional[int] = None,
+		on_chunk: Optional[ChunkCallback] = None,
+		chunk_size: int = settings.EXECUTOR_OUTPUT_CHUNK_SIZE,
+		chunk_interval: float = settings.EXECUTOR_OUTPUT_CHUNK_INTERVAL,
+		sink: Optional[ChunkCallback] = None,
+		sink_chunk_size: int = settings.EXECUTOR_COMPARE_CHUNK_SIZE,
+	):
+		super().__init__()
+		self.budget = budget
+		self.limit = limit
+		self.total_bytes = 0
+		self.on_chunk = on_chunk
+		self.chunk_size = chunk_size
+		self.chunk_interval = chunk_interval
+		self._buffer = bytearray()
+		self._head = 0
+		self._pending: List[str] = []
+		self._pending_bytes = 0
+		self._flushed_at = time.monotonic()
+		self.sink = sink
+		self.sink_chunk_size = sink_chunk_size
+		self._sink_pending: List[str] = []
+		self._sink_pending_bytes = 0
+
+	@property
+	def truncated(self) -> bool:
+		return self.total_bytes > self.budget
+
+	def writable(self) -> bool:
+		return True
+
+	def write(self, s: str) -> int:
+		data = s.encode('utf-8', 'surrogatepass')
+		if self.limit is not None and self.total_bytes + len(data) > self.limit:
+			raise OutputLimitExceeded(f'Output limit of {self.limit} bytes exceeded')
+		self.total_bytes += len(data)
+		self._store(data)
+
+		if self.sink is not None:
+			self._sink_pending.append(s)
+			self._sink_pending_bytes += len(data)
+			if self._sink_pending_bytes >= self.sink_chunk_size:
+				self._feed_sink()
+		if self.on_chunk is not None:
+			self._pending.append(s)
+			self._pending_bytes += len(data)
+			if (
+				self._pending_bytes >= self.chunk_size
+				or time.monotonic() - self._flushed_at >= self.chunk_interval
+			):
+				self.flush()
+		return len(s)
+
+	def flush(self) -> None:
+		if self._pending and self.on_chunk is not None:
+			chunk = ''.join(self._pending)
+			self._pending, self._pending_bytes = [], 0
+			self.on_chunk(chunk)
+		self._flushed_at = time.monotonic()
+		self._feed_sink()
+
+	def _feed_sink(self) -> None:
+		if self._sink_pending and self.sink is not None:
+			chunk = ''.join(self._sink_pending)
+			self._sink_pending, self._sink_pending_bytes = [], 0
+			self.sink(chunk)
+
+	def getvalue(self) -> str:
+		data = bytes(self._buffer[self._head:] + self._buffer[:self._head])
+		# The oldest byte may be in the middle of a multibyte character after wrapping
+		return data.decode('utf-8', 'ignore' if self.truncated else 'surrogatepass')
+
+	def _store(self, data: bytes) -> None:
+		room = self.budget - len(self._buffer)
+		if room > 0:
+			self._buffer += data[:room]
+			data = data[room:]
+		if not data:
+			return
+
+		if len(data) >= self.budget:
+			self._buffer[:] = data[-self.budget:]
+			self._head = 0
+			return
+		end = self._head + len(data)
+		if end <= self.budget:
+			self._buffer[self._head:end] = data
+		else:
+			split = self.budget - self._head
+			self._buffer[self._head:] = data[:split]
+			self._buffer[:end - self.budget] = data[split:]
+		self._head = end % self.budget
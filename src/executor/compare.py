@@ -0,0 +1,375 @@
+import codecs
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import enums
+from core.config import settings
+from executor.schemas import Mismatch
+
+Source = Union[str, memoryview]
+
+# Characters of each side shown around the first difference
+EXCERPT_LENGTH = 40
+
+TOKEN = re.compile(r'\S+')
+
+# Shown to students in the feedback
+END_OF_OUTPUT = '<конец вывода>'
+MISSING_LINE = '<строки нет>'
+
+
+def chunks(source: Source, size: Optional[int] = None) -> Iterator[str]:
+	"""Text of `source` piece by piece, a memory-mapped source is decoded one chunk at a time"""
+	size = size or settings.EXECUTOR_COMPARE_CHUNK_SIZE
+	if isinstance(source, str):
+		for start in range(0, len(source), size):
+			yield source[start:start + size]
+		return
+	decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+	for start in range(0, len(source), size):
+		yield decoder.decode(source[start:start + size])
+	yield decoder.decode(b'', final=True)
+
+
+class LineSplitter:
+	"""
+	Splits text fed in pieces of any size into lines without line breaks,
+	memory is bounded by the longest line
+	"""
+
+	def __init__(self):
+		self.pending = ''
+
+	def feed(self, chunk: str) -> List[str]:
+		parts = (self.pending + chunk).split('\n')
+		self.pending = parts.pop()
+		return parts
+
+	def close(self) -> List[str]:
+		rest, self.pending = self.pending, ''
+		return [rest] if rest else []
+
+
+class LineNormalizer:
+	"""Numbers lines and collapses their whitespace, leading blank lines are skipped"""
+
+	def __init__(self):
+		self.number = 0
+		self.started = False
+
+	def normalize(self, lines: List[str]) -> List[Tuple[int, str]]:
+		normalized = []
+		for line in lines:
+			self.number += 1
+			line = ' '.join(line.split())
+			self.started = self.started or bool(line)
+			if self.started:
+				normalized.append((self.number, line))
+		return normalized
+
+
+class TokenSplitter:
+	"""
+	Whitespace separated tokens with their line numbers,
+	a token may span the pieces the text is fed in
+	"""
+
+	def __init__(self):
+		self.line = 1
+		self.pending = ''
+		self.pending_line = 1
+
+	def feed(self, chunk: str) -> List[Tuple[int, str]]:
+		found = []
+		position = 0
+		for match in TOKEN.finditer(chunk):
+			if self.pending and match.start() > 0:
+				found.append((self.pending_line, self.pending))
+				self.pending = ''
+			self.line += chunk.count('\n', position, match.start())
+			if not self.pending:
+				self.pending_line = self.line
+			self.pending += match.group()
+			position = match.end()
+		if position < len(chunk):
+			if self.pending:
+				found.append((self.pending_line, self.pending))
+				self.pending = ''
+			self.line += chunk.count('\n', position)
+		return found
+
+	def close(self) -> List[Tuple[int, str]]:
+		rest, self.pending = self.pending, ''
+		return [(self.pending_line, rest)] if rest else []
+
+
+def lines(source: Source) -> Iterator[str]:
+	"""Lines without line breaks, memory is bounded by the longest line"""
+	splitter = LineSplitter()
+	for chunk in chunks(source):
+		yield from splitter.feed(chunk)
+	yield from splitter.close()
+
+
+def tokens(source: Source) -> Iterator[Tuple[int, str]]:
+	"""Whitespace separated tokens with their line numbers"""
+	splitter = TokenSplitter()
+	for chunk in chunks(source):
+		yield from splitter.feed(chunk)
+	yield from splitter.close()
+
+
+def _normalized_lines(source: Source) -> Iterator[Tuple[int, str]]:
+	normalizer = LineNormalizer()
+	for line in lines(source):
+		yield from normalizer.normalize([line])
+
+
+def excerpt(text: Optional[str]) -> str:
+	if text is None:
+		return END_OF_OUTPUT
+	return text if len(text) <= EXCERPT_LENGTH else text[:EXCERPT_LENGTH] + '…'
+
+
+class StreamComparator:
+	"""
+	Compares the actual output, fed piece by piece while the submission prints it,
+	with the expected output, which is read only as far as needed.
+	Whatever is fed after the first difference is ignored.
+	"""
+
+	def __init__(self):
+		self.mismatch: Optional[Mismatch] = None
+		self.finished = False
+
+	def feed(self, chunk: str) -> None:
+		if self.mismatch is None and chunk:
+			self.mismatch = self._feed(chunk)
+
+	def finish(self) -> Optional[Mismatch]:
+		"""Call once the output is complete, None means both outputs match"""
+		if self.mismatch is None and not self.finished:
+			self.mismatch = self._finish()
+		self.finished = True
+		return self.mismatch
+
+	def _feed(self, chunk: str) -> Optional[Mismatch]:
+		raise NotImplementedError
+
+	def _finish(self) -> Optional[Mismatch]:
+		raise NotImplementedError
+
+
+class ExactComparator(StreamComparator):
+
+	def __init__(self, expected: Source):
+		super().__init__()
+		self.expected_chunks = chunks(expected)
+		self.expected_buffer = ''
+		self.line = 1
+		self.line_prefix = ''
+
+	def _feed(self, chunk: str) -> Optional[Mismatch]:
+		while chunk:
+			self._fill_expected()
+			size = min(len(chunk), len(self.expected_buffer))
+			if not size or chunk[:size] != self.expected_buffer[:size]:
+				return self._mismatch(chunk, size)
+			matched = chunk[:size]
+			self.line += matched.count('\n')
+			self.line_prefix = matched.rpartition('\n')[2] if '\n' in matched else self.line_prefix + matched
+			self.line_prefix = self.line_prefix[-EXCERPT_LENGTH:]
+			chunk, self.expected_buffer = chunk[size:], self.expected_buffer[size:]
+		return None
+
+	def _finish(self) -> Optional[Mismatch]:
+		self._fill_expected()
+		return self._mismatch('', 0) if self.expected_buffer else None
+
+	def _fill_expected(self) -> None:
+		while not self.expected_buffer:
+			chunk = next(self.expected_chunks, None)
+			if chunk is None:
+				return
+			self.expected_buffer = chunk
+
+	def _mismatch(self, chunk: str, size: int) -> Mismatch:
+		offset = next((i for i in range(size) if chunk[i] != self.expected_buffer[i]), size)
+		head = chunk[:offset]
+		line_head = head.rpartition('\n')[2] if '\n' in head else self.line_prefix + head
+		prefix = line_head[-(EXCERPT_LENGTH // 2):]
+		return Mismatch(
+			line=self.line + head.count('\n'),
+			expected=excerpt(prefix + _rest_of_line(self.expected_buffer[offset:])),
+			actual=excerpt(prefix + _rest_of_line(chunk[offset:])),
+		)
+
+
+def _rest_of_line(buffer: str) -> str:
+	return buffer.partition('\n')[0] if buffer else END_OF_OUTPUT
+
+
+class NormalizedLinesComparator(StreamComparator):
+
+	def __init__(self, expected: Source):
+		super().__init__()
+		self.expected = _normalized_lines(expected)
+		self.splitter = LineSplitter()
+		self.normalizer = LineNormalizer()
+
+	def _feed(self, chunk: str) -> Optional[Mismatch]:
+		return self._compare(self.normalizer.normalize(self.splitter.feed(chunk)))
+
+	def _finish(self) -> Optional[Mismatch]:
+		mismatch = self._compare(self.normalizer.normalize(self.splitter.close()))
+		if mismatch is not None:
+			return mismatch
+		# Trailing blank lines of the expected output don't count
+		for expected_number, expected_line in self.expected:
+			if expected_line:
+				return Mismatch(line=expected_number, expected=excerpt(expected_line), actual=excerpt(None))
+		return None
+
+	def _compare(self, actual_lines: List[Tuple[int, str]]) -> Optional[Mismatch]:
+		for actual_number, actual_line in actual_lines:
+			expected_number, expected_line = next(self.expected, (None, None))
+			if actual_line == expected_line:
+				continue
+			# Trailing blank lines on either side don't count
+			if not actual_line and not expected_line:
+				continue
+			return Mismatch(
+				line=actual_number or expected_number,
+				expected=excerpt(expected_line),
+				actual=excerpt(actual_line),
+			)
+		return None
+
+
+class TokensComparator(StreamComparator):
+
+	def __init__(self, expected: Source, tolerance: Optional[float]):
+		super().__init__()
+		self.expected = tokens(expected)
+		self.tolerance = tolerance
+		self.splitter = TokenSplitter()
+
+	def _feed(self, chunk: str) -> Optional[Mismatch]:
+		return self._compare(self.splitter.feed(chunk))
+
+	def _finish(self) -> Optional[Mismatch]:
+		mismatch = self._compare(self.splitter.close())
+		if mismatch is not None:
+			return mismatch
+		expected_line, expected_token = next(self.expected, (None, None))
+		if expected_token is None:
+			return None
+		return Mismatch(line=expected_line, expected=excerpt(expected_token), actual=excerpt(None))
+
+	def _compare(self, actual_tokens: List[Tuple[int, str]]) -> Optional[Mismatch]:
+		for actual_line, actual_token in actual_tokens:
+			expected_line, expected_token = next(self.expected, (None, None))
+			if expected_token is None or not _tokens_equal(actual_token, expected_token, self.tolerance):
+				return Mismatch(
+					line=actual_line,
+					expected=excerpt(expected_token),
+					actual=excerpt(actual_token),
+				)
+		return None
+
+
+def _tokens_equal(actual: str, expected: str, tolerance: Optional[float]) -> bool:
+	if actual == expected:
+		return True
+	if tolerance is None:
+		return False
+	try:
+		actual_value, expected_value = float(actual), float(expected)
+	except ValueError:
+		return False
+	return math.isclose(actual_value, expected_value, rel_tol=tolerance, abs_tol=tolerance)
+
+
+class UnorderedLinesComparator(StreamComparator):
+	"""
+	Lines as a multiset. Only fixed-size digests of lines are counted,
+	memory grows with the number of distinct lines but not with their length.
+	"""
+
+	def __init__(self, expected: Source):
+		super().__init__()
+		self.counts: Counter = Counter()
+		self.samples: Dict[bytes, Tuple[int, str]] = {}
+		self.splitter = LineSplitter()
+		self.normalizer = LineNormalizer()
+		for number, line in _normalized_lines(expected):
+			self._count(number, line, 1)
+
+	def _feed(self, chunk: str) -> Optional[Mismatch]:
+		for number, line in self.normalizer.normalize(self.splitter.feed(chunk)):
+			self._count(number, line, -1)
+		return None
+
+	def _finish(self) -> Optional[Mismatch]:
+		for number, line in self.normalizer.normalize(self.splitter.close()):
+			self._count(number, line, -1)
+		for digest, count in self.counts.items():
+			if count:
+				number, line = self.samples[digest]
+				return Mismatch(
+					line=number,
+					expected=excerpt(line) if count > 0 else MISSING_LINE,
+					actual=excerpt(line) if count < 0 else MISSING_LINE,
+				)
+		return None
+
+	def _count(self, number: int, line: str, sign: int) -> None:
+		if not line:
+			return
+		digest = hashlib.blake2b(line.encode(), digest_size=16).digest()
+		self.counts[digest] += sign
+		self.samples.setdefault(digest, (number, line[:EXCERPT_LENGTH + 1]))
+
+
+def comparator_for(
+	expected: Source,
+	mode: enums.ComparisonMode = enums.ComparisonMode.WHITESPACE,
+	tolerance: float = settings.EXECUTOR_FLOAT_TOLERANCE,
+) -> StreamComparator:
+	if mode == enums.ComparisonMode.EXACT:
+		return ExactComparator(expected)
+	if mode == enums.ComparisonMode.WHITESPACE:
+		return NormalizedLinesComparator(expected)
+	if mode == enums.ComparisonMode.TOKENS:
+		return TokensComparator(expected, None)
+	if mode == enums.ComparisonMode.FLOAT:
+		return TokensComparator(expected, tolerance)
+	if mode == enums.ComparisonMode.UNORDERED_LINES:
+		return UnorderedLinesComparator(expected)
+	raise ValueError(f'Unknown comparison mode {mode!r}')
+
+
+def compare(
+	actual: Source,
+	expected: Source,
+	mode: enums.ComparisonMode = enums.ComparisonMode.WHITESPACE,
+	tolerance: float = settings.EXECUTOR_FLOAT_TOLERANCE,
+) -> Optional[Mismatch]:
+	"""
+	Compares two complete outputs chunk by chunk and stops at the first difference,
+	None means they match
+	"""
+	comparator = comparator_for(expected, mode, tolerance)
+	for chunk in chunks(actual):
+		comparator.feed(chunk)
+		if comparator.mismatch is not None:
+			break
+	return comparator.finish()
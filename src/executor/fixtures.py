@@ -0,0 +1,131 @@
+import io
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from core.config import settings
+from executor.cache import suite_version
+from executor.schemas import TestCase
+
+MAGIC = b'SCFX'
+FORMAT_VERSION = 1
+
+# magic, format version, number of cases
+HEADER = struct.Struct('<4sII')
+# case id, stdin offset and length, expected output offset and length
+ENTRY = struct.Struct('<64sQQQQ')
+
+
+class MemoryReader(io.RawIOBase):
+	"""Raw stream over a memoryview, reads copy only the requested chunk"""
+
+	def __init__(self, view: memoryview):
+		self.view = view
+		self.position = 0
+
+	def readable(self) -> bool:
+		return True
+
+	def readinto(self, buffer) -> int:
+		size = min(len(buffer), len(self.view) - self.position)
+		buffer[:size] = self.view[self.position:self.position + size]
+		self.position += size
+		return size
+
+
+class FixtureFile:
+	"""
+	Read-only memory-mapped test data of one suite version.
+	Every process maps the same file, so the page cache keeps a single copy for the whole node.
+	"""
+
+	def __init__(self, path: str):
+		with open(path, 'rb') as f:
+			self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		self._view = memoryview(self._mmap)
+
+		magic, version, count = HEADER.unpack_from(self._mmap, 0)
+		if magic != MAGIC or version != FORMAT_VERSION:
+			raise ValueError(f'{path} is not a fixture file of version {FORMAT_VERSION}')
+
+		self._index: Dict[str, Tuple[int, int, int, int]] = {}
+		for number in range(count):
+			case_id, *offsets = ENTRY.unpack_from(self._mmap, HEADER.size + number * ENTRY.size)
+			self._index[case_id.rstrip(b'\0').decode()] = tuple(offsets)
+
+	def __contains__(self, case_id: str) -> bool:
+		return case_id in self._index
+
+	def stdin(self, case_id: str) -> memoryview:
+		offset, length, _, _ = self._index[case_id]
+		return self._view[offset:offset + length]
+
+	def expected_output(self, case_id: str) -> memoryview:
+		_, _, offset, length = self._index[case_id]
+		return self._view[offset:offset + length]
+
+	def open_stdin(self, case_id: str) -> io.TextIOWrapper:
+		return io.TextIOWrapper(io.BufferedReader(MemoryReader(self.stdin(case_id))), encoding='utf-8')
+
+
+class FixtureStore:
+	"""
+	Test data of every homework on this node, one file per suite version:
+	<root>/<homework_id>/<suite version>.fixtures
+	"""
+
+	def __init__(self, root: str = settings.EXECUTOR_FIXTURES_DIR):
+		self.root = Path(root)
+		self._files: Dict[str, FixtureFile] = {}
+
+	def path(self, homework_id: str, version: str) -> Path:
+		return self.root / homework_id / f'{version}.fixtures'
+
+	def build(self, homework_id: str, test_cases: List[TestCase]) -> Path:
+		"""Writes the suite once per version, concurrent builders race harmlessly on an atomic rename"""
+		path = self.path(homework_id, suite_version(test_cases))
+		if path.exists():
+			return path
+
+		path.parent.mkdir(parents=True, exist_ok=True)
+		blobs = [(case.stdin.encode(), case.expected_output.encode()) for case in test_cases]
+		offset = HEADER.size + ENTRY.size * len(test_cases)
+		fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+		with os.fdopen(fd, 'wb') as f:
+			f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(test_cases)))
+			for case, (stdin, expected_output) in zip(test_cases, blobs):
+				f.write(ENTRY.pack(
+					case.id.encode(), offset, len(stdin), offset + len(stdin), len(expected_output)
+				))
+				offset += len(stdin) + len(expected_output)
+			for stdin, expected_output in blobs:
+				f.write(stdin)
+				f.write(expected_output)
+		os.replace(tmp_path, path)
+
+		# Processes that still map an old version keep reading it after the unlink
+		for stale in path.parent.glob('*.fixtures'):
+			if stale != path:
+				stale.unlink(missing_ok=True)
+		return path
+
+	def attach(self, homework_id: str, test_cases: List[TestCase]) -> List[TestCase]:
+		"""Stores the suite and returns light cases that only point to it, cheap to send to workers"""
+		path = str(self.build(homework_id, test_cases))
+		return [
+			case.copy(update={'stdin': '', 'expected_output': '', 'fixtures': path})
+			for case in test_cases
+		]
+
+	def open(self, path: str) -> FixtureFile:  # noqa: A003
+		if path not in self._files:
+			self._files[path] = FixtureFile(path)
+		return self._files[path]
+
+
+fixture_store = FixtureStore()
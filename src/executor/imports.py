@@ -0,0 +1,111 @@
+import builtins
+import sys
+from functools import lru_cache
+from types import ModuleType
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import Optional
+
+import enums
+from core.config import settings
+from executor.limits import LimitExceeded
+from executor.policy import FORBIDDEN_MODULES
+
+# Never loaded into a sandbox worker, whoever asks for them
+UNLOADABLE_MODULES = FORBIDDEN_MODULES | {'_ctypes', '_posixsubprocess', '_socket', 'pty'}
+
+# Imported lazily from C code of allowed modules, e.g. by datetime.strptime,
+# on the submission's behalf
+IMPLICIT_IMPORTS = frozenset({'_strptime'})
+
+_import = builtins.__import__
+
+
+class ImportDenied(LimitExceeded):
+	verdict = enums.Verdict.IMPORT_DENIED
+
+
+# Plain values and functions of sys a submission may use, none of them reaches other modules
+SUBMISSION_SYS_ATTRIBUTES = (
+	'byteorder', 'exit', 'float_info', 'getrecursionlimit', 'int_info', 'maxsize', 'setrecursionlimit',
+	'version', 'version_info',
+)
+
+
+class SubmissionSys(ModuleType):
+	"""
+	What a submission gets for `import sys`: the standard streams, the recursion limit
+	and a few constants.
+	The real sys reaches every loaded module through sys.modules, settings included.
+	"""
+
+	def __init__(self):
+		super().__init__('sys')
+		for name in SUBMISSION_SYS_ATTRIBUTES:
+			setattr(self, name, getattr(sys, name))
+
+	# Streams are looked up on every access, runs redirect them
+	stdin = property(lambda self: sys.stdin)
+	stdout = property(lambda self: sys.stdout)
+	stderr = property(lambda self: sys.stderr)
+
+
+# Modules a submission imports as a restricted stand-in
+SUBSTITUTE_MODULES: Dict[str, ModuleType] = {'sys': SubmissionSys()}
+
+
+class ImportPolicy:
+	"""Allowlist of top-level modules a submission may import, decisions are memoized"""
+
+	def __init__(self, allowed: FrozenSet[str]):
+		self.allowed = allowed
+		self._decisions: Dict[str, bool] = {}
+
+	def is_allowed(self, name: str) -> bool:
+		decision = self._decisions.get(name)
+		if decision is None:
+			decision = name in IMPLICIT_IMPORTS or name.partition('.')[0] in self.allowed
+			self._decisions[name] = decision
+		return decision
+
+	def check(self, name: str) -> None:
+		if not self.is_allowed(name):
+			raise ImportDenied(f'Import of module {name!r} is not allowed')
+
+	def guarded_import(self, name, globals=None, locals=None, fromlist=(), level=0):  # noqa: A002
+		"""Replaces __import__ in the submission builtins, imports made by library code aren't affected"""
+		if level:
+			raise ImportDenied('Relative imports are not allowed')
+		self.check(name)
+		substitute = SUBSTITUTE_MODULES.get(name)
+		if substitute is not None:
+			return substitute
+		return _import(name, globals, locals, fromlist, level)
+
+
+@lru_cache(maxsize=None)
+def _policy(allowed: FrozenSet[str]) -> ImportPolicy:
+	return ImportPolicy(allowed)
+
+
+def import_policy(allowed: Optional[Iterable[str]] = None) -> ImportPolicy:
+	"""Shared policy per allowlist, so its memoized decisions survive between runs"""
+	return _policy(frozenset(settings.EXECUTOR_ALLOWED_IMPORTS if allowed is None else allowed))
+
+
+class ImportGuard:
+	"""
+	sys.meta_path finder that refuses to load dangerous modules at all.
+	Second line of defence for loads that bypass the submission's __import__.
+	"""
+
+	def find_spec(self, fullname, path=None, target=None):
+		if fullname.partition('.')[0] in UNLOADABLE_MODULES:
+			raise ImportDenied(f'Import of module {fullname!r} is not allowed')
+		return None
+
+	@classmethod
+	def install(cls) -> None:
+		if not any(isinstance(finder, cls) for finder in sys.meta_path):
+			sys.meta_path.insert(0, cls())
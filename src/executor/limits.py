@@ -0,0 +1,113 @@
+import math
+import resource
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from typing import Optional
+from typing import Type
+
+import enums
+from executor.schemas import ExecutionLimits
+
+
+class LimitExceeded(BaseException):
+	"""
+	Raised inside the submission when a limit is hit.
+	BaseException so `except Exception` in student code can't swallow it.
+	"""
+
+	verdict = enums.Verdict.RUNTIME_ERROR
+
+
+class CaseTimeout(LimitExceeded):
+	verdict = enums.Verdict.TIMEOUT
+
+
+class CpuLimitExceeded(LimitExceeded):
+	verdict = enums.Verdict.CPU_LIMIT_EXCEEDED
+
+
+class OutputLimitExceeded(LimitExceeded):
+	verdict = enums.Verdict.OUTPUT_LIMIT_EXCEEDED
+
+
+_TIMERS = {
+	CaseTimeout: (signal.ITIMER_REAL, signal.SIGALRM, 'Wall time'),
+	CpuLimitExceeded: (signal.ITIMER_PROF, signal.SIGPROF, 'CPU time'),
+}
+
+
+@contextmanager
+def deadline(
+	seconds: Optional[float],
+	exc_class: Type[LimitExceeded] = CaseTimeout,
+) -> Iterator[None]:
+	"""
+	Interrupt the current code after `seconds` of wall or CPU time.
+	Signals only work in the main thread
+	"""
+	if not seconds or threading.current_thread() is not threading.main_thread():
+		yield
+		return
+
+	timer, signum, title = _TIMERS[exc_class]
+
+	def expire(signum, frame):
+		raise exc_class(f'{title} limit of {seconds}s exceeded')
+
+	previous = signal.signal(signum, expire)
+	# Keep re-firing in case a bare `except:` in the submission catches the first one
+	signal.setitimer(timer, seconds, 0.05)
+	try:
+		yield
+	finally:
+		signal.setitimer(timer, 0)
+		signal.signal(signum, previous)
+
+
+@contextmanager
+def enforce(limits: ExecutionLimits, wall_time: Optional[float] = None) -> Iterator[None]:
+	wall_deadline = deadline(wall_time or limits.wall_time, CaseTimeout)
+	with wall_deadline, deadline(limits.cpu_time, CpuLimitExceeded):
+		yield
+
+
+def apply_process_limits(limits: ExecutionLimits, timeout: float) -> None:
+	"""
+	Kernel-level backstops for a disposable worker process: the address space cap turns
+	huge allocations into MemoryError, the CPU cap kills code stuck in C where signals can't reach.
+	"""
+	cpu_seconds = math.ceil(timeout) + 1
+	resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+	if limits.memory:
+		resource.setrlimit(resource.RLIMIT_AS, (limits.memory, limits.memory))
+
+
+def verdict_for_exitcode(exitcode: Optional[int]) -> enums.Verdict:
+	if exitcode == -signal.SIGXCPU:
+		return enums.Verdict.CPU_LIMIT_EXCEEDED
+	return enums.Verdict.RUNTIME_ERROR
+
+
+class ResourceUsage:
+	"""Measures wall time, CPU time and peak RSS of the code run inside the block"""
+
+	def __init__(self):
+		self.wall_time = 0.0
+		self.cpu_time = 0.0
+		self.peak_memory = 0
+
+	def __enter__(self) -> 'ResourceUsage':
+		self._wall_started_at = time.perf_counter()
+		# The process clock only advances by scheduler ticks while the ITIMER_PROF deadline is armed,
+		# submissions can't start threads, so the thread clock measures the same time precisely
+		self._cpu_started_at = time.thread_time()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.wall_time = time.perf_counter() - self._wall_started_at
+		self.cpu_time = time.thread_time() - self._cpu_started_at
+		# ru_maxrss is in kilobytes on Linux
+		self.peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
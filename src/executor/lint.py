@@ -0,0 +1,188 @@
+import ast
+import builtins
+from typing import Dict
+from typing import List
+from typing import Set
+
+from executor.schemas import LintIssue
+
+# Names every submission module has without binding them
+MODULE_NAMES = frozenset(dir(builtins)) | {'__builtins__', '__name__', '__doc__'}
+
+# Statements after which the rest of the block never runs
+TERMINAL_STATEMENTS = (ast.Return, ast.Raise, ast.Break, ast.Continue)
+
+
+class LintVisitor(ast.NodeVisitor):
+	"""
+	Collects bindings and usages of names in one pass.
+	Scopes are not tracked, a name counts as defined if it is bound anywhere in the module:
+	that never reports correct code, a misspelt name is still caught.
+	"""
+
+	def __init__(self):
+		self.issues: List[LintIssue] = []
+		self.bound: Set[str] = set()
+		self.loaded: Dict[str, ast.Name] = {}
+		self.module_imports: Dict[str, ast.AST] = {}
+		self.star_import = False
+
+	def report(self, node: ast.AST, message: str, error: bool = False) -> None:
+		self.issues.append(
+			LintIssue(line=node.lineno, column=node.col_offset, message=message, error=error)
+		)
+
+	def bind(self, name: str) -> None:
+		self.bound.add(name)
+
+	def bind_arguments(self, arguments: ast.arguments) -> None:
+		for argument in [*getattr(arguments, 'posonlyargs', []), *arguments.args, *arguments.kwonlyargs]:
+			self.bind(argument.arg)
+		for argument in (arguments.vararg, arguments.kwarg):
+			if argument is not None:
+				self.bind(argument.arg)
+
+	def visit_Module(self, node: ast.Module) -> None:
+		for statement in node.body:
+			if isinstance(statement, (ast.Import, ast.ImportFrom)):
+				for alias in statement.names:
+					if alias.name != '*':
+						self.module_imports.setdefault(self.imported_name(alias), statement)
+		self.check_block(node.body)
+		self.generic_visit(node)
+
+	def visit_Name(self, node: ast.Name) -> None:
+		if isinstance(node.ctx, ast.Load):
+			self.loaded.setdefault(node.id, node)
+		else:
+			self.bind(node.id)
+
+	def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+		self.bind(node.name)
+		self.bind_arguments(node.args)
+		self.check_block(node.body)
+		self.generic_visit(node)
+
+	visit_AsyncFunctionDef = visit_FunctionDef
+
+	def visit_Lambda(self, node: ast.Lambda) -> None:
+		self.bind_arguments(node.args)
+		self.generic_visit(node)
+
+	def visit_ClassDef(self, node: ast.ClassDef) -> None:
+		self.bind(node.name)
+		self.generic_visit(node)
+
+	def visit_Import(self, node: ast.Import) -> None:
+		for alias in node.names:
+			self.bind(self.imported_name(alias))
+
+	def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+		for alias in node.names:
+			if alias.name == '*':
+				self.star_import = True
+			else:
+				self.bind(self.imported_name(alias))
+
+	def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+		if node.name:
+			self.bind(node.name)
+		if node.type is None:
+			self.report(
+				node,
+				f'Строка {node.lineno}: except без типа исключения перехватывает и KeyboardInterrupt',
+			)
+		self.generic_visit(node)
+
+	def visit_Global(self, node: ast.Global) -> None:
+		self.bound.update(node.names)
+
+	visit_Nonlocal = visit_Global
+
+	def visit_Compare(self, node: ast.Compare) -> None:
+		for operator, comparator in zip(node.ops, node.comparators):
+			if isinstance(operator, (ast.Eq, ast.NotEq)) \
+					and isinstance(comparator, ast.Constant) and comparator.value is None:
+				self.report(node, f'Строка {node.lineno}: сравнение с None через ==, используйте is')
+		self.generic_visit(node)
+
+	def visit_For(self, node: ast.For) -> None:
+		self.check_block(node.body)
+		self.check_block(node.orelse)
+		self.generic_visit(node)
+
+	visit_AsyncFor = visit_For
+
+	def visit_While(self, node: ast.While) -> None:
+		self.check_block(node.body)
+		self.check_block(node.orelse)
+		self.generic_visit(node)
+
+	def visit_If(self, node: ast.If) -> None:
+		self.check_block(node.body)
+		self.check_block(node.orelse)
+		self.generic_visit(node)
+
+	def visit_With(self, node: ast.With) -> None:
+		self.check_block(node.body)
+		self.generic_visit(node)
+
+	visit_AsyncWith = visit_With
+
+	def visit_Try(self, node: ast.Try) -> None:
+		handlers = (handler.body for handler in node.handlers)
+		for block in (node.body, node.orelse, node.finalbody, *handlers):
+			self.check_block(block)
+		self.generic_visit(node)
+
+	def generic_visit(self, node: ast.AST) -> None:
+		# Names bound by match patterns (Python 3.10+): `case x`, `case [*rest]`, `case {**rest}`
+		kind = type(node).__name__
+		name = getattr(node, 'name', None) if kind in ('MatchAs', 'MatchStar') else None
+		if kind == 'MatchMapping':
+			name = node.rest
+		if name:
+			self.bind(name)
+		super().generic_visit(node)
+
+	def check_block(self, body: List[ast.stmt]) -> None:
+		for statement, following in zip(body, body[1:]):
+			if isinstance(statement, TERMINAL_STATEMENTS):
+				self.report(following, f'Строка {following.lineno}: недостижимый код')
+				return
+
+	@staticmethod
+	def imported_name(alias: ast.alias) -> str:
+		return alias.asname or alias.name.split('.')[0]
+
+
+def lint(code: str) -> List[LintIssue]:
+	"""
+	Cheap in-process checks of a submission that already compiles.
+	Errors are names that are never defined, warnings are unused imports and common mistakes.
+	"""
+	try:
+		tree = ast.parse(code)
+	except (SyntaxError, ValueError):
+		return []
+	visitor = LintVisitor()
+	visitor.visit(tree)
+
+	issues = visitor.issues
+	if not visitor.star_import:
+		for name, node in visitor.loaded.items():
+			if name not in visitor.bound and name not in MODULE_NAMES:
+				issues.append(LintIssue(
+					line=node.lineno,
+					column=node.col_offset,
+					message=f'Строка {node.lineno}: имя {name} не определено',
+					error=True,
+				))
+	for name, node in visitor.module_imports.items():
+		if name not in visitor.loaded:
+			issues.append(LintIssue(
+				line=node.lineno,
+				column=node.col_offset,
+				message=f'Строка {node.lineno}: {name} импортирован, но не используется',
+			))
+	return sorted(issues, key=lambda x: (x.line, x.column))
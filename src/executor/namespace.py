@@ -0,0 +1,162 @@
+"""
+Bootstrap of a sandbox worker isolated with Linux namespaces instead of a container.
+
+Not imported by the package: the supervisor starts it as
+`unshare ... python -m executor.namespace <fd> [preload...]`, so the process already runs in
+fresh user, network, mount and PID namespaces. Before taking a job it makes the whole filesystem
+read-only, hides host processes behind a new /proc and gets empty size-limited tmpfs mounts
+for /tmp and /dev/shm.
+Nothing of it is visible outside the namespace and it all disappears with the process.
+Needs unprivileged user namespaces, inside Docker the default seccomp profile forbids them.
+"""
+import ctypes
+import errno
+import os
+import re
+import sys
+from multiprocessing.connection import Connection
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from core.config import settings
+from executor.pool import _worker_main
+
+MS_RDONLY = 1
+MS_NOSUID = 2
+MS_NODEV = 4
+MS_NOEXEC = 8
+MS_REMOUNT = 32
+MS_NOATIME = 1024
+MS_NODIRATIME = 2048
+MS_BIND = 4096
+MS_REC = 16384
+MS_PRIVATE = 1 << 18
+MS_RELATIME = 1 << 21
+
+# A remount inside a user namespace must keep these flags of the original mount,
+# the kernel locks them
+LOCKED_OPTIONS = {
+	'nosuid': MS_NOSUID,
+	'nodev': MS_NODEV,
+	'noexec': MS_NOEXEC,
+	'noatime': MS_NOATIME,
+	'nodiratime': MS_NODIRATIME,
+	'relatime': MS_RELATIME,
+}
+
+# mount_setattr(2), Linux 5.12+, the number is the same on every architecture
+SYS_MOUNT_SETATTR = 442
+AT_FDCWD = -100
+AT_RECURSIVE = 0x8000
+MOUNT_ATTR_RDONLY = 0x1
+
+SCRATCH_DIR = '/mnt'
+ROOT_DIR = '/mnt/root'
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.syscall.restype = ctypes.c_long
+
+
+class MountAttr(ctypes.Structure):
+	_fields_ = [
+		('attr_set', ctypes.c_uint64),
+		('attr_clr', ctypes.c_uint64),
+		('propagation', ctypes.c_uint64),
+		('userns_fd', ctypes.c_uint64),
+	]
+
+
+def mount(
+	source: Optional[str],
+	target: str,
+	fstype: Optional[str],
+	flags: int,
+	data: Optional[str] = None,
+) -> None:
+	encode = lambda value: value.encode() if value is not None else None  # noqa: E731
+	if _libc.mount(encode(source), encode(target), encode(fstype), flags, encode(data)) != 0:
+		err = ctypes.get_errno()
+		raise OSError(err, f'mount {target}: {os.strerror(err)}')
+
+
+def submounts(target: str) -> List[Tuple[str, int]]:
+	"""
+	Mount points at or below `target` with the flags a remount has to keep,
+	from /proc/self/mountinfo
+	"""
+	mounts = []
+	with open('/proc/self/mountinfo') as f:
+		for line in f:
+			fields = line.split()
+			# Spaces and other special characters of the path are octal escapes
+			mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[4])
+			if mount_point == target or mount_point.startswith(target.rstrip('/') + '/'):
+				flags = sum(LOCKED_OPTIONS.get(x, 0) for x in fields[5].split(','))
+				mounts.append((mount_point, flags))
+	return mounts
+
+
+def make_read_only(target: str) -> None:
+	"""
+	A bind remount changes only the top mount, everything mounted below stays writable.
+	mount_setattr() switches the whole tree at once, older kernels get every submount remounted.
+	"""
+	attr = MountAttr(attr_set=MOUNT_ATTR_RDONLY)
+	result = _libc.syscall(
+		SYS_MOUNT_SETATTR,
+		AT_FDCWD,
+		target.encode(),
+		AT_RECURSIVE,
+		ctypes.byref(attr),
+		ctypes.sizeof(attr),
+	)
+	if result == 0:
+		return
+	err = ctypes.get_errno()
+	# Kernels before 5.12 and seccomp filters that reject unknown syscalls
+	if err not in (errno.ENOSYS, errno.EPERM):
+		raise OSError(err, f'mount_setattr {target}: {os.strerror(err)}')
+	for mount_point, flags in submounts(target):
+		try:
+			mount(None, mount_point, None, MS_BIND | MS_REMOUNT | MS_RDONLY | flags)
+		except FileNotFoundError:
+			# Hidden under a later mount, e.g. the scratch tmpfs, and unreachable from the new root
+			pass
+
+
+def bind_read_only(source: str, target: str) -> None:
+	mount(source, target, None, MS_BIND | MS_REC)
+	make_read_only(target)
+
+
+def isolate(tmpfs_size: int, shared_dirs: List[str]) -> None:
+	"""Builds a read-only copy of the root with a private /proc, /tmp and /dev/shm, chroots into it"""
+	# Keep every mount below private to this namespace
+	mount(None, '/', None, MS_REC | MS_PRIVATE)
+	mount('tmpfs', SCRATCH_DIR, 'tmpfs', MS_NOSUID | MS_NODEV, 'size=64k')
+	os.mkdir(ROOT_DIR)
+	bind_read_only('/', ROOT_DIR)
+	mount('proc', f'{ROOT_DIR}/proc', 'proc', MS_NOSUID | MS_NODEV | MS_NOEXEC)
+	# Writable scratch space of its own, the host /tmp and /dev/shm stay out of reach
+	for path in ('/tmp', '/dev/shm'):
+		if os.path.isdir(ROOT_DIR + path):
+			mount('tmpfs', ROOT_DIR + path, 'tmpfs', MS_NOSUID | MS_NODEV, f'size={tmpfs_size}')
+	# Directories the worker reads from, e.g. test fixtures, would be hidden by the fresh /tmp
+	for path in shared_dirs:
+		target = ROOT_DIR + path
+		os.makedirs(target, exist_ok=True)
+		bind_read_only(path, target)
+	os.chroot(ROOT_DIR)
+	os.chdir('/tmp')
+
+
+def main() -> None:
+	fd, preload = int(sys.argv[1]), sys.argv[2:]
+	os.makedirs(settings.EXECUTOR_FIXTURES_DIR, exist_ok=True)
+	isolate(settings.EXECUTOR_NAMESPACE_TMPFS_SIZE, [settings.EXECUTOR_FIXTURES_DIR])
+	_worker_main(Connection(fd), preload)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,175 @@
+import hashlib
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from pydantic import BaseModel
+
+import enums
+from core.config import settings
+from executor.lint import lint
+from executor.policy import code_policy
+from executor.profiling import SUBMISSION_FILENAME
+from executor.sandbox import EXECUTOR_VERSION
+from executor.schemas import GradingReport
+from executor.schemas import StageResult
+from sdk.cache import CacheStats
+from sdk.cache import LRUCache
+
+# Stage -> stages it requires. A stage runs only after all of them have passed,
+# so cheap checks keep broken code away from the expensive ones
+STAGE_GRAPH = {
+	enums.GradingStage.SYNTAX: (),
+	enums.GradingStage.POLICY: (enums.GradingStage.SYNTAX,),
+	enums.GradingStage.LINT: (enums.GradingStage.SYNTAX,),
+	enums.GradingStage.TESTS: (enums.GradingStage.POLICY, enums.GradingStage.LINT),
+	enums.GradingStage.PERFORMANCE: (enums.GradingStage.TESTS,),
+}
+
+
+class StageOutcome(BaseModel):
+	passed: bool
+	messages: List[str] = []
+	payload: Any = None  # whatever the caller needs besides the verdict, e.g. points or a profile
+	cached: bool = False
+	cacheable: bool = True  # False for outcomes that depend on machine load
+
+
+StageRunner = Callable[[str], Awaitable[StageOutcome]]
+
+
+class Stage:
+
+	def __init__(self, name: enums.GradingStage, run: StageRunner, context: Optional[str] = ''):
+		"""
+		`context` is everything besides the source the outcome depends on, it is part of the cache key.
+		None disables caching for stages that cache on their own.
+		"""
+		self.name = name
+		self.run = run
+		self.context = context
+
+
+class StageCache:
+	"""Outcomes of grading stages keyed by stage, source hash, stage context and executor version"""
+
+	def __init__(self, maxsize: int = settings.EXECUTOR_STAGE_CACHE_SIZE):
+		self._entries: LRUCache[Tuple[str, str], StageOutcome] = LRUCache(maxsize)
+
+	@staticmethod
+	def key(stage: enums.GradingStage, code: str, context: str) -> Tuple[str, str]:
+		material = f'{EXECUTOR_VERSION}:{context}:{code}'
+		return stage.value, hashlib.sha256(material.encode()).hexdigest()
+
+	def get(self, key: Tuple[str, str]) -> Optional[StageOutcome]:
+		return self._entries.get(key)
+
+	def set(self, key: Tuple[str, str], outcome: StageOutcome) -> None:  # noqa: A003
+		self._entries.set(key, outcome)
+
+	def stats(self) -> CacheStats:
+		return self._entries.stats()
+
+
+stage_cache = StageCache()
+
+
+def requirements(
+	stage: enums.GradingStage,
+	enabled: Set[enums.GradingStage],
+) -> Set[enums.GradingStage]:
+	"""Enabled stages `stage` waits for, a disabled stage hands its own requirements down"""
+	required = set()
+	for parent in STAGE_GRAPH[stage]:
+		if parent in enabled:
+			required.add(parent)
+		else:
+			required |= requirements(parent, enabled)
+	return required
+
+
+class Pipeline:
+	"""
+	Runs the enabled stages of the grading graph,
+	a failed stage skips every stage that depends on it
+	"""
+
+	def __init__(self, stages: List[Stage], cache: Optional[StageCache] = None):
+		# Declaration order of the enum is a topological order of STAGE_GRAPH
+		order = list(enums.GradingStage)
+		self.stages = sorted(stages, key=lambda x: order.index(x.name))
+		self.cache = cache or stage_cache
+		enabled = {x.name for x in stages}
+		self.requires = {x.name: requirements(x.name, enabled) for x in stages}
+
+	async def run(self, code: str) -> Tuple[GradingReport, Dict[enums.GradingStage, StageOutcome]]:
+		started = time.perf_counter()
+		outcomes: Dict[enums.GradingStage, StageOutcome] = {}
+		results = []
+		for stage in self.stages:
+			if not all(x in outcomes and outcomes[x].passed for x in self.requires[stage.name]):
+				results.append(StageResult(stage=stage.name, status=enums.StageStatus.SKIPPED))
+				continue
+
+			stage_started = time.perf_counter()
+			outcome = outcomes[stage.name] = await self.run_stage(stage, code)
+			results.append(StageResult(
+				stage=stage.name,
+				status=enums.StageStatus.PASSED if outcome.passed else enums.StageStatus.FAILED,
+				duration=time.perf_counter() - stage_started,
+				cached=outcome.cached,
+				messages=outcome.messages,
+			))
+
+		return GradingReport(
+			passed=all(x.status == enums.StageStatus.PASSED for x in results),
+			failed_stage=next((x.stage for x in results if x.status == enums.StageStatus.FAILED), None),
+			duration=time.perf_counter() - started,
+			stages=results,
+		), outcomes
+
+	async def run_stage(self, stage: Stage, code: str) -> StageOutcome:
+		if stage.context is None:
+			return await stage.run(code)
+		key = self.cache.key(stage.name, code, stage.context)
+		outcome = self.cache.get(key)
+		if outcome is not None:
+			return outcome.copy(update={'cached': True})
+		outcome = await stage.run(code)
+		if outcome.cacheable:
+			self.cache.set(key, outcome)
+		return outcome
+
+
+async def check_syntax(code: str) -> StageOutcome:
+	try:
+		compile(code, SUBMISSION_FILENAME, 'exec')
+	except SyntaxError as e:
+		return StageOutcome(passed=False, messages=[f'Строка {e.lineno}: {e.msg}'])
+	except ValueError as e:
+		return StageOutcome(passed=False, messages=[str(e)])
+	return StageOutcome(passed=True)
+
+
+async def check_policy(code: str) -> StageOutcome:
+	violations = code_policy.check(code)
+	return StageOutcome(passed=not violations, messages=[x.message for x in violations])
+
+
+async def check_lint(code: str) -> StageOutcome:
+	issues = lint(code)
+	return StageOutcome(passed=not any(x.error for x in issues), messages=[x.message for x in issues])
+
+
+# Stages that need nothing but the source, they run in-process
+STATIC_STAGES: Dict[enums.GradingStage, StageRunner] = {
+	enums.GradingStage.SYNTAX: check_syntax,
+	enums.GradingStage.POLICY: check_policy,
+	enums.GradingStage.LINT: check_lint,
+}
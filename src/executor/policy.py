@@ -0,0 +1,137 @@
+import ast
+import hashlib
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from core.config import settings
+from executor.schemas import PolicyViolation
+from sdk.cache import CacheStats
+from sdk.cache import LRUCache
+
+FORBIDDEN_NAMES = frozenset({
+	'__builtins__', '__import__', 'breakpoint', 'compile', 'delattr', 'eval', 'exec', 'getattr',
+	'globals', 'locals', 'open', 'setattr', 'vars',
+})
+
+FORBIDDEN_MODULES = frozenset({
+	'builtins', 'ctypes', 'gc', 'importlib', 'inspect', 'io', 'marshal', 'multiprocessing', 'os',
+	'pathlib', 'pickle', 'pty', 'resource', 'shutil', 'signal', 'socket', 'subprocess', 'threading',
+})
+
+# Attributes that are forbidden only on a specific module, e.g. sys.stdin stays available
+FORBIDDEN_MODULE_ATTRIBUTES = {
+	'sys': frozenset({'modules', '_getframe', 'settrace', 'setprofile', 'meta_path', 'path_hooks'}),
+}
+
+
+def module_bindings(tree: ast.AST) -> Dict[str, str]:
+	"""
+	Names bound to a module anywhere in the code: by `import x as y`, `from x import y`
+	or an assignment of an already bound name, like `s = sys`. Scopes are ignored, a name bound
+	to a module in one function is checked as that module everywhere.
+	"""
+	bindings: Dict[str, str] = {}
+	assignments = []
+	for node in ast.walk(tree):
+		if isinstance(node, ast.Import):
+			for alias in node.names:
+				if alias.asname:
+					bindings[alias.asname] = alias.name
+				else:
+					bindings[alias.name.split('.')[0]] = alias.name.split('.')[0]
+		elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+			for alias in node.names:
+				bindings[alias.asname or alias.name] = f'{node.module}.{alias.name}'
+		elif isinstance(node, (ast.Assign, ast.NamedExpr)) and isinstance(node.value, ast.Name):
+			targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+			assignments.extend((x.id, node.value.id) for x in targets if isinstance(x, ast.Name))
+
+	# Chains like `a = sys; b = a` need as many passes as links
+	changed = True
+	while changed:
+		changed = False
+		for target, value in assignments:
+			module = bindings.get(value)
+			if module is not None and bindings.get(target) != module:
+				bindings[target] = module
+				changed = True
+	return bindings
+
+
+class PolicyVisitor(ast.NodeVisitor):
+	"""Collects every forbidden name, import and attribute access in a module"""
+
+	def __init__(self, bindings: Optional[Dict[str, str]] = None):
+		self.violations: List[PolicyViolation] = []
+		self.bindings = bindings or {}
+
+	def report(self, node: ast.AST, message: str) -> None:
+		self.violations.append(PolicyViolation(line=node.lineno, column=node.col_offset, message=message))
+
+	def visit_Name(self, node: ast.Name) -> None:
+		if node.id in FORBIDDEN_NAMES:
+			self.report(node, f'Строка {node.lineno}: запрещено использовать {node.id}')
+
+	def visit_Import(self, node: ast.Import) -> None:
+		for alias in node.names:
+			self.check_module(node, alias.name)
+
+	def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+		if node.level:
+			self.report(node, f'Строка {node.lineno}: относительный импорт запрещён')
+			return
+		self.check_module(node, node.module)
+		for alias in node.names:
+			if alias.name in FORBIDDEN_MODULE_ATTRIBUTES.get(node.module, ()):
+				self.report(node, f'Строка {node.lineno}: запрещено использовать {node.module}.{alias.name}')
+
+	def visit_Attribute(self, node: ast.Attribute) -> None:
+		if node.attr.startswith('__') and node.attr.endswith('__'):
+			self.report(node, f'Строка {node.lineno}: запрещено обращаться к атрибуту {node.attr}')
+		elif isinstance(node.value, ast.Name):
+			# Unbound names are checked as themselves, `sys` may be reachable without an import
+			module = self.bindings.get(node.value.id, node.value.id)
+			if node.attr in FORBIDDEN_MODULE_ATTRIBUTES.get(module, ()):
+				self.report(node, f'Строка {node.lineno}: запрещено использовать {module}.{node.attr}')
+		self.generic_visit(node)
+
+	def check_module(self, node: ast.AST, module: str) -> None:
+		if module.split('.')[0] in FORBIDDEN_MODULES:
+			self.report(node, f'Строка {node.lineno}: запрещён импорт модуля {module}')
+
+
+class CodePolicy:
+	"""
+	Static pre-check of a submission, runs before the code is queued for execution.
+	Results are cached by source hash, so resubmitting the same code skips the analysis.
+	"""
+
+	def __init__(self, maxsize: int = settings.EXECUTOR_POLICY_CACHE_SIZE):
+		self._results: LRUCache[str, Tuple[PolicyViolation, ...]] = LRUCache(maxsize)
+
+	def check(self, code: str) -> List[PolicyViolation]:
+		digest = hashlib.sha256(code.encode()).hexdigest()
+		violations = self._results.get(digest)
+		if violations is None:
+			violations = tuple(self.analyze(code))
+			self._results.set(digest, violations)
+		return list(violations)
+
+	@staticmethod
+	def analyze(code: str) -> List[PolicyViolation]:
+		try:
+			tree = ast.parse(code)
+		except (SyntaxError, ValueError):
+			# Not a policy matter, the syntax error is reported by the run itself
+			return []
+		visitor = PolicyVisitor(module_bindings(tree))
+		visitor.visit(tree)
+		return sorted(visitor.violations, key=lambda x: (x.line, x.column))
+
+	def stats(self) -> CacheStats:
+		return self._results.stats()
+
+
+code_policy = CodePolicy()
@@ -0,0 +1,431 @@
+import asyncio
+import importlib
+import math
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import AsyncIterator
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+import enums
+from core.config import settings
+from executor.batch import run_batch
+from executor.capture import ChunkCallback
+from executor.imports import IMPLICIT_IMPORTS
+from executor.limits import apply_process_limits
+from executor.limits import verdict_for_exitcode
+from executor.profiling import run_profile
+from executor.sandbox import Executor
+from executor.sandbox import SECRET_SETTINGS
+from executor.schemas import ComplexityProfile
+from executor.schemas import ExecutionLimits
+from executor.schemas import ExecutionResult
+from executor.schemas import PoolStats
+from executor.schemas import TestCase
+from executor.schemas import TestCaseResult
+
+SUPERVISOR_GRACE_PERIOD = 0.5
+
+PROCESS_BACKEND, NAMESPACE_BACKEND = 'process', 'namespace'
+BACKENDS = (PROCESS_BACKEND, NAMESPACE_BACKEND)
+
+UNSHARE_COMMAND = [
+	'unshare', '--user', '--map-root-user', '--net', '--mount', '--pid', '--fork', '--kill-child',
+]
+# Namespace workers are fresh interpreters, they need the sources on their path
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHUNK, _RESULT = 'chunk', 'result'
+
+
+def _worker_main(conn: Connection, preload: List[str]) -> None:
+	"""Entry point of a sandbox worker: warm up, run exactly one job and exit"""
+	for module in preload:
+		importlib.import_module(module)
+	try:
+		func, args, limits, timeout, stream = conn.recv()
+	except EOFError:
+		return
+	apply_process_limits(limits, timeout)
+	Executor.harden()
+	kwargs = {'on_chunk': lambda chunk: conn.send((_CHUNK, chunk))} if stream else {}
+	conn.send((_RESULT, func(*args, **kwargs)))
+	conn.close()
+
+
+def _run_single(
+	code: str,
+	stdin: str,
+	limits: ExecutionLimits,
+	on_chunk: Optional[ChunkCallback] = None,
+) -> ExecutionResult:
+	return Executor(code, stdin, limits, on_chunk).run()
+
+
+class _Worker:
+
+	def __init__(self, context: multiprocessing.context.BaseContext, preload: List[str]):
+		self.conn, child_conn = context.Pipe()
+		self.process = context.Process(target=_worker_main, args=(child_conn, preload), daemon=True)
+		self.process.start()
+		child_conn.close()
+
+	def run(
+		self,
+		job: tuple,
+		timeout: float,
+		on_chunk: Optional[ChunkCallback] = None,
+	) -> Union[ExecutionResult, object]:
+		"""Returns whatever the job returned or an ExecutionResult describing why the worker failed"""
+		expires_at = time.monotonic() + timeout
+		try:
+			self.conn.send((*job, timeout, on_chunk is not None))
+			while self.conn.poll(max(expires_at - time.monotonic(), 0)):
+				kind, payload = self.conn.recv()
+				if kind == _RESULT:
+					return payload
+				on_chunk(payload)
+		except (EOFError, OSError):
+			self.wait(timeout=1)
+			return ExecutionResult(
+				verdict=verdict_for_exitcode(self.exitcode),
+				error=f'Sandbox worker died with exit code {self.exitcode}',
+			)
+		return ExecutionResult(
+			verdict=enums.Verdict.TIMEOUT,
+			error=f'Wall time limit of {timeout}s exceeded',
+			duration=timeout,
+		)
+
+	@property
+	def exitcode(self) -> Optional[int]:
+		return self.process.exitcode
+
+	def wait(self, timeout: Optional[float] = None) -> None:
+		self.process.join(timeout)
+
+	def kill(self) -> None:
+		if self.process.is_alive():
+			self.process.kill()
+
+	def stop(self) -> None:
+		self.kill()
+		self.wait()
+		self.conn.close()
+
+
+class _NamespaceWorker(_Worker):
+	"""Worker in its own user, network, mount and PID namespaces, see executor.namespace"""
+
+	def __init__(self, preload: List[str]):
+		parent_socket, child_socket = socket.socketpair()
+		child_fd = child_socket.fileno()
+		env = {key: value for key, value in os.environ.items() if key not in SECRET_SETTINGS}
+		env['PYTHONPATH'] = os.pathsep.join(filter(None, [SOURCE_ROOT, os.environ.get('PYTHONPATH')]))
+		self.process = subprocess.Popen(
+			[*UNSHARE_COMMAND, sys.executable, '-m', 'executor.namespace', str(child_fd), *preload],
+			pass_fds=(child_fd,),
+			stdin=subprocess.DEVNULL,
+			stdout=subprocess.DEVNULL,
+			env=env,
+		)
+		child_socket.close()
+		self.conn = Connection(parent_socket.detach())
+
+	@property
+	def exitcode(self) -> Optional[int]:
+		return self.process.poll()
+
+	def wait(self, timeout: Optional[float] = None) -> None:
+		try:
+			self.process.wait(timeout)
+		except subprocess.TimeoutExpired:
+			pass
+
+	def kill(self) -> None:
+		if self.process.poll() is None:
+			self.process.kill()
+
+
+class _Cancellation:
+	"""Lets the event loop kill the worker that a cancelled job is running on"""
+
+	def __init__(self):
+		self.cancelled = threading.Event()
+		self.worker: Optional[_Worker] = None
+
+	def cancel(self) -> None:
+		self.cancelled.set()
+		if self.worker is not None:
+			self.worker.kill()
+
+
+class WorkerPool:
+	"""
+	Supervisor of pre-started, pre-imported sandbox processes.
+	Every worker runs exactly one submission and is replaced afterwards,
+	so nothing a submission does to its interpreter leaks into the next one.
+	"""
+
+	def __init__(
+		self,
+		size: Optional[int] = None,
+		preload: Optional[List[str]] = None,
+		backend: Optional[str] = None,
+	):
+		self.size = size or settings.EXECUTOR_POOL_SIZE
+		if preload is None:
+			# Allowed modules are imported before harden(), so importing them in a submission costs nothing
+			preload = sorted({
+				*settings.EXECUTOR_PRELOAD_MODULES,
+				*settings.EXECUTOR_ALLOWED_IMPORTS,
+				*IMPLICIT_IMPORTS,
+			})
+		self.preload = preload
+		self.backend = backend or settings.EXECUTOR_BACKEND
+		if self.backend not in BACKENDS:
+			raise ValueError(f'Unknown executor backend {self.backend!r}, expected one of {BACKENDS}')
+		self._context = multiprocessing.get_context(settings.EXECUTOR_START_METHOD)
+		if self._context.get_start_method() == 'forkserver':
+			self._context.set_forkserver_preload(['executor.sandbox', *self.preload])
+		self._idle: Deque[_Worker] = deque()
+		self._busy = 0
+		self._lock = threading.Lock()
+		self._threads = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='executor-pool')
+		self._slots: Optional[asyncio.Semaphore] = None
+		self._closed = False
+
+	async def __aenter__(self) -> 'WorkerPool':
+		return self.start()
+
+	async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+		self.close()
+
+	def start(self) -> 'WorkerPool':
+		while len(self._idle) < self.size:
+			self._idle.append(self._spawn())
+		return self
+
+	def close(self) -> None:
+		self._closed = True
+		with self._lock:
+			workers, self._idle = list(self._idle), deque()
+		for worker in workers:
+			worker.stop()
+		self._threads.shutdown(wait=False)
+
+	def stats(self) -> PoolStats:
+		with self._lock:
+			return PoolStats(size=self.size, idle=len(self._idle), busy=self._busy)
+
+	async def submit(
+		self,
+		code: str,
+		stdin: str = '',
+		limits: Optional[ExecutionLimits] = None,
+	) -> ExecutionResult:
+		limits = limits or ExecutionLimits()
+		# The in-process deadline fires first and reports usage, the supervisor kill is a backstop
+		timeout = limits.wall_time + SUPERVISOR_GRACE_PERIOD
+		return await self._dispatch((_run_single, (code, stdin, limits), limits), timeout)
+
+	async def stream(
+		self,
+		code: str,
+		stdin: str = '',
+		limits: Optional[ExecutionLimits] = None,
+	) -> AsyncIterator[Union[str, ExecutionResult]]:
+		"""
+		Yields stdout chunks while the submission is running, the last item is its ExecutionResult.
+		Leaving the iteration early kills the worker running the submission.
+		"""
+		limits = limits or ExecutionLimits()
+		timeout = limits.wall_time + SUPERVISOR_GRACE_PERIOD
+		loop = asyncio.get_event_loop()
+		chunks: asyncio.Queue = asyncio.Queue()
+
+		def on_chunk(chunk: str) -> None:
+			loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+
+		job = (_run_single, (code, stdin, limits), limits)
+		execution = asyncio.ensure_future(self._dispatch(job, timeout, on_chunk))
+		try:
+			while not execution.done() or not chunks.empty():
+				if not chunks.empty():
+					yield chunks.get_nowait()
+					continue
+				next_chunk = asyncio.ensure_future(chunks.get())
+				try:
+					await asyncio.wait({next_chunk, execution}, return_when=asyncio.FIRST_COMPLETED)
+				finally:
+					if not next_chunk.done():
+						next_chunk.cancel()
+				if next_chunk.done():
+					yield next_chunk.result()
+			yield execution.result()
+		finally:
+			# A consumer that stops early or is cancelled must not hold the worker until the deadline
+			execution.cancel()
+
+	async def submit_batch(
+		self,
+		code: str,
+		test_cases: List[TestCase],
+		limits: Optional[ExecutionLimits] = None,
+		stop_on_failure: bool = False,
+	) -> List[TestCaseResult]:
+		"""Runs one submission against all test cases inside a single worker"""
+		limits = limits or ExecutionLimits()
+		timeout = limits.wall_time + sum(case.timeout or limits.case_time for case in test_cases)
+
+		job = (run_batch, (code, test_cases, limits, stop_on_failure), limits)
+		result = await self._dispatch(job, timeout)
+		if isinstance(result, ExecutionResult):
+			return [
+				TestCaseResult(id=case.id, verdict=result.verdict, error=result.error)
+				for case in test_cases
+			]
+		return result
+
+	async def submit_sharded(
+		self,
+		code: str,
+		test_cases: List[TestCase],
+		limits: Optional[ExecutionLimits] = None,
+		stop_on_failure: bool = False,
+	) -> List[TestCaseResult]:
+		"""
+		Splits the suite into shards that run in parallel workers, results keep the order of `test_cases`.
+		With `stop_on_failure` the first failed shard cancels the rest and kills their workers.
+		"""
+		shards_count = min(self.size, math.ceil(len(test_cases) / settings.EXECUTOR_SHARD_MIN_CASES))
+		if shards_count <= 1:
+			return await self.submit_batch(code, test_cases, limits, stop_on_failure)
+
+		shards = [test_cases[i::shards_count] for i in range(shards_count)]
+		tasks = [
+			asyncio.ensure_future(self.submit_batch(code, shard, limits, stop_on_failure))
+			for shard in shards
+		]
+		results: Dict[str, TestCaseResult] = {}
+		try:
+			for finished in asyncio.as_completed(tasks):
+				shard_results = await finished
+				results.update((x.id, x) for x in shard_results)
+				if stop_on_failure and any(x.verdict != enums.Verdict.PASSED for x in shard_results):
+					break
+		finally:
+			for task in tasks:
+				task.cancel()
+			await asyncio.gather(*tasks, return_exceptions=True)
+
+		return [
+			results.get(case.id) or TestCaseResult(id=case.id, verdict=enums.Verdict.SKIPPED)
+			for case in test_cases
+		]
+
+	async def submit_profile(
+		self,
+		code: str,
+		generator: str,
+		sizes: Optional[List[int]] = None,
+		limits: Optional[ExecutionLimits] = None,
+		allowed_imports: Optional[List[str]] = None,
+	) -> ComplexityProfile:
+		"""Estimates the complexity class of a submission on inputs produced by `generator`"""
+		limits = limits or ExecutionLimits()
+		sizes = sizes or settings.EXECUTOR_PROFILE_SIZES
+		# Every size runs the generator, the timed runs of the submission and the traced one
+		runs = 2 + settings.EXECUTOR_PROFILE_REPEATS
+		timeout = limits.wall_time + runs * len(sizes) * settings.EXECUTOR_PROFILE_TIME_LIMIT
+
+		job = (run_profile, (code, generator, sizes, limits, allowed_imports), limits)
+		result = await self._dispatch(job, timeout)
+		if isinstance(result, ExecutionResult):
+			return ComplexityProfile(error=result.error)
+		return result
+
+	async def _dispatch(
+		self,
+		job: tuple,
+		timeout: float,
+		on_chunk: Optional[ChunkCallback] = None,
+	) -> Union[ExecutionResult, object]:
+		if self._closed:
+			raise RuntimeError('Worker pool is closed')
+		if self._slots is None:
+			self._slots = asyncio.Semaphore(self.size)
+
+		cancellation = _Cancellation()
+		async with self._slots:
+			loop = asyncio.get_event_loop()
+			try:
+				return await loop.run_in_executor(
+					self._threads, self._run, job, timeout, on_chunk, cancellation
+				)
+			except asyncio.CancelledError:
+				# The thread can't be interrupted, killing its worker makes it return right away
+				cancellation.cancel()
+				raise
+
+	def _run(
+		self,
+		job: tuple,
+		timeout: float,
+		on_chunk: Optional[ChunkCallback],
+		cancellation: _Cancellation,
+	) -> Union[ExecutionResult, object]:
+		worker = self._acquire()
+		cancellation.worker = worker
+		try:
+			if cancellation.cancelled.is_set():
+				return None
+			return worker.run(job, timeout, on_chunk)
+		finally:
+			worker.stop()
+			with self._lock:
+				self._busy -= 1
+			self._replenish()
+
+	def _acquire(self) -> _Worker:
+		with self._lock:
+			self._busy += 1
+			worker = self._idle.popleft() if self._idle else None
+		return worker or self._spawn()
+
+	def _spawn(self) -> _Worker:
+		if self.backend == NAMESPACE_BACKEND:
+			return _NamespaceWorker(self.preload)
+		return _Worker(self._context, self.preload)
+
+	def _replenish(self) -> None:
+		if self._closed:
+			return
+		worker = self._spawn()
+		with self._lock:
+			if not self._closed and len(self._idle) + self._busy < self.size:
+				self._idle.append(worker)
+				return
+		worker.stop()
+
+
+_pool: Optional[WorkerPool] = None
+
+
+def get_pool() -> WorkerPool:
+	"""Process-wide pool, its workers are started on first use"""
+	global _pool
+	if _pool is None:
+		_pool = WorkerPool().start()
+	return _pool
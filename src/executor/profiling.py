@@ -0,0 +1,188 @@
+import math
+import sys
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import enums
+from core.config import settings
+from executor.imports import import_policy
+from executor.limits import LimitExceeded
+from executor.sandbox import describe_error
+from executor.sandbox import execute_in_scope
+from executor.schemas import ComplexityProfile
+from executor.schemas import ExecutionLimits
+from executor.schemas import ProfileSample
+
+SUBMISSION_FILENAME = '<submission>'
+GENERATOR_FILENAME = '<generator>'
+
+# Fewer points can't tell the classes apart
+MIN_SAMPLES = 3
+
+# CPU time differences below this are timer and interpreter noise, in seconds
+CPU_TIME_RESOLUTION = 1e-4
+
+# Sum of squared relative errors a slower class must save to win, less is noise in the measurements
+MIN_FIT_IMPROVEMENT = 0.05
+
+COMPLEXITY_FUNCTIONS: Dict[enums.ComplexityClass, Callable[[int], float]] = {
+	enums.ComplexityClass.CONSTANT: lambda n: 1.0,
+	enums.ComplexityClass.LOGARITHMIC: lambda n: math.log2(n),
+	enums.ComplexityClass.LINEAR: lambda n: n,
+	enums.ComplexityClass.LINEARITHMIC: lambda n: n * math.log2(n),
+	enums.ComplexityClass.QUADRATIC: lambda n: n ** 2,
+	enums.ComplexityClass.CUBIC: lambda n: n ** 3,
+}
+
+
+class OperationLimitExceeded(LimitExceeded):
+	verdict = enums.Verdict.CPU_LIMIT_EXCEEDED
+
+
+class OperationCounter:
+	"""
+	Counts executed lines of the submission, frames of any other code are not traced.
+	A call into a builtin like sorted() is a single operation, whatever it costs inside.
+	"""
+
+	def __init__(self, budget: int, filename: str = SUBMISSION_FILENAME):
+		self.budget = budget
+		self.filename = filename
+		self.operations = 0
+
+	def __enter__(self) -> 'OperationCounter':
+		sys.settrace(self.trace_call)
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		sys.settrace(None)
+
+	def trace_call(self, frame, event, arg):
+		if frame.f_code.co_filename != self.filename:
+			return None
+		return self.trace_line
+
+	def trace_line(self, frame, event, arg):
+		if event == 'line':
+			self.operations += 1
+			if self.operations > self.budget:
+				raise OperationLimitExceeded(f'Operation limit of {self.budget} exceeded')
+		return self.trace_line
+
+
+def is_slower(
+	complexity: Optional[enums.ComplexityClass],
+	reference: Optional[enums.ComplexityClass],
+) -> bool:
+	if complexity is None or reference is None:
+		return False
+	order = list(enums.ComplexityClass)
+	return (
+		order.index(enums.ComplexityClass(complexity))
+		> order.index(enums.ComplexityClass(reference))
+	)
+
+
+def slowest(*complexities: Optional[enums.ComplexityClass]) -> Optional[enums.ComplexityClass]:
+	known = [x for x in complexities if x is not None]
+	order = list(enums.ComplexityClass)
+	return max(known, key=lambda x: order.index(enums.ComplexityClass(x)), default=None)
+
+
+def fit_complexity(
+	sizes: List[int],
+	values: List[float],
+	floor: float = 1.0,
+) -> Optional[enums.ComplexityClass]:
+	"""
+	Least squares fit of `value = a + b * f(size)` for every class, the best fitting class wins.
+	Errors are relative, so small sizes weigh as much as large ones,
+	values below `floor` are measurement noise and weigh by absolute error.
+	"""
+	if len(sizes) < MIN_SAMPLES:
+		return None
+
+	best, best_error = None, math.inf
+	for complexity, func in COMPLEXITY_FUNCTIONS.items():
+		xs = [func(n) for n in sizes]
+		error = _fit_error(xs, values, floor)
+		# A slower class must fit noticeably better to win over a faster one
+		if error < best_error * 0.9 and best_error - error > MIN_FIT_IMPROVEMENT:
+			best, best_error = complexity, error
+	return best
+
+
+def _fit_error(xs: List[float], ys: List[float], floor: float) -> float:
+	mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+	variance = sum((x - mean_x) ** 2 for x in xs)
+	slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance if variance else 0.0
+	slope = max(slope, 0.0)
+	intercept = mean_y - slope * mean_x
+	return sum(((intercept + slope * x - y) / max(y, floor)) ** 2 for x, y in zip(xs, ys))
+
+
+def run_profile(
+	code: str,
+	generator: str,
+	sizes: List[int],
+	limits: ExecutionLimits,
+	allowed_imports: Optional[List[str]] = None,
+) -> ComplexityProfile:
+	"""
+	Runs the submission on generated inputs of increasing size. Every size runs untraced
+	EXECUTOR_PROFILE_REPEATS times for the CPU time, the fastest run counts,
+	and once traced for the operation count.
+	The class is fitted to both: operation counts miss the work done inside builtins like sorted()
+	and CPU time misses nothing but is noisy on small inputs, the slower of the two fits wins.
+	Stops at the first size the submission fails on.
+	"""
+	try:
+		compiled = compile(code, SUBMISSION_FILENAME, 'exec')
+		compiled_generator = compile(generator, GENERATOR_FILENAME, 'exec')
+	except (SyntaxError, ValueError) as e:
+		return ComplexityProfile(error=describe_error(e))
+
+	wall_time = settings.EXECUTOR_PROFILE_TIME_LIMIT
+	imports = import_policy(allowed_imports)
+	samples = []
+	for size in sizes:
+		generated_parts: List[str] = []
+		generated = execute_in_scope(
+			compiled_generator, str(size), limits, wall_time=wall_time, sink=generated_parts.append,
+		)
+		if generated.verdict != enums.Verdict.OK:
+			return ComplexityProfile(samples=samples, error=f'Input generator failed: {generated.error}')
+		# The captured stdout is only the tail of a large input
+		stdin = ''.join(generated_parts)
+
+		runs = []
+		for _ in range(settings.EXECUTOR_PROFILE_REPEATS):
+			runs.append(execute_in_scope(compiled, stdin, limits, wall_time=wall_time, imports=imports))
+			if runs[-1].verdict != enums.Verdict.OK:
+				break
+		timed = runs[-1] if runs[-1].verdict != enums.Verdict.OK else min(runs, key=lambda x: x.cpu_time)
+		sample = ProfileSample(
+			size=size,
+			verdict=timed.verdict,
+			duration=timed.duration,
+			cpu_time=timed.cpu_time,
+		)
+		if timed.verdict == enums.Verdict.OK:
+			with OperationCounter(settings.EXECUTOR_PROFILE_MAX_OPERATIONS) as counter:
+				counted = execute_in_scope(compiled, stdin, limits, wall_time=wall_time, imports=imports)
+			sample.verdict, sample.operations = counted.verdict, counter.operations
+		samples.append(sample)
+		if sample.verdict != enums.Verdict.OK:
+			break
+
+	measured = [x for x in samples if x.verdict == enums.Verdict.OK]
+	measured_sizes = [x.size for x in measured]
+	return ComplexityProfile(
+		complexity=slowest(
+			fit_complexity(measured_sizes, [x.operations for x in measured]),
+			fit_complexity(measured_sizes, [x.cpu_time for x in measured], floor=CPU_TIME_RESOLUTION),
+		),
+		samples=samples,
+	)
@@ -0,0 +1,175 @@
+import builtins
+import os
+import sys
+from io import StringIO
+from types import CodeType
+from typing import Optional
+from typing import TextIO
+from typing import Union
+
+import enums
+from core.config import settings
+from executor.capture import ChunkCallback
+from executor.capture import OutputCapture
+from executor.imports import ImportDenied
+from executor.imports import ImportGuard
+from executor.imports import ImportPolicy
+from executor.imports import import_policy
+from executor.limits import LimitExceeded
+from executor.limits import ResourceUsage
+from executor.limits import enforce
+from executor.policy import FORBIDDEN_NAMES
+from executor.schemas import ExecutionLimits
+from executor.schemas import ExecutionResult
+
+# Bump whenever a change may alter verdicts, cached results of older versions are ignored
+EXECUTOR_VERSION = 8
+
+# Credentials a sandbox worker never needs, cleared from its settings and environment
+SECRET_SETTINGS = frozenset({
+	'CELERY_BROKER_URL', 'DB_URI', 'POSTGRES_PASSWORD', 'RABBIT_PASSWORD', 'RABBIT_URL', 'SECRET_KEY',
+	'SENTRY_DSN', 'SSO_AUTH_JWT_KEY',
+})
+
+_exec = builtins.exec
+
+
+class ForbiddenError(ValueError):
+
+	@staticmethod
+	def forbidden(*args, **kwargs):
+		raise ForbiddenError('You use forbidden function!')
+
+
+class StdoutIO:
+
+	def __init__(self, stdout: Optional[Union[StringIO, OutputCapture]] = None):
+		self.stdout = stdout or StringIO()
+		self.old_stdout = sys.stdout
+
+	def __enter__(self):
+		sys.stdout = self.stdout
+		return self.stdout
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		sys.stdout = self.old_stdout
+
+
+class StdinIO:
+
+	def __init__(self, stdin: Union[str, TextIO] = ''):
+		self.stdin = StringIO(stdin) if isinstance(stdin, str) else stdin
+		self.old_stdin = sys.stdin
+
+	def __enter__(self):
+		sys.stdin = self.stdin
+		return self.stdin
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		sys.stdin = self.old_stdin
+
+
+def sandbox_globals(imports: Optional[ImportPolicy] = None) -> dict:
+	"""Fresh globals for a single run, forbidden builtins are shadowed only inside this scope"""
+	scope_builtins = dict(vars(builtins))
+	# The static policy rejects these names, code that gets past it still can't call them
+	forbidden = FORBIDDEN_NAMES & scope_builtins.keys()
+	scope_builtins.update(dict.fromkeys(forbidden, ForbiddenError.forbidden))
+	scope_builtins['__import__'] = (imports or import_policy()).guarded_import
+	return {'__builtins__': scope_builtins, '__name__': '__main__'}
+
+
+def scrub_secrets() -> None:
+	for name in SECRET_SETTINGS:
+		os.environ.pop(name, None)
+		setattr(settings, name, None)
+
+
+def describe_error(exc: BaseException) -> str:
+	return f'{type(exc).__name__}: {exc}'
+
+
+def execute_in_scope(
+	code: Union[str, CodeType],
+	stdin: Union[str, TextIO],
+	limits: ExecutionLimits,
+	wall_time: Optional[float] = None,
+	on_chunk: Optional[ChunkCallback] = None,
+	imports: Optional[ImportPolicy] = None,
+	sink: Optional[ChunkCallback] = None,
+) -> ExecutionResult:
+	"""
+	Runs code once in fresh globals under the given limits and reports what it used.
+	`stdout` of the result is the tail of the output, the whole output goes only to `sink`.
+	"""
+	verdict, error = enums.Verdict.OK, None
+	capture = OutputCapture(limit=limits.output, on_chunk=on_chunk, sink=sink)
+	with ResourceUsage() as usage, StdinIO(stdin), StdoutIO(capture) as out:
+		try:
+			with enforce(limits, wall_time):
+				_exec(code, sandbox_globals(imports))
+		except LimitExceeded as e:
+			verdict, error = e.verdict, str(e)
+		except MemoryError:
+			verdict = enums.Verdict.MEMORY_LIMIT_EXCEEDED
+			error = f'Memory limit of {limits.memory} bytes exceeded'
+		except ForbiddenError as e:
+			verdict, error = enums.Verdict.FORBIDDEN, str(e)
+		except SystemExit:
+			pass
+		except BaseException as e:  # noqa: B902
+			verdict, error = enums.Verdict.RUNTIME_ERROR, describe_error(e)
+	out.flush()
+	return ExecutionResult(
+		verdict=verdict,
+		stdout=out.getvalue(),
+		stdout_truncated=out.truncated,
+		output_size=out.total_bytes,
+		error=error,
+		duration=usage.wall_time,
+		cpu_time=usage.cpu_time,
+		peak_memory=usage.peak_memory,
+	)
+
+
+class Executor:
+	"""
+	Simple class for executing python code in a sandbox.
+	WARNING: Run only with Docker or in a namespace worker (EXECUTOR_BACKEND=namespace).
+	"""
+
+	def __init__(
+		self,
+		code: str,
+		stdin: str = '',
+		limits: Optional[ExecutionLimits] = None,
+		on_chunk: Optional[ChunkCallback] = None,
+	):
+		self.code = code
+		self.stdin = stdin
+		self.limits = limits or ExecutionLimits()
+		self.on_chunk = on_chunk
+		self.execute_command = _exec
+
+	@staticmethod
+	def harden():
+		"""
+		Patch process-wide functions that submissions must not reach.
+		Irreversible, call it only inside a disposable worker process.
+		"""
+		scrub_secrets()
+		os.system = ForbiddenError.forbidden
+		builtins.eval = ForbiddenError.forbidden
+		builtins.exec = ForbiddenError.forbidden
+		ImportGuard.install()
+
+	def execute(self) -> str:
+		with StdinIO(self.stdin), StdoutIO() as out:
+			try:
+				self.execute_command(self.code, sandbox_globals())
+			except (ForbiddenError, ImportDenied) as e:
+				print("Something wrong with the code: " + str(e))
+		return out.getvalue()
+
+	def run(self) -> ExecutionResult:
+		return execute_in_scope(self.code, self.stdin, self.limits, on_chunk=self.on_chunk)
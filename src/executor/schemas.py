@@ -0,0 +1,103 @@
+from typing import List
+from typing import Optional
+
+from pydantic import BaseModel
+
+import enums
+from core.config import settings
+
+
+class ExecutionLimits(BaseModel):
+	wall_time: float = settings.EXECUTOR_WALL_TIME_LIMIT
+	case_time: float = settings.EXECUTOR_CASE_TIME_LIMIT
+	cpu_time: Optional[float] = settings.EXECUTOR_CPU_TIME_LIMIT
+	memory: Optional[int] = settings.EXECUTOR_MEMORY_LIMIT  # address space, bytes
+	output: Optional[int] = settings.EXECUTOR_OUTPUT_LIMIT  # bytes
+
+
+class ExecutionResult(BaseModel):
+	verdict: enums.Verdict
+	stdout: str = ''
+	stdout_truncated: bool = False
+	output_size: int = 0
+	error: Optional[str] = None
+	duration: float = 0.0
+	cpu_time: float = 0.0
+	peak_memory: int = 0
+
+
+class TestCase(BaseModel):
+	id: str  # noqa: A003
+	stdin: str = ''
+	expected_output: str = ''
+	timeout: Optional[float] = None
+	fixtures: Optional[str] = None  # memory-mapped file with stdin and expected output of this case
+	comparison: enums.ComparisonMode = enums.ComparisonMode.WHITESPACE
+	tolerance: float = settings.EXECUTOR_FLOAT_TOLERANCE
+	allowed_imports: Optional[List[str]] = None  # settings.EXECUTOR_ALLOWED_IMPORTS when not set
+
+
+class Mismatch(BaseModel):
+	"""First difference between the expected and the actual output"""
+	line: int
+	expected: str
+	actual: str
+
+
+class TestCaseResult(BaseModel):
+	id: str  # noqa: A003
+	verdict: enums.Verdict
+	duration: float = 0.0
+	cpu_time: float = 0.0
+	peak_memory: int = 0
+	output: str = ''
+	error: Optional[str] = None
+	mismatch: Optional[Mismatch] = None
+
+
+class PoolStats(BaseModel):
+	size: int
+	idle: int
+	busy: int
+
+
+class PolicyViolation(BaseModel):
+	line: int
+	column: int
+	message: str
+
+
+class ProfileSample(BaseModel):
+	size: int
+	verdict: enums.Verdict
+	duration: float = 0.0
+	cpu_time: float = 0.0
+	operations: int = 0  # executed lines of the submission
+
+
+class ComplexityProfile(BaseModel):
+	complexity: Optional[enums.ComplexityClass] = None
+	samples: List[ProfileSample] = []
+	error: Optional[str] = None
+
+
+class LintIssue(BaseModel):
+	line: int
+	column: int
+	message: str
+	error: bool = False  # errors fail the lint stage, warnings are only reported
+
+
+class StageResult(BaseModel):
+	stage: enums.GradingStage
+	status: enums.StageStatus
+	duration: float = 0.0
+	cached: bool = False
+	messages: List[str] = []
+
+
+class GradingReport(BaseModel):
+	passed: bool
+	failed_stage: Optional[enums.GradingStage] = None
+	duration: float = 0.0
+	stages: List[StageResult] = []
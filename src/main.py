@@ -12,6 +12,7 @@ from logger.in_requests.application import DefaultFastAPI
 # from sso_auth.config import SSOAuthConfig
 # from sdk.exceptions import auth_exception_handler
 from sdk.security import fake_http_bearer
+from services import revocation_list
 
 # logging_config.dictConfig(LOGGING)
 
@@ -52,12 +53,12 @@ register_tortoise(
 
 @app.on_event("startup")
 async def startup() -> None:
-    pass
+    await revocation_list.start()
 
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
-    pass
+    await revocation_list.stop()
 
 
 if __name__ == "__main__":
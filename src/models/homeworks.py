@@ -19,6 +19,15 @@ class Homework(
     difficulty_level = fields.IntField(null=False)
     overdue_pass = fields.BooleanField(default=False)
     homework_type = fields.CharField(max_length=20, null=False)  # default, quiz
+    grading_mode = fields.CharField(max_length=20, default='score')  # score, pass_fail
+    # exact, whitespace, tokens, float...
+    comparison_mode = fields.CharField(max_length=20, default='whitespace')
+    comparison_tolerance = fields.FloatField(default=1e-6)
+    # module names, settings.EXECUTOR_ALLOWED_IMPORTS when null
+    allowed_imports = fields.JSONField(null=True)
+    input_generator = fields.TextField(null=True)  # prints an input of size n read from stdin
+    reference_complexity = fields.CharField(max_length=20, null=True)  # O(n), O(n log n)...
+    grading_stages = fields.JSONField(null=True)  # stage names, every stage when null
 
     lesson = fields.ForeignKeyField('models.Lesson', related_name='homeworks', on_delete='CASCADE')
     author = fields.ForeignKeyField(
@@ -31,6 +40,7 @@ class Homework(
     additional_files = fields.ManyToManyField('models.File')
 
     quizzes: fields.ReverseRelation['Quiz']
+    test_cases: fields.ReverseRelation['HomeworkTestCase']
 
     def can_be_created(self, student_retakes_count: int) -> bool:
         is_not_overdue = (self.time_terms > datetime.now() and not self.overdue_pass) or self.overdue_pass
@@ -38,6 +48,22 @@ class Homework(
         return is_not_overdue and has_retakes_count
 
 
+class HomeworkTestCase(
+    UUIDModelMixin, AuditMixin, Model
+):
+    """Модель теста для автоматической проверки решения"""
+
+    stdin = fields.TextField(default='')
+    expected_output = fields.TextField()
+    timeout = fields.FloatField(null=True)
+
+    homework = fields.ForeignKeyField(
+        'models.Homework',
+        related_name='test_cases',
+        on_delete='CASCADE'
+    )
+
+
 class HomeworkAnswer(
     UUIDModelMixin, AuditMixin, Model
 ):
@@ -46,6 +72,15 @@ class HomeworkAnswer(
     answer = fields.TextField(null=True)
     teacher_description = fields.TextField(null=True)
     points = fields.IntField(null=True)
+    grading_status = fields.CharField(max_length=20, null=True)  # pending, running, graded, failed
+    # grading-urgent, grading-default, grading-bulk
+    grading_lane = fields.CharField(max_length=20, null=True)
+    enqueued_at = fields.DatetimeField(null=True)
+    grading_started_at = fields.DatetimeField(null=True)
+    complexity = fields.CharField(max_length=20, null=True)
+    complexity_profile = fields.JSONField(null=True)
+    grading_report = fields.JSONField(null=True)  # verdict and timings of every grading stage
+    fingerprints_count = fields.IntField(null=True)  # null until the answer is indexed
 
     student = fields.ForeignKeyField('models.User', related_name='homework_answers', on_delete='CASCADE')
     file = fields.ForeignKeyField(
@@ -61,3 +96,50 @@ class HomeworkAnswer(
         on_delete=fields.SET_NULL
     )
     homework = fields.ForeignKeyField('models.Homework', related_name='answers', on_delete='CASCADE')
+
+    class Meta:
+        indexes = (('grading_lane', 'grading_status'),)
+
+
+class RegradeJob(
+    UUIDModelMixin, AuditMixin, Model
+):
+    """Модель массовой перепроверки решений домашнего задания"""
+
+    status = fields.CharField(max_length=20)  # pending, running, finished, failed
+    total = fields.IntField(default=0)
+    processed = fields.IntField(default=0)
+    started_at = fields.DatetimeField(null=True)
+    finished_at = fields.DatetimeField(null=True)
+
+    homework = fields.ForeignKeyField(
+        'models.Homework',
+        related_name='regrade_jobs',
+        on_delete='CASCADE'
+    )
+
+
+class SubmissionFingerprint(Model):
+    """Отпечаток решения для поиска похожих решений, хеш одной отобранной k-граммы токенов"""
+
+    id = fields.BigIntField(pk=True)  # noqa: A003
+    hash = fields.BigIntField()  # noqa: A003
+
+    homework = fields.ForeignKeyField(
+        'models.Homework',
+        related_name='fingerprints',
+        on_delete='CASCADE'
+    )
+    answer = fields.ForeignKeyField(
+        'models.HomeworkAnswer',
+        related_name='fingerprints',
+        on_delete='CASCADE'
+    )
+    student = fields.ForeignKeyField(
+        'models.User',
+        related_name='fingerprints',
+        on_delete='CASCADE'
+    )
+
+    class Meta:
+        indexes = (('homework_id', 'hash'), ('answer_id',))
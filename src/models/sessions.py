@@ -11,6 +11,20 @@ class Session(
 
     access_token = fields.TextField(null=True)
     refresh_token = fields.TextField(null=True)
+    # sha256 of the tokens, sessions are looked up by them instead of the full token text
+    access_token_digest = fields.CharField(max_length=64, null=True, index=True)
+    refresh_token_digest = fields.CharField(max_length=64, null=True, index=True)
     platform = fields.CharField(max_length=20)
+    # When the refresh token expires, the sweeper deletes sessions past it
+    expires_at = fields.DatetimeField(null=True, index=True)
 
     user = fields.ForeignKeyField('models.User', related_name='sessions')
+
+
+class RevokedSession(Model):
+    """ Сессия, вышедшая из системы до истечения access токена, ее токен больше не принимается """
+
+    session_id = fields.UUIDField(pk=True)
+    # exp of the access token, after it the token is rejected anyway and the row is swept
+    expires_at = fields.DatetimeField(index=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
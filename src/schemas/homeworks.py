@@ -5,6 +5,7 @@ from uuid import UUID
 from pydantic import validator, Field
 
 import enums
+from executor import ComplexityProfile, GradingReport
 from schemas.base import UUIDSchemaMixin, QuerySetMixin, BaseSchema
 from schemas.files import File
 from schemas.groups import GroupTeacher
@@ -20,6 +21,22 @@ class HomeworkBase(BaseSchema):
     difficulty_level: enums.DifficultyLevel
     homework_type: enums.HomeworkType
     overdue_pass: bool = False
+    grading_mode: enums.GradingMode = enums.GradingMode.SCORE
+    comparison_mode: enums.ComparisonMode = enums.ComparisonMode.WHITESPACE
+    comparison_tolerance: float = Field(
+        default=1e-6,
+        ge=0,
+        description='Absolute and relative, for the float mode'
+    )
+    reference_complexity: Optional[enums.ComplexityClass] = None
+    allowed_imports: Optional[List[str]] = Field(
+        default=None,
+        description='Modules solutions may import'
+    )
+    grading_stages: Optional[List[enums.GradingStage]] = Field(
+        default=None,
+        description='Every stage when not set'
+    )
 
     class Config:
         validate_assignment = True
@@ -33,8 +50,31 @@ class Homework(UUIDSchemaMixin, QuerySetMixin, HomeworkBase):
     additional_files: List[File] = Field(default_factory=list, description='Id\'s of File instance')
 
 
+class HomeworkTestCaseCreate(BaseSchema):
+    stdin: str = ''
+    expected_output: str
+    timeout: Optional[float] = Field(default=None, gt=0)
+
+
+class HomeworkTestCase(UUIDSchemaMixin, QuerySetMixin, HomeworkTestCaseCreate):
+
+    class Config:
+        orm_mode = True
+
+
 class HomeworkCreate(HomeworkBase):
     quizzes: List[QuizCreate] = Field(default_factory=list)
+    test_cases: List[HomeworkTestCaseCreate] = Field(
+        default_factory=list,
+        description='Tests for auto-check of the answer, hidden from students'
+    )
+    input_generator: Optional[str] = Field(
+        default=None,
+        description=(
+            'Python code that reads n from stdin and prints an input of size n, '
+            'used to profile answers'
+        )
+    )
     author_id: Optional[UUID] = Field(
         default=None,
         description='Id of GroupTeacher instance that will be check this homework'
@@ -42,10 +82,25 @@ class HomeworkCreate(HomeworkBase):
     additional_files: List[UUID] = Field(default_factory=list, description='Id\'s of File instance')
 
 
+class HomeworkUpdate(HomeworkCreate):
+    test_cases: Optional[List[HomeworkTestCaseCreate]] = Field(
+        default=None,
+        description='Replace the tests of the homework, they are kept when not sent'
+    )
+    input_generator: Optional[str] = Field(
+        default=None,
+        description='Kept when not sent, null turns profiling of answers off'
+    )
+
+
 class HomeworkAnswer(UUIDSchemaMixin, QuerySetMixin, BaseSchema):
     answer: Optional[str] = None
     teacher_description: Optional[str] = None
     points: Optional[int] = None
+    grading_status: Optional[enums.GradingStatus] = None
+    complexity: Optional[enums.ComplexityClass] = None
+    complexity_profile: Optional[ComplexityProfile] = None
+    grading_report: Optional[GradingReport] = None
     file: Optional[File] = None
     teacher_file: Optional[File] = None
     student: User
@@ -78,3 +133,44 @@ class HomeworkAnswerTeacherCreate(BaseSchema):
             raise ValueError('Teacher_description or teacher_file_id must be set')
         return v
 
+
+class RegradeJob(UUIDSchemaMixin, BaseSchema):
+    homework_id: UUID
+    status: enums.RegradeStatus
+    total: int
+    processed: int
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    eta: Optional[float] = Field(
+        default=None,
+        description='Estimated seconds until the regrade is finished'
+    )
+
+    class Config:
+        use_enum_values = True
+        orm_mode = True
+
+
+class SimilarAnswer(BaseSchema):
+    answer_id: UUID
+    student_id: UUID
+    shared: int = Field(description='Fingerprints in common')
+    similarity: float = Field(
+        description='Shared fingerprints relative to the smaller of the two answers'
+    )
+
+
+class SimilarPair(BaseSchema):
+    first_answer_id: UUID
+    first_student_id: UUID
+    second_answer_id: UUID
+    second_student_id: UUID
+    shared: int
+    similarity: float
+
+
+class PlagiarismReport(BaseSchema):
+    homework_id: UUID
+    indexed_answers: int
+    threshold: float
+    pairs: List[SimilarPair] = Field(description='Most similar first')
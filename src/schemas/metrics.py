@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from pydantic import Field
+
+import enums
+from sdk.cache import CacheStats
+
+
+class GradingLaneStats(BaseModel):
+    lane: enums.GradingLane
+    queue_depth: Optional[int] = None
+    pending: int = 0
+    oldest_pending_wait: Optional[float] = None
+    avg_wait_last_hour: Optional[float] = None
+
+
+class PasswordHashingStats(BaseModel):
+    workers: int
+    running: int
+    waiting: int
+    completed: int
+    rejected: int
+    queue_time_p50: Optional[float] = None
+    queue_time_p95: Optional[float] = None
+    queue_time_max: Optional[float] = None
+
+
+class TokenCacheStats(CacheStats):
+    expired: int
+    evicted: int  # on logout and token refresh
+    memory_bytes: int = Field(description='Approximate')
+
+
+class UserCacheStats(CacheStats):
+    expired: int
+    invalidated: int  # user saved or deleted
+
+
+class RevocationStats(BaseModel):
+    size: int  # revoked sessions whose access token has not expired
+    bloom_capacity: int
+    bloom_hashes: int
+    checks: int
+    bloom_positives: int  # checks that had to look into the exact set
+    false_positives: int
+    memory_bytes: int = Field(description='Approximate')
+    listening: bool  # subscribed to revocations of other processes
+    synced_at: Optional[datetime] = None
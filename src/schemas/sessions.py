@@ -46,3 +46,11 @@ class SessionOut(BaseSchema):
 	refresh_token: str
 	token_type: str = 'bearer'
 	expires_in: int
+
+
+class SessionSweepReport(BaseSchema):
+	deleted: int
+	batches: int
+	duration: float
+	finished: bool  # False if the run stopped on SESSION_SWEEP_MAX_DURATION with expired sessions left
+	revocations_deleted: int = 0  # revoked sessions whose access token has expired
@@ -56,3 +56,9 @@ class UserInDB(UserBase):
 
 class User(UUIDSchemaMixin, AuditSchemaMixin, UserBase):
     pass
+
+
+class UserClaims(UserBase):
+    """ Пользователь, как он записан в токене """
+
+    uuid: UUID
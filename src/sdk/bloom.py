@@ -0,0 +1,51 @@
+import hashlib
+import math
+from typing import Hashable
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Множество без ложноотрицательных ответов: если элемент добавлен, `in` всегда вернет True,
+    для не добавленного элемента True возвращается с вероятностью около error_rate,
+    пока элементов не больше capacity.
+    Удалить элемент нельзя, фильтр строится заново без него
+    """
+
+    def __init__(self, capacity: int, error_rate: float, items: Iterable[Hashable] = ()) -> None:
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        # Optimal size and number of hashes for the capacity and error rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        for item in items:
+            self.add(item)
+
+    def _positions(self, item: Hashable) -> Iterable[int]:
+        # Double hashing (Kirsch, Mitzenmacher): two halves of one digest give all the positions
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: Hashable) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: Hashable) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Generic
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class LRUCache(Generic[KeyType, ValueType]):
+    """ Ограниченный по размеру кеш, при переполнении вытесняет давно не использованные записи """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[KeyType, ValueType]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self._data
+
+    def keys(self) -> List[KeyType]:
+        return list(self._data)
+
+    def items(self) -> List[Tuple[KeyType, ValueType]]:
+        return list(self._data.items())
+
+    def get(self, key: KeyType, default: Optional[ValueType] = None) -> Optional[ValueType]:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KeyType, value: ValueType) -> None:  # noqa: A003
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: KeyType, default: Optional[ValueType] = None) -> Optional[ValueType]:
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> CacheStats:
+        lookups = self.hits + self.misses
+        return CacheStats(
+            size=len(self._data),
+            maxsize=self.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+        )
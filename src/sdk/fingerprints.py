@@ -0,0 +1,80 @@
+import builtins
+import hashlib
+import io
+import keyword
+import tokenize
+from typing import List
+from typing import Set
+
+# Layout tokens, they don't change what the code does
+SKIPPED_TOKENS = frozenset({
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT,
+    tokenize.ENCODING, tokenize.ENDMARKER,
+})
+
+BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+def normalized_tokens(source: str) -> List[str]:
+    """
+    Поток токенов, не меняющийся при переименовании переменных, замене констант
+    и переформатировании: имена заменяются на V, числа на N, строки на S,
+    ключевые слова, встроенные функции и операторы остаются.
+    Текст, который не разбирается как Python, делится по пробельным символам
+    """
+
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type in SKIPPED_TOKENS:
+                continue
+            if token.type == tokenize.NAME:
+                is_kept = keyword.iskeyword(token.string) or token.string in BUILTIN_NAMES
+                tokens.append(token.string if is_kept else 'V')
+            elif token.type == tokenize.NUMBER:
+                tokens.append('N')
+            elif token.type == tokenize.STRING:
+                tokens.append('S')
+            else:
+                tokens.append(token.string)
+    except (tokenize.TokenError, SyntaxError):
+        return source.lower().split()
+    return tokens
+
+
+def stable_hash(text: str) -> int:
+    """ Не зависит от PYTHONHASHSEED и помещается в BIGINT """
+
+    digest = hashlib.blake2b(text.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def kgram_hashes(tokens: List[str], k: int) -> List[int]:
+    return [stable_hash(' '.join(tokens[i:i + k])) for i in range(len(tokens) - k + 1)]
+
+
+def winnow(hashes: List[int], window: int) -> Set[int]:
+    """
+    Winnowing (Schleimer, Wilkerson, Aiken): из каждого окна в `window` подряд идущих
+    k-грамм берется минимальный хеш, при равенстве - самый правый. Любое совпадение длиной
+    от window + k - 1 токенов гарантированно дает общий отпечаток, а отпечатков остается
+    примерно 2 / (window + 1) от числа k-грамм
+    """
+
+    if len(hashes) <= window:
+        return {min(hashes)} if hashes else set()
+
+    fingerprints = set()
+    selected = -1
+    for start in range(len(hashes) - window + 1):
+        end = start + window - 1
+        if selected < start:
+            selected = min(range(start, end + 1), key=lambda i: (hashes[i], -i))
+        elif hashes[end] <= hashes[selected]:
+            selected = end
+        fingerprints.add(hashes[selected])
+    return fingerprints
+
+
+def fingerprint(source: str, k: int, window: int) -> Set[int]:
+    return winnow(kgram_hashes(normalized_tokens(source), k), window)
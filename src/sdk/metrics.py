@@ -0,0 +1,27 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import aio_pika
+from aio_pika import RobustConnection
+
+from core.config import settings
+
+
+async def get_queue_depths(queues: List[str]) -> Dict[str, Optional[int]]:
+    """ Количество сообщений в очередях RabbitMQ, None - если очередь не удалось опросить """
+    depths: Dict[str, Optional[int]] = {name: None for name in queues}
+    try:
+        connection: RobustConnection = await aio_pika.connect_robust(settings.RABBIT_URL)
+    except Exception:
+        return depths
+
+    async with connection:
+        for name in queues:
+            try:
+                channel = await connection.channel()
+                queue = await channel.declare_queue(name, passive=True)
+                depths[name] = queue.declaration_result.message_count
+            except Exception:
+                continue
+    return depths
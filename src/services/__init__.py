@@ -1,4 +1,9 @@
 # flake8: noqa
 from services.authorization import AuthorizationService
+from services.grading import GradingService
 from services.group import GroupService
+from services.plagiarism import PlagiarismService
 from services.quiz import QuizService
+from services.regrade import RegradeService
+from services.revocation import RevocationList, revocation_list
+from services.user_cache import UserCache, user_cache
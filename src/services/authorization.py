@@ -1,7 +1,28 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from tortoise import Tortoise
+from tortoise import timezone
+
 import enums
 import models
 import schemas
 from core import security
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Starts with DELETE, so the connection returns the number of deleted rows.
+# Rows are picked through the expires_at index,
+# SKIP LOCKED passes over sessions a refresh or logout is holding
+SWEEP_SESSIONS_QUERY = (
+    'DELETE FROM "session" WHERE "uuid" IN ('
+    'SELECT "uuid" FROM "session" WHERE "expires_at" < $1 '
+    'ORDER BY "expires_at" LIMIT $2 FOR UPDATE SKIP LOCKED)'
+)
 
 
 class AuthorizationService:
@@ -13,24 +34,77 @@ class AuthorizationService:
             platform: enums.PlatformType,
             tracking_params: schemas.TrackingSchemaMixin
     ) -> schemas.SessionOut:
+        """
+        uuid сессии создается здесь, поэтому оба токена выпускаются до записи,
+        и сессия сохраняется одним INSERT
+        """
+
         user_info = schemas.UserBase.from_orm(user)
+        session_id = uuid4()
         expires_in = security.get_token_expires()
-        session = await models.Session.create(
-            user=user,
-            platform=platform,
-            refresh_token=security.create_refresh_token(user=user_info, user_id=user.uuid),
-            **tracking_params.dict()
-        )
-        session.access_token = security.create_access_token(
+        access_token = security.create_access_token(
             user=user_info,
             user_id=user.uuid,
-            session_id=session.uuid,
+            session_id=session_id,
             expires_in=expires_in
         )
-        await session.save()
+        refresh_token = security.create_refresh_token(user=user_info, user_id=user.uuid)
+        await models.Session.create(
+            uuid=session_id,
+            user=user,
+            platform=platform,
+            access_token=access_token,
+            refresh_token=refresh_token,
+            access_token_digest=security.token_digest(access_token),
+            refresh_token_digest=security.token_digest(refresh_token),
+            expires_at=(
+                timezone.now() + timedelta(minutes=settings.SSO_REFRESH_TOKEN_EXPIRE_MINUTES)
+            ),
+            **tracking_params.dict()
+        )
         return schemas.SessionOut(
-            access_token=session.access_token,
-            refresh_token=session.refresh_token,
+            access_token=access_token,
+            refresh_token=refresh_token,
             expires_in=round(expires_in.timestamp()),
         )
 
+    @classmethod
+    async def sweep_sessions(cls) -> schemas.SessionSweepReport:
+        """
+        Удаляет сессии с истекшим refresh токеном и истекшие отзывы сессий.
+        Удаление идет порциями по SESSION_SWEEP_BATCH_SIZE строк, каждая порция -
+        отдельная короткая транзакция, поэтому блокировки не мешают входу и обновлению токенов
+        """
+
+        connection = Tortoise.get_connection('default')
+        started = time.perf_counter()
+        now = timezone.now()
+        deleted = batches = 0
+        while True:
+            count, _ = await connection.execute_query(
+                SWEEP_SESSIONS_QUERY, [now, settings.SESSION_SWEEP_BATCH_SIZE]
+            )
+            deleted += count
+            batches += 1
+            finished = count < settings.SESSION_SWEEP_BATCH_SIZE
+            if finished or time.perf_counter() - started >= settings.SESSION_SWEEP_MAX_DURATION:
+                break
+            await asyncio.sleep(settings.SESSION_SWEEP_BATCH_PAUSE)
+
+        # Revocations are few, one per logout, and after exp the token is rejected without them
+        revocations_deleted = await models.RevokedSession.filter(expires_at__lt=now).delete()
+        report = schemas.SessionSweepReport(
+            deleted=deleted,
+            batches=batches,
+            duration=time.perf_counter() - started,
+            finished=finished,
+            revocations_deleted=revocations_deleted,
+        )
+        logger.info(
+            'Swept %s expired sessions in %s batches, %.2f s%s',
+            report.deleted,
+            report.batches,
+            report.duration,
+            '' if report.finished else ', more left',
+        )
+        return report
@@ -0,0 +1,335 @@
+import asyncio
+from datetime import timedelta
+from functools import partial
+from typing import List
+from typing import Optional
+from typing import Tuple
+from uuid import UUID
+
+from tortoise import Tortoise
+from tortoise import timezone
+
+import enums
+import models
+import schemas
+from core.celery_app import celery_app
+from core.config import settings
+from executor import ComplexityProfile
+from executor import ExecutionLimits
+from executor import GradingReport
+from executor import Pipeline
+from executor import STATIC_STAGES
+from executor import Stage
+from executor import StageOutcome
+from executor import TestCase
+from executor import TestCaseResult
+from executor import get_pool
+from executor import is_slower
+from executor import verdict_cache
+from executor.cache import BatchRunnerType
+from executor.cache import UNSTABLE_VERDICTS
+from executor.fixtures import fixture_store
+from schemas.metrics import GradingLaneStats
+from sdk.metrics import get_queue_depths
+
+VERDICT_MESSAGES = {
+    enums.Verdict.FAILED: 'неверный ответ',
+    enums.Verdict.TIMEOUT: 'превышено время выполнения',
+    enums.Verdict.CPU_LIMIT_EXCEEDED: 'превышено процессорное время',
+    enums.Verdict.MEMORY_LIMIT_EXCEEDED: 'превышен лимит памяти',
+    enums.Verdict.OUTPUT_LIMIT_EXCEEDED: 'слишком большой вывод',
+    enums.Verdict.FORBIDDEN: 'использована запрещённая функция',
+    enums.Verdict.IMPORT_DENIED: 'импорт запрещённого модуля',
+    enums.Verdict.RUNTIME_ERROR: 'ошибка выполнения',
+}
+
+STAGE_TITLES = {
+    enums.GradingStage.SYNTAX: 'Синтаксис',
+    enums.GradingStage.POLICY: 'Запрещённые конструкции',
+    enums.GradingStage.LINT: 'Статический анализ',
+    enums.GradingStage.TESTS: 'Тесты',
+    enums.GradingStage.PERFORMANCE: 'Производительность',
+}
+
+LANE_STATS_QUERY = '''
+SELECT
+    "grading_lane" AS "lane",
+    COUNT(*) FILTER (WHERE "grading_status" = 'pending') AS "pending",
+    EXTRACT(EPOCH FROM NOW() - MIN("enqueued_at") FILTER (WHERE "grading_status" = 'pending'))
+        AS "oldest_pending_wait",
+    EXTRACT(EPOCH FROM AVG("grading_started_at" - "enqueued_at")
+        FILTER (WHERE "grading_started_at" > NOW() - INTERVAL '1 hour')) AS "avg_wait_last_hour"
+FROM "homeworkanswer"
+WHERE "grading_lane" IS NOT NULL
+    AND ("grading_status" = 'pending' OR "grading_started_at" > NOW() - INTERVAL '1 hour')
+GROUP BY "grading_lane"
+'''
+
+
+class GradingService:
+
+    @classmethod
+    async def replace_test_cases(
+            cls,
+            homework_id: UUID,
+            test_cases: List[schemas.HomeworkTestCaseCreate]
+    ) -> None:
+        await models.HomeworkTestCase.filter(homework_id=homework_id).delete()
+        await models.HomeworkTestCase.bulk_create(
+            [models.HomeworkTestCase(homework_id=homework_id, **x.dict()) for x in test_cases]
+        )
+        verdict_cache.invalidate(str(homework_id))
+
+    @classmethod
+    async def get_test_cases(cls, homework: models.Homework) -> List[TestCase]:
+        """
+        Данные тестов кладутся в общий для всех исполнителей узла memory-mapped файл,
+        сами тесты содержат только ссылку на него
+        """
+
+        test_cases = await models.HomeworkTestCase.filter(
+            homework_id=homework.uuid
+        ).order_by('created_at', 'uuid')
+        test_cases = [
+            TestCase(
+                id=str(x.uuid),
+                stdin=x.stdin,
+                expected_output=x.expected_output,
+                timeout=x.timeout,
+                comparison=homework.comparison_mode,
+                tolerance=homework.comparison_tolerance,
+                allowed_imports=homework.allowed_imports,
+            )
+            for x in test_cases
+        ]
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, fixture_store.attach, str(homework.uuid), test_cases
+        )
+
+    @classmethod
+    async def is_auto_checked(cls, homework_id: UUID) -> bool:
+        return await models.HomeworkTestCase.exists(homework_id=homework_id)
+
+    @classmethod
+    def lane_for(cls, homework: models.Homework, interactive: bool = True) -> enums.GradingLane:
+        """
+        Очередь проверки: массовые перепроверки идут в bulk,
+        решения к домашкам с близким дедлайном - в urgent
+        """
+
+        if not interactive:
+            return enums.GradingLane.BULK
+
+        now = timezone.now()
+        urgent_window = timedelta(minutes=settings.GRADING_URGENT_DEADLINE_MINUTES)
+        urgent_after = homework.time_terms - urgent_window
+        if urgent_after <= now <= homework.time_terms:
+            return enums.GradingLane.URGENT
+        return enums.GradingLane.DEFAULT
+
+    @classmethod
+    def enqueue(cls, answer_id: UUID, lane: enums.GradingLane) -> None:
+        celery_app.send_task(
+            'grade_homework_answer', args=[str(answer_id)], queue=lane.value, routing_key=lane.value
+        )
+
+    @classmethod
+    async def lane_stats(cls) -> List[GradingLaneStats]:
+        lanes = [lane.value for lane in enums.GradingLane]
+        depths = await get_queue_depths(lanes)
+        rows = {
+            row['lane']: row
+            for row in await Tortoise.get_connection('default').execute_query_dict(LANE_STATS_QUERY)
+        }
+        stats = []
+        for lane in lanes:
+            row = rows.get(lane, {})
+            stats.append(GradingLaneStats(
+                lane=lane,
+                queue_depth=depths[lane],
+                pending=row.get('pending') or 0,
+                oldest_pending_wait=row.get('oldest_pending_wait'),
+                avg_wait_last_hour=row.get('avg_wait_last_hour'),
+            ))
+        return stats
+
+    @classmethod
+    async def grade_answer(cls, answer_id: UUID) -> None:
+        """
+        Проверка решения тестами домашнего задания.
+        Идемпотентна: уже оцененное решение повторно не проверяется и не перезаписывается
+        """
+
+        claimed = await models.HomeworkAnswer.filter(
+            uuid=answer_id,
+            points=None,
+            grading_status__in=[
+                enums.GradingStatus.PENDING.value,
+                enums.GradingStatus.RUNNING.value,
+            ],
+        ).update(
+            grading_status=enums.GradingStatus.RUNNING.value,
+            grading_started_at=timezone.now(),
+        )
+        if not claimed:
+            return
+
+        answer = await models.HomeworkAnswer.get(uuid=answer_id).select_related('homework')
+        test_cases = await cls.get_test_cases(answer.homework)
+        points, description, profile, report = await cls.evaluate(
+            answer.homework, answer.answer or '', test_cases
+        )
+
+        await models.HomeworkAnswer.filter(uuid=answer_id, points=None).update(
+            points=points,
+            teacher_description=description,
+            grading_status=enums.GradingStatus.GRADED.value,
+            complexity=profile.complexity.value if profile and profile.complexity else None,
+            complexity_profile=profile.dict() if profile else None,
+            grading_report=report.dict(),
+        )
+
+    @classmethod
+    async def evaluate(
+            cls,
+            homework: models.Homework,
+            code: str,
+            test_cases: List[TestCase]
+    ) -> Tuple[int, str, Optional[ComplexityProfile], GradingReport]:
+        """
+        Оценка решения по этапам: синтаксис, запрещённые конструкции, статический анализ,
+        тесты, производительность.
+        Этап запускается, только если пройдены все этапы, от которых он зависит,
+        поэтому нерабочий код не доходит до тестов
+        """
+
+        report, outcomes = await cls.pipeline_for(homework, test_cases).run(code)
+        tests = outcomes.get(enums.GradingStage.TESTS)
+        performance = outcomes.get(enums.GradingStage.PERFORMANCE)
+
+        points = (tests.payload if tests else 100) if report.passed else 0
+        lines = []
+        for result in report.stages:
+            if result.stage == enums.GradingStage.TESTS:
+                lines.extend(result.messages)
+            elif result.status == enums.StageStatus.FAILED:
+                lines.append(f'{STAGE_TITLES[result.stage]}: проверка не пройдена')
+                lines.extend(result.messages)
+            elif result.messages:
+                lines.append(f'{STAGE_TITLES[result.stage]}: замечания')
+                lines.extend(result.messages)
+        return points, '\n'.join(lines), performance.payload if performance else None, report
+
+    @classmethod
+    def pipeline_for(cls, homework: models.Homework, test_cases: List[TestCase]) -> Pipeline:
+        """
+        Этапы, выбранные в домашке;
+        производительность проверяется, только если задан генератор и эталон
+        """
+
+        stages = {name: Stage(name, run) for name, run in STATIC_STAGES.items()}
+        # Results of the tests stage are kept by verdict_cache,
+        # it also knows which of them are worth keeping
+        stages[enums.GradingStage.TESTS] = Stage(
+            enums.GradingStage.TESTS, partial(cls.run_tests, homework, test_cases), context=None
+        )
+        if homework.input_generator and homework.reference_complexity:
+            stages[enums.GradingStage.PERFORMANCE] = Stage(
+                enums.GradingStage.PERFORMANCE,
+                partial(cls.run_performance, homework),
+                context=(
+                    f'{homework.uuid}:{homework.reference_complexity}:{homework.allowed_imports}:'
+                    f'{settings.EXECUTOR_PROFILE_SIZES}:{homework.input_generator}'
+                ),
+            )
+
+        enabled = homework.grading_stages or [x.value for x in enums.GradingStage]
+        return Pipeline([stages[x] for x in map(enums.GradingStage, enabled) if x in stages])
+
+    @classmethod
+    async def run_tests(
+            cls,
+            homework: models.Homework,
+            test_cases: List[TestCase],
+            code: str
+    ) -> StageOutcome:
+        homework_id, limits = str(homework.uuid), ExecutionLimits()
+        results = verdict_cache.get(homework_id, code, test_cases, limits)
+        cached = results is not None
+        if not cached:
+            results = await cls.runner_for(homework)(code, test_cases, limits)
+            verdict_cache.put(homework_id, code, test_cases, limits, results)
+
+        points, description = cls.summarize(results, homework.grading_mode)
+        # A partially correct solution passes the stage and still goes on to the performance check
+        return StageOutcome(
+            passed=bool(points),
+            messages=description.split('\n'),
+            payload=points,
+            cached=cached,
+        )
+
+    @classmethod
+    async def run_performance(cls, homework: models.Homework, code: str) -> StageOutcome:
+        """ Решение не засчитывается, если оно асимптотически медленнее эталона """
+
+        profile = await get_pool().submit_profile(
+            code, homework.input_generator, allowed_imports=homework.allowed_imports
+        )
+        messages = []
+        slower = is_slower(profile.complexity, homework.reference_complexity)
+        if slower:
+            messages.append(
+                f'Решение медленнее эталонного: {profile.complexity.value} '
+                f'вместо {homework.reference_complexity}'
+            )
+        return StageOutcome(
+            passed=not slower,
+            messages=messages,
+            payload=profile,
+            cacheable=(
+                profile.error is None
+                and not any(x.verdict in UNSTABLE_VERDICTS for x in profile.samples)
+            ),
+        )
+
+    @classmethod
+    async def mark_failed(cls, answer_id: UUID) -> None:
+        await models.HomeworkAnswer.filter(uuid=answer_id, points=None).update(
+            grading_status=enums.GradingStatus.FAILED.value
+        )
+
+    @classmethod
+    def runner_for(cls, homework: models.Homework) -> BatchRunnerType:
+        """
+        Тесты гоняются шардами на всех ядрах,
+        в режиме зачет/незачет - до первого упавшего теста
+        """
+
+        stop_on_failure = homework.grading_mode == enums.GradingMode.PASS_FAIL
+        return partial(get_pool().submit_sharded, stop_on_failure=stop_on_failure)
+
+    @staticmethod
+    def summarize(
+            results: List[TestCaseResult],
+            grading_mode: enums.GradingMode = enums.GradingMode.SCORE
+    ) -> Tuple[int, str]:
+        passed = sum(1 for x in results if x.verdict == enums.Verdict.PASSED)
+        if grading_mode == enums.GradingMode.PASS_FAIL:
+            points = 100 if results and passed == len(results) else 0
+            lines = ['Зачтено' if points else 'Не зачтено']
+        else:
+            points = round(100 * passed / len(results)) if results else 0
+            lines = [f'Пройдено тестов: {passed} из {len(results)}']
+
+        for number, result in enumerate(results, start=1):
+            if result.verdict not in (enums.Verdict.PASSED, enums.Verdict.SKIPPED):
+                line = f'Тест {number}: {VERDICT_MESSAGES.get(result.verdict, result.verdict)}'
+                if result.mismatch:
+                    line += (
+                        f' (строка {result.mismatch.line}: ожидалось «{result.mismatch.expected}», '
+                        f'получено «{result.mismatch.actual}»)'
+                    )
+                lines.append(line)
+        return points, '\n'.join(lines)
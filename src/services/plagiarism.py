@@ -0,0 +1,213 @@
+import asyncio
+from collections import Counter
+from itertools import combinations
+from itertools import groupby
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from uuid import UUID
+
+from tortoise.transactions import in_transaction
+
+import enums
+import models
+import schemas
+from core.celery_app import celery_app
+from core.config import settings
+from sdk.fingerprints import fingerprint
+
+
+class PlagiarismService:
+
+    @classmethod
+    def enqueue(cls, answer_id: UUID) -> None:
+        celery_app.send_task(
+            'index_homework_answer',
+            args=[str(answer_id)],
+            queue=enums.GradingLane.BULK.value,
+            routing_key=enums.GradingLane.BULK.value,
+        )
+
+    @classmethod
+    async def index_answer(cls, answer_id: UUID) -> None:
+        answer = await models.HomeworkAnswer.get(uuid=answer_id)
+        await cls._index([answer])
+
+    @classmethod
+    async def index_homework(cls, homework_id: UUID) -> int:
+        """
+        Добавляет в индекс решения, которых в нем еще нет,
+        например отправленные до появления индекса
+        """
+
+        indexed = 0
+        while True:
+            answers = await models.HomeworkAnswer.filter(
+                homework_id=homework_id,
+                answer__not_isnull=True,
+                fingerprints_count=None,
+            ).limit(settings.PLAGIARISM_INDEX_CHUNK_SIZE)
+            if not answers:
+                return indexed
+            await cls._index(answers)
+            indexed += len(answers)
+
+    @classmethod
+    async def similar_answers(
+            cls,
+            answer_id: UUID,
+            threshold: Optional[float] = None
+    ) -> List[schemas.SimilarAnswer]:
+        """
+        Решения других студентов, похожие на данное.
+        Читаются только отпечатки с теми же хешами по индексу (homework_id, hash),
+        без сравнения со всеми решениями
+        """
+
+        threshold = settings.PLAGIARISM_SIMILARITY_THRESHOLD if threshold is None else threshold
+        answer = await models.HomeworkAnswer.get(uuid=answer_id)
+        if answer.fingerprints_count is None:
+            await cls._index([answer])
+        hashes = await models.SubmissionFingerprint.filter(
+            answer_id=answer_id
+        ).values_list('hash', flat=True)
+        if not hashes:
+            return []
+
+        matches = await models.SubmissionFingerprint.filter(
+            homework_id=answer.homework_id,
+            hash__in=hashes,
+        ).exclude(student_id=answer.student_id).values_list('hash', 'answer_id', 'student_id')
+        common = cls._common_hashes(
+            [(x[0], x[1]) for x in matches],
+            await cls._indexed_answers(answer.homework_id),
+        )
+
+        shared = Counter((x[1], x[2]) for x in matches if x[0] not in common)
+        counts = await cls._fingerprint_counts([x[0] for x in shared])
+        similar = []
+        for (other_id, student_id), count in shared.items():
+            similarity = count / max(min(answer.fingerprints_count, counts[other_id]), 1)
+            if similarity >= threshold:
+                similar.append(schemas.SimilarAnswer(
+                    answer_id=other_id, student_id=student_id, shared=count, similarity=similarity
+                ))
+        return sorted(similar, key=lambda x: x.similarity, reverse=True)
+
+    @classmethod
+    async def report(
+            cls,
+            homework_id: UUID,
+            threshold: Optional[float] = None
+    ) -> schemas.PlagiarismReport:
+        """
+        Все пары похожих решений домашки.
+        Пары строятся по инвертированному индексу: сравниваются только решения с общими отпечатками
+        """
+
+        threshold = settings.PLAGIARISM_SIMILARITY_THRESHOLD if threshold is None else threshold
+        await cls.index_homework(homework_id)
+        rows = await models.SubmissionFingerprint.filter(homework_id=homework_id)\
+            .order_by('hash')\
+            .values_list('hash', 'answer_id', 'student_id')
+        counts = dict(await models.HomeworkAnswer.filter(
+            homework_id=homework_id,
+            fingerprints_count__not_isnull=True,
+        ).values_list('uuid', 'fingerprints_count'))
+        common = cls._common_hashes([(x[0], x[1]) for x in rows], len(counts))
+
+        students = {}
+        shared: Counter = Counter()
+        for fingerprint_hash, postings in groupby(rows, key=lambda x: x[0]):
+            if fingerprint_hash in common:
+                continue
+            postings = sorted({(x[1], x[2]) for x in postings}, key=lambda x: str(x[0]))
+            for (first_id, first_student), (second_id, second_student) in combinations(postings, 2):
+                if first_student != second_student:
+                    students[first_id], students[second_id] = first_student, second_student
+                    shared[first_id, second_id] += 1
+
+        pairs = []
+        for (first_id, second_id), count in shared.items():
+            similarity = count / max(min(counts[first_id], counts[second_id]), 1)
+            if similarity >= threshold:
+                pairs.append(schemas.SimilarPair(
+                    first_answer_id=first_id,
+                    first_student_id=students[first_id],
+                    second_answer_id=second_id,
+                    second_student_id=students[second_id],
+                    shared=count,
+                    similarity=similarity,
+                ))
+        return schemas.PlagiarismReport(
+            homework_id=homework_id,
+            indexed_answers=len(counts),
+            threshold=threshold,
+            pairs=sorted(pairs, key=lambda x: x.similarity, reverse=True),
+        )
+
+    @classmethod
+    async def _index(cls, answers: List[models.HomeworkAnswer]) -> None:
+        """ Заменяет отпечатки решений: одно удаление и одна вставка на всю порцию """
+
+        loop = asyncio.get_event_loop()
+        fingerprints = await loop.run_in_executor(
+            None, cls._fingerprints, [x.answer or '' for x in answers]
+        )
+        async with in_transaction():
+            await models.SubmissionFingerprint.filter(
+                answer_id__in=[x.uuid for x in answers]
+            ).delete()
+            await models.SubmissionFingerprint.bulk_create([
+                models.SubmissionFingerprint(
+                    hash=fingerprint_hash,
+                    homework_id=answer.homework_id,
+                    answer_id=answer.uuid,
+                    student_id=answer.student_id,
+                )
+                for answer, hashes in zip(answers, fingerprints)
+                for fingerprint_hash in hashes
+            ])
+            for answer, hashes in zip(answers, fingerprints):
+                answer.fingerprints_count = len(hashes)
+            await models.HomeworkAnswer.bulk_update(answers, fields=['fingerprints_count'])
+
+    @staticmethod
+    def _fingerprints(sources: List[str]) -> List[Set[int]]:
+        return [
+            fingerprint(x, settings.PLAGIARISM_KGRAM_SIZE, settings.PLAGIARISM_WINDOW_SIZE)
+            for x in sources
+        ]
+
+    @staticmethod
+    def _common_hashes(postings: List[Tuple[int, UUID]], indexed_answers: int) -> Set[int]:
+        """
+        Отпечатки шаблонного кода вроде чтения ввода, которые есть у большой доли решений,
+        не учитываются
+        """
+
+        limit = max(
+            settings.PLAGIARISM_COMMON_MIN_ANSWERS,
+            settings.PLAGIARISM_COMMON_FRACTION * indexed_answers,
+        )
+        answers_per_hash = Counter(fingerprint_hash for fingerprint_hash, _ in set(postings))
+        return {
+            fingerprint_hash
+            for fingerprint_hash, count in answers_per_hash.items()
+            if count > limit
+        }
+
+    @staticmethod
+    async def _indexed_answers(homework_id: UUID) -> int:
+        return await models.HomeworkAnswer.filter(
+            homework_id=homework_id,
+            fingerprints_count__not_isnull=True,
+        ).count()
+
+    @staticmethod
+    async def _fingerprint_counts(answer_ids: List[UUID]) -> Dict[UUID, int]:
+        return dict(await models.HomeworkAnswer.filter(
+            uuid__in=answer_ids
+        ).values_list('uuid', 'fingerprints_count'))
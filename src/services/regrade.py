@@ -0,0 +1,146 @@
+import asyncio
+from typing import AsyncIterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from uuid import UUID
+
+from tortoise import timezone
+from tortoise.expressions import F
+
+import enums
+import models
+import schemas
+from core.celery_app import celery_app
+from core.config import settings
+from executor import ComplexityProfile
+from executor import GradingReport
+from executor import get_pool
+from services.grading import GradingService
+
+REGRADED_FIELDS = [
+    'points', 'teacher_description', 'grading_status',
+    'complexity', 'complexity_profile', 'grading_report',
+]
+
+
+class RegradeService:
+
+    @classmethod
+    async def start(cls, homework_id: UUID) -> models.RegradeJob:
+        total = await models.HomeworkAnswer.filter(
+            homework_id=homework_id,
+            answer__not_isnull=True,
+        ).count()
+        job = await models.RegradeJob.create(
+            homework_id=homework_id,
+            status=enums.RegradeStatus.PENDING.value,
+            total=total,
+        )
+        celery_app.send_task(
+            'regrade_homework',
+            args=[str(job.uuid)],
+            queue=settings.REGRADE_QUEUE,
+            routing_key=settings.REGRADE_QUEUE,
+        )
+        return job
+
+    @classmethod
+    async def run(cls, job_id: UUID) -> None:
+        """
+        Перепроверка всех решений домашки.
+        Решения читаются из БД порциями, каждая порция проверяется параллельно
+        всем пулом исполнителей и записывается одним запросом. Одновременно проверяется не больше
+        REGRADE_CONCURRENCY_PER_SANDBOX решений на процесс пула, остальные ждут своей очереди
+        """
+
+        claimed = await models.RegradeJob.filter(
+            uuid=job_id,
+            status=enums.RegradeStatus.PENDING.value,
+        ).update(
+            status=enums.RegradeStatus.RUNNING.value,
+            started_at=timezone.now(),
+        )
+        if not claimed:
+            return
+
+        job = await models.RegradeJob.get(uuid=job_id).select_related('homework')
+        test_cases = await GradingService.get_test_cases(job.homework)
+        if not test_cases:
+            # Тесты удалили после постановки задачи: без них все решения получили бы 0 баллов
+            await cls.mark_failed(job_id)
+            return
+
+        slots = asyncio.BoundedSemaphore(settings.REGRADE_CONCURRENCY_PER_SANDBOX * get_pool().size)
+
+        async def evaluate(
+                answer: models.HomeworkAnswer,
+        ) -> Tuple[int, str, Optional[ComplexityProfile], GradingReport]:
+            async with slots:
+                return await GradingService.evaluate(job.homework, answer.answer, test_cases)
+
+        async for answers in cls._answer_chunks(job.homework_id):
+            results = await asyncio.gather(*(evaluate(answer) for answer in answers))
+            for answer, (points, description, profile, report) in zip(answers, results):
+                answer.points, answer.teacher_description = points, description
+                answer.grading_status = enums.GradingStatus.GRADED.value
+                has_complexity = profile is not None and profile.complexity is not None
+                answer.complexity = profile.complexity.value if has_complexity else None
+                answer.complexity_profile = profile.dict() if profile else None
+                answer.grading_report = report.dict()
+            await models.HomeworkAnswer.bulk_update(answers, fields=REGRADED_FIELDS)
+            await models.RegradeJob.filter(uuid=job_id).update(
+                processed=F('processed') + len(answers)
+            )
+
+        await models.RegradeJob.filter(uuid=job_id).update(
+            status=enums.RegradeStatus.FINISHED.value,
+            finished_at=timezone.now(),
+        )
+
+    @classmethod
+    async def mark_failed(cls, job_id: UUID) -> None:
+        await models.RegradeJob.filter(uuid=job_id).update(
+            status=enums.RegradeStatus.FAILED.value,
+            finished_at=timezone.now(),
+        )
+
+    @classmethod
+    def progress(cls, job: models.RegradeJob) -> schemas.RegradeJob:
+        return schemas.RegradeJob(
+            uuid=job.uuid,
+            homework_id=job.homework_id,
+            status=job.status,
+            total=job.total,
+            processed=job.processed,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            eta=cls._eta(job),
+        )
+
+    @staticmethod
+    def _eta(job: models.RegradeJob) -> Optional[float]:
+        if job.status == enums.RegradeStatus.FINISHED:
+            return 0
+        if job.status != enums.RegradeStatus.RUNNING or not job.processed:
+            return None
+        elapsed = (timezone.now() - job.started_at).total_seconds()
+        return max(job.total - job.processed, 0) * elapsed / job.processed
+
+    @staticmethod
+    async def _answer_chunks(homework_id: UUID) -> AsyncIterator[List[models.HomeworkAnswer]]:
+        """ Keyset-пагинация по uuid: каждая порция читается по индексу, без OFFSET """
+
+        last_id = None
+        while True:
+            queryset = models.HomeworkAnswer.filter(
+                homework_id=homework_id,
+                answer__not_isnull=True,
+            )
+            if last_id is not None:
+                queryset = queryset.filter(uuid__gt=last_id)
+            answers = await queryset.order_by('uuid').limit(settings.REGRADE_CHUNK_SIZE)
+            if not answers:
+                return
+            yield answers
+            last_id = answers[-1].uuid
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Dict
+from typing import Optional
+
+import asyncpg
+from tortoise import Tortoise
+from tortoise import timezone
+
+import models
+from core.config import settings
+from schemas.metrics import RevocationStats
+from sdk.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """
+    Сессии, вышедшие из системы до истечения access токена.
+    Проверка без запроса в БД: фильтр Блума отвечает «нет» почти для всех токенов,
+    его редкие ложные срабатывания отсеивает точное множество. Запись живет до exp токена.
+    Отзыв сохраняется в RevokedSession и рассылается другим процессам через Postgres NOTIFY,
+    раз в REVOCATION_SYNC_INTERVAL секунд список перечитывается из БД
+    на случай пропущенных уведомлений
+    """
+
+    def __init__(
+            self,
+            capacity: int = settings.REVOCATION_BLOOM_CAPACITY,
+            error_rate: float = settings.REVOCATION_BLOOM_ERROR_RATE,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.checks = 0
+        self.bloom_positives = 0
+        self.false_positives = 0
+        self.synced_at: Optional[datetime] = None
+        self._expires: Dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._listener: Optional[asyncpg.Connection] = None
+        self._sync_task: Optional[asyncio.Future] = None
+
+    def is_revoked(self, session_id: str) -> bool:
+        self.checks += 1
+        if session_id not in self._bloom:
+            return False
+        self.bloom_positives += 1
+        expires = self._expires.get(session_id)
+        if expires is None:
+            self.false_positives += 1
+            return False
+        return time.time() < expires
+
+    def add(self, session_id: str, expires: float) -> None:
+        if expires <= time.time():
+            return
+        if session_id not in self._expires:
+            if self._bloom.is_full:
+                self.prune()
+            self._bloom.add(session_id)
+        self._expires[session_id] = expires
+
+    def prune(self) -> None:
+        """ Убирает истекшие записи, фильтр строится заново, при необходимости большего размера """
+
+        now = time.time()
+        self._expires = {key: expires for key, expires in self._expires.items() if expires > now}
+        capacity = max(self.capacity, 2 * len(self._expires))
+        self._bloom = BloomFilter(capacity, self.error_rate, self._expires)
+
+    async def revoke(self, session_id: str, expires_at: datetime) -> None:
+        await models.RevokedSession.get_or_create(
+            session_id=session_id,
+            defaults={'expires_at': expires_at}
+        )
+        self.add(session_id, expires_at.timestamp())
+        connection = Tortoise.get_connection('default')
+        if connection.capabilities.dialect == 'postgres':
+            await connection.execute_query(
+                'SELECT pg_notify($1, $2)',
+                [settings.REVOCATION_CHANNEL, f'{session_id} {expires_at.timestamp()}'],
+            )
+
+    async def load(self) -> None:
+        """ Заменяет список отозванными сессиями из БД """
+
+        rows = await models.RevokedSession.filter(
+            expires_at__gt=timezone.now()
+        ).values_list('session_id', 'expires_at')
+        self._expires = {str(session_id): expires_at.timestamp() for session_id, expires_at in rows}
+        self.prune()
+        self.synced_at = timezone.now()
+
+    async def start(self) -> None:
+        await self.sync()
+        self._sync_task = asyncio.ensure_future(self._sync_forever())
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+    async def sync(self) -> None:
+        """
+        Переподключает слушателя уведомлений, если соединение потеряно,
+        и перечитывает список
+        """
+
+        is_postgres = Tortoise.get_connection('default').capabilities.dialect == 'postgres'
+        if is_postgres and not self.listening:
+            self._listener = await asyncpg.connect(str(settings.DB_URI))
+            await self._listener.add_listener(settings.REVOCATION_CHANNEL, self._on_notification)
+        await self.load()
+
+    async def _sync_forever(self) -> None:
+        while True:
+            await asyncio.sleep(settings.REVOCATION_SYNC_INTERVAL)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception('Could not sync revoked sessions')
+
+    def _on_notification(
+            self,
+            connection: asyncpg.Connection,
+            pid: int,
+            channel: str,
+            payload: str
+    ) -> None:
+        session_id, expires = payload.split()
+        self.add(session_id, float(expires))
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and not self._listener.is_closed()
+
+    def stats(self) -> RevocationStats:
+        return RevocationStats(
+            size=len(self._expires),
+            bloom_capacity=self._bloom.capacity,
+            bloom_hashes=self._bloom.hashes,
+            checks=self.checks,
+            bloom_positives=self.bloom_positives,
+            false_positives=self.false_positives,
+            memory_bytes=self._bloom.memory_bytes + sys.getsizeof(self._expires) + sum(
+                sys.getsizeof(key) + sys.getsizeof(expires)
+                for key, expires in self._expires.items()
+            ),
+            listening=self.listening,
+            synced_at=self.synced_at,
+        )
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,94 @@
+import copy
+import time
+from typing import Tuple
+from uuid import UUID
+
+from tortoise.signals import post_delete
+from tortoise.signals import post_save
+
+import models
+from core.config import settings
+from schemas.metrics import UserCacheStats
+from sdk.cache import LRUCache
+
+
+class UserCache:
+    """
+    Пользователи по uuid на USER_CACHE_TTL секунд,
+    чтобы каждый запрос не ходил за пользователем в БД.
+    Сохранение и удаление пользователя через модель сбрасывают запись в этом процессе,
+    другие процессы увидят изменение не позже чем через TTL.
+    QuerySet.update() сигналов не отправляет, после него нужно вызвать invalidate
+    """
+
+    def __init__(
+            self,
+            maxsize: int = settings.USER_CACHE_SIZE,
+            ttl: float = settings.USER_CACHE_TTL
+    ) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+        self._entries: LRUCache[UUID, Tuple[models.User, float]] = LRUCache(maxsize)
+        # Bumped by every invalidation, a row read before it must not be stored
+        self._generation = 0
+
+    async def get(self, user_id: UUID) -> models.User:
+        """ Каждый вызов получает свою копию модели, изменения в ней не видны другим запросам """
+
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if time.monotonic() < entry[1]:
+                self.hits += 1
+                return copy.copy(entry[0])
+            self._entries.pop(user_id)
+            self.expired += 1
+        self.misses += 1
+
+        generation = self._generation
+        user = await models.User.get(uuid=user_id)
+        if generation == self._generation:
+            self._entries.set(user_id, (user, time.monotonic() + self.ttl))
+        return copy.copy(user)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self._generation += 1
+        if self._entries.pop(user_id) is not None:
+            self.invalidated += 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> UserCacheStats:
+        lookups = self.hits + self.misses
+        return UserCacheStats(
+            size=len(self._entries),
+            maxsize=self._entries.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+            expired=self.expired,
+            invalidated=self.invalidated,
+        )
+
+
+user_cache = UserCache()
+
+
+@post_save(models.User)
+async def invalidate_saved_user(
+        sender,
+        instance: models.User,
+        created,
+        using_db,
+        update_fields
+) -> None:
+    user_cache.invalidate(instance.uuid)
+
+
+@post_delete(models.User)
+async def invalidate_deleted_user(sender, instance: models.User, using_db) -> None:
+    user_cache.invalidate(instance.uuid)
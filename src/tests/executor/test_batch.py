@@ -0,0 +1,31 @@
+import enums
+from executor.batch import BatchRunner
+from executor.schemas import ExecutionLimits
+from executor.schemas import TestCase
+
+PRINT_RANGE = 'for i in range(int(input())):\n    print(i)\n'
+
+
+def test_output_longer_than_the_capture_buffer_is_compared_in_full() -> None:
+    """Длинный вывод сравнивается целиком, а не по хвосту из кольцевого буфера."""
+
+    expected = '\n'.join(map(str, range(20000)))
+    wrong = expected.replace('\n5\n', '\n6\n', 1)
+    results = BatchRunner(PRINT_RANGE).run(
+        [
+            TestCase(id='correct', stdin='20000', expected_output=expected),
+            TestCase(id='wrong', stdin='20000', expected_output=wrong),
+        ],
+        ExecutionLimits(),
+    )
+    assert results[0].verdict == enums.Verdict.PASSED
+    assert results[1].verdict == enums.Verdict.FAILED
+    assert results[1].mismatch.line == 6
+
+
+def test_output_limit_leaves_room_for_the_expected_output() -> None:
+    expected = '\n'.join(map(str, range(2000)))
+    limits = ExecutionLimits(output=1024)
+    test_case = TestCase(id='1', stdin='2000', expected_output=expected)
+    results = BatchRunner(PRINT_RANGE).run([test_case], limits)
+    assert results[0].verdict == enums.Verdict.PASSED
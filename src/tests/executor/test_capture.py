@@ -0,0 +1,56 @@
+from typing import List
+
+import pytest
+
+from executor.capture import OutputCapture
+from executor.limits import OutputLimitExceeded
+
+
+def test_buffer_keeps_the_tail_after_wrapping() -> None:
+    """Кольцевой буфер хранит последние budget байт, сколько бы ни было выведено."""
+
+    capture = OutputCapture(budget=8)
+    for part in ('abc', 'defgh', 'ij', 'klmnopq'):
+        capture.write(part)
+    assert capture.getvalue() == 'jklmnopq'
+    assert capture.truncated
+    assert capture.total_bytes == 17
+
+
+def test_write_longer_than_the_buffer() -> None:
+    capture = OutputCapture(budget=4)
+    capture.write('ab')
+    capture.write('0123456789')
+    assert capture.getvalue() == '6789'
+
+
+def test_output_within_budget_is_not_truncated() -> None:
+    capture = OutputCapture(budget=8)
+    capture.write('12345678')
+    assert capture.getvalue() == '12345678'
+    assert not capture.truncated
+
+
+def test_wrapped_multibyte_character_is_dropped() -> None:
+    capture = OutputCapture(budget=5)
+    capture.write('ааа')
+    assert capture.getvalue() == 'аа'
+
+
+def test_sink_gets_the_whole_output() -> None:
+    received: List[str] = []
+    capture = OutputCapture(budget=4, sink=received.append, sink_chunk_size=10)
+    text = ''.join(f'{i}\n' for i in range(100))
+    for line in text.splitlines(keepends=True):
+        capture.write(line)
+    capture.flush()
+    assert ''.join(received) == text
+    assert all(len(x) < 20 for x in received)
+    assert capture.getvalue() == '\n99\n'
+
+
+def test_output_limit_stops_the_run() -> None:
+    capture = OutputCapture(budget=4, limit=10)
+    capture.write('0123456789')
+    with pytest.raises(OutputLimitExceeded):
+        capture.write('a')
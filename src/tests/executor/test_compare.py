@@ -0,0 +1,98 @@
+from typing import List
+
+import pytest
+
+import enums
+from executor.compare import END_OF_OUTPUT
+from executor.compare import comparator_for
+from executor.compare import compare
+from executor.compare import tokens
+
+
+def feed_by(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('mode', list(enums.ComparisonMode))
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 1000])
+def test_streamed_output_matches_across_chunk_boundaries(
+    mode: enums.ComparisonMode,
+    size: int,
+) -> None:
+    """Вывод, поданный кусками любого размера, сравнивается так же, как целиком."""
+
+    expected = 'first line\n12 345 6.5\nпоследняя строка\n'
+    comparator = comparator_for(expected, mode)
+    for chunk in feed_by(expected, size):
+        comparator.feed(chunk)
+    assert comparator.finish() is None
+
+
+@pytest.mark.parametrize('size', [1, 2, 5])
+def test_token_split_between_chunks_is_one_token(size: int) -> None:
+    comparator = comparator_for('12345 67', enums.ComparisonMode.TOKENS)
+    for chunk in feed_by('12345\n67\n', size):
+        comparator.feed(chunk)
+    assert comparator.finish() is None
+    assert list(tokens('ab cd\n ef')) == [(1, 'ab'), (1, 'cd'), (2, 'ef')]
+
+
+@pytest.mark.parametrize('size', [1, 4, 1000])
+def test_first_difference_is_reported_whatever_the_chunks(size: int) -> None:
+    comparator = comparator_for('0\n1\n2\n3\n', enums.ComparisonMode.WHITESPACE)
+    for chunk in feed_by('0\n1\n9\n3\n', size):
+        comparator.feed(chunk)
+    mismatch = comparator.finish()
+    assert (mismatch.line, mismatch.expected, mismatch.actual) == (3, '2', '9')
+
+
+def test_whitespace_mode_ignores_spacing_and_blank_edges() -> None:
+    assert compare('\n\n1   2\n3 \n\n\n', '1 2\n3') is None
+    assert compare('1 2\n', '1 2\n3').line == 2
+
+
+def test_missing_output_is_reported() -> None:
+    mismatch = compare('1\n', '1\n2\n', enums.ComparisonMode.TOKENS)
+    assert (mismatch.line, mismatch.expected, mismatch.actual) == (2, '2', END_OF_OUTPUT)
+    assert compare('abc', 'abcd', enums.ComparisonMode.EXACT) is not None
+    assert compare('abcd', 'abc', enums.ComparisonMode.EXACT) is not None
+
+
+def test_exact_mode_shows_the_line_around_the_difference() -> None:
+    mismatch = compare('hello world\nok', 'hello there\nok', enums.ComparisonMode.EXACT)
+    assert (mismatch.line, mismatch.expected, mismatch.actual) == (1, 'hello there', 'hello world')
+
+
+@pytest.mark.parametrize(('actual', 'matches'), [
+    ('0.3333333', True),
+    ('0.33333', False),
+    ('1e-9', False),
+    ('abc', False),
+])
+def test_float_mode_tolerance(actual: str, matches: bool) -> None:
+    mismatch = compare(actual, '0.33333333', enums.ComparisonMode.FLOAT, tolerance=1e-6)
+    assert (mismatch is None) is matches
+
+
+def test_float_tolerance_is_absolute_near_zero() -> None:
+    assert compare('0.0000001', '0', enums.ComparisonMode.FLOAT, tolerance=1e-6) is None
+    assert compare('0.0000001', '0', enums.ComparisonMode.TOKENS) is not None
+
+
+def test_unordered_lines_compares_multisets() -> None:
+    assert compare('b\na\na', 'a\nb\na', enums.ComparisonMode.UNORDERED_LINES) is None
+    assert compare('b\na', 'a\nb\na', enums.ComparisonMode.UNORDERED_LINES) is not None
+
+
+def test_memory_mapped_expected_output_is_decoded_by_chunk() -> None:
+    expected = memoryview('строка\nещё\n'.encode())
+    assert compare('строка\nещё', expected) is None
+    assert compare('строка\nещe', expected).line == 2
+
+
+def test_nothing_is_compared_after_the_first_difference() -> None:
+    comparator = comparator_for('1\n2\n', enums.ComparisonMode.WHITESPACE)
+    comparator.feed('5\n')
+    first = comparator.mismatch
+    comparator.feed('1\n2\n')
+    assert comparator.finish() is first
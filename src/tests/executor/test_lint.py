@@ -0,0 +1,66 @@
+import sys
+from typing import List
+
+import pytest
+
+from executor.lint import lint
+
+requires_match = pytest.mark.skipif(
+    sys.version_info < (3, 10), reason='match statement needs Python 3.10'
+)
+
+
+def messages(code: str) -> List[str]:
+    return [x.message for x in lint(code)]
+
+
+def test_clean_code_has_no_issues() -> None:
+    code = 'import math\n\ndef area(r):\n    return math.pi * r ** 2\n\nprint(area(int(input())))\n'
+    assert lint(code) == []
+
+
+def test_undefined_name_is_an_error() -> None:
+    issues = lint('print(lenght([1]))\n')
+    assert [(x.line, x.error) for x in issues] == [(1, True)]
+    assert 'lenght' in issues[0].message
+
+
+@pytest.mark.parametrize(('code', 'fragment'), [
+    ('import math\nprint(1)\n', 'math импортирован'),
+    ('def f():\n    return 1\n    print(2)\n', 'недостижимый код'),
+    ('try:\n    pass\nexcept:\n    pass\n', 'except без типа'),
+    ('x = None\nprint(x == None)\n', 'is'),
+])
+def test_warnings(code: str, fragment: str) -> None:
+    issues = lint(code)
+    assert any(fragment in x.message and not x.error for x in issues)
+
+
+def test_star_import_disables_undefined_names() -> None:
+    assert not any(x.error for x in lint('from math import *\nprint(sqrt(2))\n'))
+
+
+def test_syntax_errors_are_left_to_the_run() -> None:
+    assert lint('def f(:\n') == []
+
+
+@requires_match
+def test_match_patterns_bind_names() -> None:
+    """Все имена из шаблонов case, включая **rest у словаря, считаются определенными."""
+
+    code = (
+        'match {1: 2}:\n'
+        '    case {1: value, **rest}:\n'
+        '        print(value, rest)\n'
+        '    case [first, *others]:\n'
+        '        print(first, others)\n'
+        '    case str() as text:\n'
+        '        print(text)\n'
+    )
+    assert messages(code) == []
+
+
+@requires_match
+def test_mapping_pattern_without_rest() -> None:
+    code = 'match {}:\n    case {}:\n        print(rest)\n'
+    assert messages(code) == ['Строка 3: имя rest не определено']
@@ -0,0 +1,62 @@
+from typing import List
+
+import pytest
+
+from executor.policy import CodePolicy
+
+
+def messages(code: str) -> List[str]:
+    return [x.message for x in CodePolicy.analyze(code)]
+
+
+def test_allowed_code_passes() -> None:
+    code = 'import math\nfrom collections import deque\nprint(math.sqrt(int(input())))\n'
+    assert messages(code) == []
+
+
+@pytest.mark.parametrize('code', [
+    'import sys\nsys.modules\n',
+    'import sys as s\ns.modules\n',
+    'import sys as s\nt = s\nu = t\nu._getframe()\n',
+    'def f():\n    return s.settrace\nimport sys as s\n',
+    'import sys\nif (s := sys):\n    s.meta_path\n',
+])
+def test_module_attribute_through_any_alias_is_forbidden(code: str) -> None:
+    """Запрещенный атрибут sys ловится и через псевдоним импорта или присваивание."""
+
+    assert any('sys.' in x for x in messages(code))
+
+
+def test_aliases_of_other_modules_are_not_sys() -> None:
+    assert messages('import math as sys\nsys.modules = 1\n') == []
+
+
+@pytest.mark.parametrize('code', [
+    '__builtins__["open"]("/etc/passwd")\n',
+    'b = __builtins__\nb.open\n',
+])
+def test_builtins_mapping_is_forbidden(code: str) -> None:
+    assert any('__builtins__' in x for x in messages(code))
+
+
+@pytest.mark.parametrize(('code', 'fragment'), [
+    ('import os\n', 'os'),
+    ('from subprocess import run\n', 'subprocess'),
+    ('from . import x\n', 'относительный'),
+    ('from sys import modules\n', 'sys.modules'),
+    ('().__class__\n', '__class__'),
+    ('eval("1")\n', 'eval'),
+])
+def test_forbidden_constructs(code: str, fragment: str) -> None:
+    assert any(fragment in x for x in messages(code))
+
+
+def test_syntax_errors_are_left_to_the_run() -> None:
+    assert messages('def f(:\n') == []
+
+
+def test_results_are_cached_by_source() -> None:
+    policy = CodePolicy(maxsize=4)
+    policy.check('import os\n')
+    policy.check('import os\n')
+    assert policy.stats().hits == 1
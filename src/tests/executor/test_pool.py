@@ -0,0 +1,179 @@
+import asyncio
+import time
+from typing import List
+
+import pytest
+
+import enums
+from executor.pool import WorkerPool
+from executor.pool import _Worker
+from executor.schemas import ExecutionLimits
+from executor.schemas import TestCase
+
+ENDLESS_OUTPUT = 'import time\nwhile True:\n    print(1)\n    time.sleep(0.01)\n'
+
+# Doubles the number, sleeps on `slow` until a test kills its worker
+DOUBLE = (
+    'import time\n'
+    'line = input()\n'
+    'if line == "slow":\n'
+    '    time.sleep(30)\n'
+    'print(int(line) * 2)\n'
+)
+
+
+def double_cases(count: int) -> List[TestCase]:
+    return [
+        TestCase(id=f'case-{i}', stdin=str(i), expected_output=str(2 * i))
+        for i in range(count)
+    ]
+
+
+def record_acquired(pool: WorkerPool) -> List[_Worker]:
+    acquired: List[_Worker] = []
+    acquire = pool._acquire
+
+    def recording() -> _Worker:
+        worker = acquire()
+        acquired.append(worker)
+        return worker
+
+    pool._acquire = recording  # type: ignore
+    return acquired
+
+
+async def wait_until_idle(pool: WorkerPool, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = pool.stats()
+        if stats.busy == 0 and stats.idle == pool.size:
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+def test_leaving_the_stream_early_releases_the_worker() -> None:
+    """Потребитель, бросивший поток вывода, не держит воркер до истечения wall time."""
+
+    async def scenario() -> None:
+        async with WorkerPool(size=1) as pool:
+            started = time.monotonic()
+            async for chunk in pool.stream(ENDLESS_OUTPUT, limits=ExecutionLimits(wall_time=30)):
+                assert chunk.startswith('1\n')
+                break
+            assert await wait_until_idle(pool)
+            result = await pool.submit('print(2)')
+            assert result.stdout == '2\n'
+            assert time.monotonic() - started < 10
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_stream_consumer_releases_the_worker() -> None:
+    async def consume(pool: WorkerPool) -> None:
+        async for _ in pool.stream(ENDLESS_OUTPUT, limits=ExecutionLimits(wall_time=30)):
+            pass
+
+    async def scenario() -> None:
+        async with WorkerPool(size=1) as pool:
+            consumer = asyncio.ensure_future(consume(pool))
+            await asyncio.sleep(0.5)
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+            assert await wait_until_idle(pool)
+
+    asyncio.run(scenario())
+
+
+def test_stream_ends_with_the_result() -> None:
+    async def scenario() -> None:
+        async with WorkerPool(size=1) as pool:
+            items = [x async for x in pool.stream('print(3)')]
+            assert items[:-1] == ['3\n']
+            assert items[-1].stdout == '3\n'
+
+    asyncio.run(scenario())
+
+
+def test_every_job_gets_a_fresh_worker() -> None:
+    """Изменения, которые решение вносит в интерпретатор, не видны следующему решению."""
+
+    async def scenario() -> None:
+        async with WorkerPool(size=1) as pool:
+            first_pid = pool._idle[0].process.pid
+            assert (await pool.submit('import math\nmath.pi = 3\nprint(math.pi)')).stdout == '3\n'
+            assert (await pool.submit('import math\nprint(math.pi > 3)')).stdout == 'True\n'
+            assert await wait_until_idle(pool)
+            assert pool._idle[0].process.pid != first_pid
+
+    asyncio.run(scenario())
+
+
+def test_pool_recovers_from_a_worker_killed_mid_job() -> None:
+    async def scenario() -> None:
+        async with WorkerPool(size=2) as pool:
+            acquired = record_acquired(pool)
+            job = asyncio.ensure_future(pool.submit(DOUBLE, 'slow', ExecutionLimits(wall_time=30)))
+            await asyncio.sleep(0.5)
+            acquired[0].kill()
+            result = await job
+            assert result.verdict == enums.Verdict.RUNTIME_ERROR
+            assert 'died' in result.error
+            assert await wait_until_idle(pool)
+            assert (await pool.submit(DOUBLE, '4')).stdout == '8\n'
+
+    asyncio.run(scenario())
+
+
+def test_sharded_results_keep_case_order_when_a_shard_dies() -> None:
+    """Упавший воркер портит только свой шард, результаты остаются в порядке тестов."""
+
+    async def scenario() -> None:
+        async with WorkerPool(size=2) as pool:
+            acquired = record_acquired(pool)
+            cases = double_cases(20)
+            cases[1].stdin = 'slow'
+            limits = ExecutionLimits(wall_time=30)
+            job = asyncio.ensure_future(pool.submit_sharded(DOUBLE, cases, limits))
+            await asyncio.sleep(1)
+            # The shard of even cases is finished by now,
+            # only the worker of the slow one is alive
+            for worker in acquired:
+                worker.kill()
+            results = await job
+            assert [x.id for x in results] == [x.id for x in cases]
+            assert all(x.verdict == enums.Verdict.PASSED for x in results[::2])
+            assert all(x.verdict == enums.Verdict.RUNTIME_ERROR for x in results[1::2])
+            assert await wait_until_idle(pool)
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('stop_on_failure', [False, True])
+def test_sharded_failures_are_merged_in_case_order(stop_on_failure: bool) -> None:
+    async def scenario() -> None:
+        async with WorkerPool(size=3) as pool:
+            cases = double_cases(30)
+            cases[7].expected_output = 'wrong'
+            results = await pool.submit_sharded(DOUBLE, cases, stop_on_failure=stop_on_failure)
+            assert [x.id for x in results] == [x.id for x in cases]
+            assert results[7].verdict == enums.Verdict.FAILED
+            others = {x.verdict for i, x in enumerate(results) if i != 7}
+            if stop_on_failure:
+                assert others <= {enums.Verdict.PASSED, enums.Verdict.SKIPPED}
+            else:
+                assert others == {enums.Verdict.PASSED}
+
+    asyncio.run(scenario())
+
+
+def test_closed_pool_stops_its_workers() -> None:
+    async def scenario() -> None:
+        pool = WorkerPool(size=2).start()
+        workers = list(pool._idle)
+        pool.close()
+        assert all(not x.process.is_alive() for x in workers)
+        with pytest.raises(RuntimeError):
+            await pool.submit('print(1)')
+
+    asyncio.run(scenario())
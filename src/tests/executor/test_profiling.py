@@ -0,0 +1,51 @@
+import enums
+from executor.profiling import CPU_TIME_RESOLUTION
+from executor.profiling import fit_complexity
+from executor.profiling import run_profile
+from executor.profiling import slowest
+from executor.schemas import ExecutionLimits
+
+SIZES = [64, 128, 256, 512, 1024, 2048]
+
+
+def test_fit_recognizes_exact_classes() -> None:
+    assert fit_complexity(SIZES, [5 for _ in SIZES]) == enums.ComplexityClass.CONSTANT
+    assert fit_complexity(SIZES, [3 * n + 10 for n in SIZES]) == enums.ComplexityClass.LINEAR
+    assert fit_complexity(SIZES, [n * n for n in SIZES]) == enums.ComplexityClass.QUADRATIC
+    assert fit_complexity(SIZES[:2], [1, 2]) is None
+
+
+def test_timer_noise_below_the_floor_is_constant() -> None:
+    """Колебания времени меньше разрешения таймера не делают решение медленнее O(1)."""
+
+    times = [4.1e-5, 3.9e-5, 4.4e-5, 3.8e-5, 4.0e-5, 5.0e-5]
+    assert fit_complexity(SIZES, times, floor=CPU_TIME_RESOLUTION) == enums.ComplexityClass.CONSTANT
+
+
+def test_slower_fit_wins() -> None:
+    """sorted() - одна строка для счетчика операций, но время его работы растет с размером."""
+
+    by_operations = fit_complexity(SIZES, [4 for _ in SIZES])
+    by_time = fit_complexity(SIZES, [1e-4 + 2.5e-6 * n for n in SIZES], floor=CPU_TIME_RESOLUTION)
+    assert slowest(by_operations, by_time) == enums.ComplexityClass.LINEAR
+    assert slowest(None, enums.ComplexityClass.CONSTANT) == enums.ComplexityClass.CONSTANT
+    assert slowest(None, None) is None
+
+
+def test_submission_reads_the_whole_generated_input() -> None:
+    """Вход длиннее буфера вывода генератора передается решению целиком, а не хвостом."""
+
+    generator = 'for i in range(int(input())):\n    print(i)\n'
+    code = (
+        'count = 0\n'
+        'try:\n'
+        '    while True:\n'
+        '        assert int(input()) == count\n'
+        '        count += 1\n'
+        'except EOFError:\n'
+        '    print(count)\n'
+    )
+    profile = run_profile(code, generator, [20000, 40000, 80000], ExecutionLimits())
+    assert profile.error is None
+    assert all(x.verdict == enums.Verdict.OK for x in profile.samples)
+    assert profile.complexity == enums.ComplexityClass.LINEAR
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+import enums
+from core.config import settings
+from executor.sandbox import SECRET_SETTINGS
+from executor.sandbox import execute_in_scope
+from executor.sandbox import scrub_secrets
+from executor.schemas import ExecutionLimits
+
+
+def test_submission_sys_has_the_streams() -> None:
+    code = (
+        'import sys\n'
+        'sys.setrecursionlimit(10000)\n'
+        'line = sys.stdin.readline()\n'
+        'sys.stdout.write(line.upper())\n'
+    )
+    result = execute_in_scope(code, 'abc\n', ExecutionLimits())
+    assert result.verdict == enums.Verdict.OK
+    assert result.stdout == 'ABC\n'
+
+
+def test_submission_sys_has_no_modules() -> None:
+    """Через sys.modules решение дотянулось бы до настроек приложения."""
+
+    result = execute_in_scope('import sys as s\nprint(s.modules)\n', '', ExecutionLimits())
+    assert result.verdict == enums.Verdict.RUNTIME_ERROR
+
+
+@pytest.mark.parametrize(
+    'name', ['open', 'compile', 'getattr', 'globals', 'vars', 'breakpoint', 'exec']
+)
+def test_forbidden_builtins_fail_at_runtime(name: str) -> None:
+    result = execute_in_scope(f'f = [{name}][0]\nf("x")\n', '', ExecutionLimits())
+    assert result.verdict == enums.Verdict.FORBIDDEN
+
+
+def test_secrets_are_scrubbed(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in SECRET_SETTINGS:
+        monkeypatch.setattr(settings, name, 'secret')
+        monkeypatch.setenv(name, 'secret')
+    scrub_secrets()
+    assert all(getattr(settings, name) is None for name in SECRET_SETTINGS)
+    assert all(name not in os.environ for name in SECRET_SETTINGS)
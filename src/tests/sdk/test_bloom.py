@@ -0,0 +1,28 @@
+from sdk.bloom import BloomFilter
+
+
+def test_added_items_are_always_found() -> None:
+    """Ложноотрицательных ответов не бывает, даже после переполнения."""
+
+    bloom = BloomFilter(capacity=100, error_rate=0.01, items=range(50))
+    for i in range(50, 300):
+        bloom.add(f'item-{i}')
+    assert all(i in bloom for i in range(50))
+    assert all(f'item-{i}' in bloom for i in range(50, 300))
+    assert len(bloom) == 300
+    assert bloom.is_full
+
+
+def test_false_positive_rate_stays_near_the_error_rate() -> None:
+    bloom = BloomFilter(capacity=10000, error_rate=0.01, items=(f'added-{i}' for i in range(10000)))
+    false_positives = sum(f'absent-{i}' in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_size_follows_capacity_and_error_rate() -> None:
+    small = BloomFilter(capacity=1000, error_rate=0.01)
+    assert small.hashes == 7
+    assert small.memory_bytes == (small.size + 7) // 8
+    assert BloomFilter(capacity=1000, error_rate=0.001).size > small.size
+    assert not small.is_full
+    assert 'anything' not in BloomFilter(capacity=0, error_rate=0.01)
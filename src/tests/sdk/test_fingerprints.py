@@ -0,0 +1,68 @@
+import random
+from typing import List
+from typing import Set
+
+import pytest
+
+from sdk.fingerprints import fingerprint
+from sdk.fingerprints import kgram_hashes
+from sdk.fingerprints import normalized_tokens
+from sdk.fingerprints import stable_hash
+from sdk.fingerprints import winnow
+
+
+def winnow_by_definition(hashes: List[int], window: int) -> Set[int]:
+    if len(hashes) <= window:
+        return {min(hashes)} if hashes else set()
+    selected = set()
+    for start in range(len(hashes) - window + 1):
+        candidates = range(start, start + window)
+        selected.add(min(candidates, key=lambda i: (hashes[i], -i)))
+    return {hashes[i] for i in selected}
+
+
+def test_renaming_and_formatting_do_not_change_tokens() -> None:
+    """Переименование переменных, другие константы и комментарии не меняют нормализованный поток."""
+
+    first = 'total = 0\nfor x in range(10):\n    total += x  # sum\nprint(total)\n'
+    second = 's=0\n\nfor item in range(99): s += item\nprint( s )\n'
+    assert normalized_tokens(first) == normalized_tokens(second)
+    assert normalized_tokens('print("a", len(b))') == [
+        'print', '(', 'S', ',', 'len', '(', 'V', ')', ')',
+    ]
+
+
+def test_unparsable_text_is_split_by_whitespace() -> None:
+    assert normalized_tokens('Ответ:  (ДА\nнет') == ['ответ:', '(да', 'нет']
+
+
+def test_stable_hash_fits_bigint() -> None:
+    assert stable_hash('abc') == stable_hash('abc')
+    assert all(-2 ** 63 <= stable_hash(str(i)) < 2 ** 63 for i in range(1000))
+    assert len(kgram_hashes(list('abcdef'), 4)) == 3
+    assert kgram_hashes(list('ab'), 4) == []
+
+
+@pytest.mark.parametrize('window', [1, 2, 4, 8])
+def test_winnow_selects_the_rightmost_minimum_of_every_window(window: int) -> None:
+    generator = random.Random(window)
+    for length in range(30):
+        # Few distinct values, so equal minimums within a window are common
+        hashes = [generator.randrange(5) for _ in range(length)]
+        assert winnow(hashes, window) == winnow_by_definition(hashes, window)
+
+
+def test_shared_fragment_gives_a_shared_fingerprint() -> None:
+    """Общий фрагмент длиной от window + k - 1 токенов гарантированно дает общий отпечаток."""
+
+    k, window = 5, 4
+    shared = 'for i in range(n):\n    if a[i] > best:\n        best = a[i]\n'
+    first = (
+        'n = int(input())\na = list(map(int, input().split()))\nbest = a[0]\n'
+        + shared
+        + 'print(best)\n'
+    )
+    second = 'def solve(values):\n    return sorted(values)\n' + shared
+    assert len(normalized_tokens(shared)) >= window + k - 1
+    assert fingerprint(first, k, window) & fingerprint(second, k, window)
+    assert fingerprint('', k, window) == set()
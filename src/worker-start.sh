@@ -1,4 +1,37 @@
 #! /usr/bin/env bash
 set -e
 
-celery worker -A .worker -l info -Q main-queue -c 1
+# Grading lanes get capacity by weight. Every group also drains the more urgent lanes,
+# so idle capacity helps them, while each lane keeps a guaranteed share and can't be starved.
+# A lane's weight is the number of submissions it grades at once: one Celery child per unit.
+# Every child starts its own executor pool of GRADING_POOL_SIZE sandbox processes, so a host runs
+# (3 + 2 + 1) * GRADING_POOL_SIZE sandboxes. A suite of more than EXECUTOR_SHARD_MIN_CASES cases
+# is split across the child's pool, raise GRADING_POOL_SIZE for homeworks with large suites.
+GRADING_URGENT_CONCURRENCY=${GRADING_URGENT_CONCURRENCY:-3}
+GRADING_DEFAULT_CONCURRENCY=${GRADING_DEFAULT_CONCURRENCY:-2}
+GRADING_BULK_CONCURRENCY=${GRADING_BULK_CONCURRENCY:-1}
+GRADING_POOL_SIZE=${GRADING_POOL_SIZE:-1}
+
+celery worker -A .worker -l info -Q main-queue -c 1 -n main@%h &
+EXECUTOR_POOL_SIZE="$GRADING_POOL_SIZE" \
+    celery worker -A .worker -l info -Q grading-urgent -c "$GRADING_URGENT_CONCURRENCY" -n urgent@%h &
+EXECUTOR_POOL_SIZE="$GRADING_POOL_SIZE" \
+    celery worker -A .worker -l info -Q grading-urgent,grading-default -c "$GRADING_DEFAULT_CONCURRENCY" \
+    -n default@%h &
+EXECUTOR_POOL_SIZE="$GRADING_POOL_SIZE" \
+    celery worker -A .worker -l info -Q grading-urgent,grading-default,grading-bulk \
+    -c "$GRADING_BULK_CONCURRENCY" -n bulk@%h &
+
+# Homework regrades fan out over all answers from a single task, its pool gets every core
+EXECUTOR_POOL_SIZE="${REGRADE_POOL_SIZE:-$(nproc)}" \
+    celery worker -A .worker -l info -Q grading-regrade -c 1 -n regrade@%h &
+
+# Periodic tasks such as the session sweeper. Only one scheduler may run per deployment,
+# set CELERY_BEAT_ENABLED=0 on every other replica of this container
+if [ "${CELERY_BEAT_ENABLED:-1}" = "1" ]; then
+    celery beat -A .worker -l info -s /tmp/celerybeat-schedule &
+fi
+
+# Stop the container as soon as any worker dies
+wait -n
+exit 1
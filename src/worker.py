@@ -1,7 +1,66 @@
+import asyncio
+from typing import Awaitable
+from typing import TypeVar
+from uuid import UUID
+
+from tortoise import Tortoise
+
 from core.celery_app import celery_app
+from core.config import settings
+from services import AuthorizationService
+from services import GradingService
+from services import PlagiarismService
+from services import RegradeService
+
+ResultType = TypeVar('ResultType')
+
+
+def run_async(coroutine: Awaitable[ResultType]) -> ResultType:
+    """ Выполняет корутину в event loop воркера, подключаясь к БД при первом вызове """
+    loop = asyncio.get_event_loop()
+    if not Tortoise._inited:
+        loop.run_until_complete(
+            Tortoise.init(db_url=settings.DB_URI, modules={'models': ['models']})
+        )
+    return loop.run_until_complete(coroutine)
 
 
 @celery_app.task(name='test_celery', acks_late=True)
 def test_celery(word: str) -> str:
     print(f"test task return {word}")
     return f"test task return {word}"
+
+
+@celery_app.task(
+    name='grade_homework_answer',
+    bind=True,
+    acks_late=True,
+    max_retries=settings.GRADING_MAX_RETRIES,
+)
+def grade_homework_answer(self, answer_id: str) -> None:
+    try:
+        run_async(GradingService.grade_answer(UUID(answer_id)))
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            run_async(GradingService.mark_failed(UUID(answer_id)))
+            raise
+        raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+
+
+@celery_app.task(name='regrade_homework', acks_late=True)
+def regrade_homework(job_id: str) -> None:
+    try:
+        run_async(RegradeService.run(UUID(job_id)))
+    except Exception:
+        run_async(RegradeService.mark_failed(UUID(job_id)))
+        raise
+
+
+@celery_app.task(name='index_homework_answer', acks_late=True)
+def index_homework_answer(answer_id: str) -> None:
+    run_async(PlagiarismService.index_answer(UUID(answer_id)))
+
+
+@celery_app.task(name='sweep_sessions')
+def sweep_sessions() -> dict:
+    return run_async(AuthorizationService.sweep_sessions()).dict()